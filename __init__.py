@@ -1,11 +1,12 @@
 from prate import Prate, PrateWindowAppearanceConfigure
 
-def create_prate(config:str|PrateWindowAppearanceConfigure=None, as_sub_module = True, debug=False):
+def create_prate(config:str|PrateWindowAppearanceConfigure=None, as_sub_module = True, debug=False, daemon=False):
     """
     Create a Prate instance with the given configuration.
 
     :param config: Configuration dictionary for Prate.
+    :param daemon: Render every message with one long-lived renderer.
     :return: An instance of Prate.
     """
     
-    return Prate(config, as_sub_module=as_sub_module, debug=debug)
\ No newline at end of file
+    return Prate(config, as_sub_module=as_sub_module, debug=debug, daemon=daemon)
\ No newline at end of file
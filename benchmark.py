@@ -0,0 +1,768 @@
+# !user/bin/python3
+# Desc: headless benchmarks of prate, run with `python benchmark.py`
+#       `--json result.json` writes the metrics, `--baseline result.json` fails on regressions
+
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from prate import Prate, PrateRenderer, PrateWindow, TweenFrameClock
+from prate import TweenProbe, TweenTraceRecorder, PrateTextLayoutCache, PrateImageRenderer
+from prate import PrateWindowAppearanceConfigure, PrateAnimationParser, PrateThemeRegistry
+from prate import EaseFunction, EaseType, TweenAnimation, TweenMove, TweenEngine
+
+# metrics ending with these suffixes are better when lower, the others when higher
+LOWER_IS_BETTER = ("_ms", "_us", "_ns", "_kb", "_error")
+
+class _TimedPrate(Prate):
+    '''record the moment each window is shown'''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.posted = {}
+        self.shown = {}
+        self.all_shown = threading.Event()
+        self.expected = 0
+        self.quit_after_shown = False
+
+    def _craft_window(self, title:str = "", content:str = "", *args):
+        window = super()._craft_window(title, content, *args)
+        self.shown[title] = time.perf_counter()
+        if len(self.shown) >= self.expected:
+            self.all_shown.set()
+        if self.quit_after_shown:
+            from PyQt5.QtWidgets import QApplication
+            window.close()
+            QApplication.instance().quit()
+        return window
+
+def _in_gui(func, *args, timeout:float = 60):
+    '''run a function in the renderer thread and wait for its result'''
+
+    result = []
+    done = threading.Event()
+
+    def _run():
+        try:
+            result.append(func(*args))
+        finally:
+            done.set()
+
+    PrateRenderer.instance().post(_run)
+    if not done.wait(timeout) or len(result) == 0:
+        raise RuntimeError(f"{func.__name__} did not finish in the renderer")
+    return result[0]
+
+def _rss_kb() -> float:
+    '''get the resident set size of current process, in kilobyte'''
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def _latency(prate:_TimedPrate) -> tuple:
+    '''get the median and max latency to first frame, in millisecond'''
+
+    latency = sorted(prate.shown[k] - prate.posted[k] for k in prate.shown)
+    if len(latency) == 0:
+        return float("nan"), float("nan")
+    return latency[len(latency) // 2] * 1000, latency[-1] * 1000
+
+def _report(name:str, metrics:dict) -> dict:
+    '''print the metrics of a benchmark'''
+
+    print(f"{name:<10}" + "   ".join(f"{key}: {value:.2f}" for key, value in metrics.items()))
+    return metrics
+
+def bench_import(repeat:int = 5) -> dict:
+    '''compare importing the qt free parts with importing the gui parts, each in a fresh process'''
+
+    probe = """
+import os, sys, time
+sys.path.insert(0, {path!r})
+begin = time.perf_counter()
+{statement}
+cost = time.perf_counter() - begin
+with open("/proc/self/statm") as f:
+    rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+print(cost * 1000, rss, sum(name.startswith("PyQt5") for name in sys.modules), sum(name.startswith("numpy") for name in sys.modules))
+"""
+    cases = {
+        "client": "import prate_client",
+        "prate": "import prate",
+        "prate_qt": "import prate, prate_qt",
+    }
+    path = os.path.dirname(os.path.abspath(__file__))
+    metrics = {}
+    for name, statement in cases.items():
+        samples = []
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, "-c", probe.format(path=path, statement=statement)],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            samples.append(tuple(float(value) for value in output))
+        samples.sort()
+        cost, rss, qt_modules, numpy_modules = samples[len(samples) // 2]
+        metrics[f"import_{name}_ms"] = cost
+        metrics[f"import_{name}_rss_kb"] = rss
+        if name != "prate_qt":
+            metrics[f"import_{name}_qt_modules"] = qt_modules
+            metrics[f"import_{name}_numpy_modules"] = numpy_modules
+    return _report("import", metrics)
+
+def bench_per_call(count:int = 20) -> dict:
+    '''the original path, a new QApplication for each ring()'''
+
+    prate = _TimedPrate()
+    prate.expected = count
+    prate.quit_after_shown = True
+
+    call_cost = 0
+    for i in range(count):
+        title = str(i)
+        prate.posted[title] = time.perf_counter()
+        prate.ring(title, "content")
+        call_cost += time.perf_counter() - prate.posted[title]
+
+        # the per-call path can not share QApplication, so wait for each one
+        for _thread in threading.enumerate():
+            if _thread is not threading.current_thread() and not _thread.daemon:
+                _thread.join()
+
+    median, worst = _latency(prate)
+    return _report("per-call", {
+        "ring_ms": call_cost * 1000 / count,
+        "first_frame_median_ms": median,
+        "first_frame_max_ms": worst,
+    })
+
+def bench_daemon(count:int = 20, burst:int = 200) -> dict:
+    '''the long-lived renderer path'''
+
+    # start the renderer before timing
+    _in_gui(lambda: None)
+
+    # latency, one message at a time like the per-call path
+    prate = _TimedPrate(daemon=True, max_visible=1000)
+    call_cost = 0
+    for i in range(count):
+        title = str(i)
+        prate.expected = i + 1
+        prate.all_shown.clear()
+        prate.posted[title] = time.perf_counter()
+        prate.ring(title, "content")
+        call_cost += time.perf_counter() - prate.posted[title]
+        prate.all_shown.wait(10)
+    median, worst = _latency(prate)
+    metrics = {
+        "ring_us": call_cost * 1e6 / count,
+        "first_frame_median_ms": median,
+        "first_frame_max_ms": worst,
+    }
+
+    # throughput, a burst of messages
+    prate = _TimedPrate(daemon=True, max_visible=1000)
+    prate.expected = burst
+    begin = time.perf_counter()
+    for i in range(burst):
+        title = str(i)
+        prate.posted[title] = time.perf_counter()
+        prate.ring(title, "content")
+    call_cost = time.perf_counter() - begin
+    prate.all_shown.wait(60)
+    median, worst = _latency(prate)
+    metrics["burst_calls_per_sec"] = burst / call_cost
+    metrics["burst_first_frame_max_ms"] = worst
+    return _report("daemon", metrics)
+
+def bench_craft(count:int = 50) -> dict:
+    '''the cost of crafting a window and the memory each live window holds'''
+
+    configure = PrateWindowAppearanceConfigure.dark()
+
+    def _run():
+        # warm up the theme cache and the font database
+        configure.craft_window().close()
+
+        windows = []
+        gc.collect()
+        rss = _rss_kb()
+        begin = time.perf_counter()
+        for i in range(count):
+            window = configure.craft_window()
+            window.set_infos(str(i), "content")
+            window.show()
+            windows.append(window)
+        cost = time.perf_counter() - begin
+        gc.collect()
+        rss = _rss_kb() - rss
+
+        for window in windows:
+            window.close()
+        return {
+            "craft_window_ms": cost * 1000 / count,
+            "rss_per_window_kb": rss / count,
+        }
+
+    return _report("craft", _in_gui(_run))
+
+def bench_text(count:int = 2000, templates:int = 20) -> dict:
+    '''the cost of setting the texts of a window with and without the text layout cache
+    @param templates: the number of distinct messages, they repeat like templated notifications'''
+
+    configure = PrateWindowAppearanceConfigure.dark()
+    content = "a long notification which needs to be elided " * 8
+
+    def _run():
+        window = configure.craft_window()
+        window.show()
+        messages = [(f"title {i % templates}", f"{i % templates} {content}") for i in range(count)]
+
+        def _measure() -> float:
+            begin = time.perf_counter()
+            for title, info in messages:
+                window.set_infos(title, info)
+            return (time.perf_counter() - begin) * 1e6 / count
+
+        max_size = PrateTextLayoutCache.max_size
+        PrateTextLayoutCache.max_size = 0
+        PrateTextLayoutCache.clear()
+        uncached = _measure()
+        PrateTextLayoutCache.max_size = max_size
+        PrateTextLayoutCache.clear()
+        cached = _measure()
+        stats = PrateTextLayoutCache.stats()
+        window.close()
+        return {
+            "set_infos_uncached_us": uncached,
+            "set_infos_cached_us": cached,
+            "text_cache_hit_rate": stats["hits"] / max(1, stats["hits"] + stats["misses"]),
+        }
+
+    return _report("text", _in_gui(_run))
+
+def bench_snapshot(windows:int = 10, frames:int = 200) -> dict:
+    '''the cost of an animation frame, which moves, fades and repaints the windows,
+    with the widgets painted on every frame and with the snapshot render mode'''
+
+    content = "a notification which is rasterized once and then only moved and faded " * 2
+
+    def _run():
+        metrics = {}
+        for mode in (False, True):
+            configure = PrateWindowAppearanceConfigure.dark()
+            configure.snapshot = mode
+            crafted = [configure.craft_window() for _ in range(windows)]
+            for i, window in enumerate(crafted):
+                window.show()
+                window.set_infos(f"title {i}", content)
+
+            begin = time.perf_counter()
+            for frame in range(frames):
+                for i, window in enumerate(crafted):
+                    window.setWindowOpacity(0.5 + 0.5 * frame / frames)
+                    window.move(100 + frame % 50, 100 + i * 10)
+                    window.repaint()
+            cost = (time.perf_counter() - begin) * 1e6 / (frames * windows)
+
+            begin = time.perf_counter()
+            for i, window in enumerate(crafted):
+                window.set_infos(f"again {i}", content)
+            update = (time.perf_counter() - begin) * 1e6 / windows
+
+            for window in crafted:
+                window.close()
+            key = "snapshot" if mode else "widget"
+            metrics[f"frame_{key}_us"] = cost
+            metrics[f"set_infos_{key}_us"] = update
+        metrics["frame_speedup"] = metrics["frame_widget_us"] / max(1e-9, metrics["frame_snapshot_us"])
+        return metrics
+
+    return _report("snapshot", _in_gui(_run))
+
+def _count_window_calls(window, calls:dict):
+    '''count the moves and opacity changes of a window which reach the window system,
+    the former moveEvent set the title on each move which changed the position, it is counted as title'''
+
+    move, opacity = window.move, window.setWindowOpacity
+
+    def _move(x, y):
+        if (x, y) != (window.x(), window.y()):
+            calls["title"] += 1
+        calls["move"] += 1
+        move(x, y)
+
+    def _opacity(alpha):
+        calls["opacity"] += 1
+        opacity(alpha)
+
+    window.move, window.setWindowOpacity = _move, _opacity
+
+def bench_overlay(windows:int = 10, frames:int = 200) -> dict:
+    '''the cost of an animation frame which moves and fades the toasts of an anchor and lets qt paint them, 
+    with a window for each toast and with one overlay which paints all of them'''
+
+    from PyQt5.QtWidgets import QApplication
+    content = "a notification which is painted by the overlay of its anchor " * 2
+
+    def _run():
+        metrics = {}
+        for mode in (False, True):
+            configure = PrateWindowAppearanceConfigure.dark()
+            configure.snapshot = True
+            configure.overlay = mode
+            crafted = [configure.craft_window() for _ in range(windows)]
+            calls = {"move": 0, "opacity": 0, "title": 0}
+            for i, window in enumerate(crafted):
+                window.set_infos(f"title {i}", content)
+                window.anim_move(100, 100 + i * 10)
+                window.show_up()
+                window.anim.stop()
+                _count_window_calls(window, calls)
+            QApplication.processEvents()
+            overlay = crafted[0]._overlay
+            paints = 0 if overlay is None else overlay.paints
+
+            begin = time.perf_counter()
+            for frame in range(frames):
+                for i, window in enumerate(crafted):
+                    window.anim_alpha(0.5 + 0.5 * frame / frames)
+                    window.anim_move(100 + frame % 50, 100 + i * 10)
+                QApplication.processEvents()
+            cost = (time.perf_counter() - begin) * 1e6 / frames
+
+            for window in crafted:
+                window.close()
+            metrics["frame_overlay_us" if mode else "frame_windows_us"] = cost
+            # a window of its own moves and fades through the window system, an overlay only repaints
+            calls_per_frame = (calls["move"] + calls["opacity"]) / frames
+            metrics["window_system_calls_overlay" if mode else "window_system_calls_windows"] = calls_per_frame
+            if overlay is not None:
+                metrics["overlay_paints_per_frame"] = (overlay.paints - paints) / frames
+        metrics["frame_speedup"] = metrics["frame_windows_us"] / max(1e-9, metrics["frame_overlay_us"])
+        return metrics
+
+    return _report("overlay", _in_gui(_run))
+
+def bench_batching(windows:int = 10, duration:float = 1.0) -> dict:
+    '''the window system calls per frame while windows enter, wait, leave and reflow at once,
+    with each write applied at once and with the writes of a frame buffered and flushed when it ends'''
+
+    from PyQt5.QtCore import QTimer
+    animation = [
+        ["offset_from;0.3s;linear;(100, 0)", "alpha;0.3s;linear;(0, 1)"],
+        "wait;0.3s",
+        ["offset;0.3s;linear;(-100, 0)", "alpha;0.3s;linear;(1, 0)"],
+    ]
+    configure = PrateWindowAppearanceConfigure.dark()
+    metrics = {}
+
+    for batching in (False, True):
+        done = threading.Event()
+        calls = {"move": 0, "opacity": 0, "title": 0, "frames": 0}
+
+        def _run():
+            PrateWindow.batching = batching
+            crafted = []
+            for i in range(windows):
+                window = configure.craft_window()
+                window.set_infos(str(i), "content")
+                window.anim_move(100, 100 + i * 10)
+                window.show()
+                _count_window_calls(window, calls)
+                window._keep = PrateAnimationParser.build_animation(window, animation)
+                crafted.append(window)
+
+            clock = TweenFrameClock.instance()
+            clock.reset_stats()
+            for window in crafted:
+                window._keep.play()
+                window.reflow_to((0, -40), 300)
+
+            def _done():
+                calls["frames"] = clock.stats()["ticks"]
+                for window in crafted:
+                    window._keep.stop()
+                    window.close()
+                PrateWindow.batching = True
+                done.set()
+
+            QTimer.singleShot(round(duration * 1000), _done)
+
+        PrateRenderer.instance().post(_run)
+        done.wait(duration + 30)
+        frames = max(1, calls["frames"])
+        if batching:
+            metrics["calls_per_frame_batched"] = (calls["move"] + calls["opacity"]) / frames
+        else:
+            metrics["calls_per_frame_direct"] = (calls["move"] + calls["opacity"] + calls["title"]) / frames
+    metrics["calls_per_frame_saved"] = metrics["calls_per_frame_direct"] - metrics["calls_per_frame_batched"]
+    return _report("batching", metrics)
+
+def bench_render(count:int = 300, fps:int = 30) -> dict:
+    '''the throughput of rendering notifications to images offscreen, and the cost of a whole animation'''
+
+    def _run():
+        renderer = PrateImageRenderer(PrateWindowAppearanceConfigure.dark(), fps)
+        renderer.render("warm", "up")
+
+        begin = time.perf_counter()
+        for i in range(count):
+            renderer.render(f"title {i}", f"content of the rendered notification {i}")
+        elapsed = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        frames = renderer.render_frames("title", "content of the rendered animation")
+        sequence = (time.perf_counter() - begin) * 1000
+        renderer.close()
+        return {
+            "renders_per_s": count / elapsed,
+            "render_ms": elapsed * 1000 / count,
+            "frames": len(frames),
+            "frame_sequence_ms": sequence,
+        }
+
+    return _report("render", _in_gui(_run))
+
+def bench_themes(count:int = 200, lookups:int = 100000) -> dict:
+    '''the cost of loading a directory of themes with and without the pickle cache, and of looking a theme up'''
+
+    with tempfile.TemporaryDirectory() as directory:
+        base = PrateWindowAppearanceConfigure.dark().to_dict()
+        for i in range(count):
+            theme = dict(base, name=f"theme {i}", **{"title-font-size": 10 + i % 10})
+            with open(os.path.join(directory, f"theme{i}.json"), "w", encoding="utf-8") as f:
+                json.dump(theme, f)
+        cache_dir = os.path.join(directory, "cache")
+
+        begin = time.perf_counter()
+        PrateThemeRegistry().load(directory)
+        parsed = (time.perf_counter() - begin) * 1000
+
+        PrateThemeRegistry(cache_dir).load(directory)
+        registry = PrateThemeRegistry(cache_dir)
+        begin = time.perf_counter()
+        registry.load(directory)
+        cached = (time.perf_counter() - begin) * 1000
+
+    names = registry.names
+    begin = time.perf_counter()
+    for i in range(lookups):
+        registry.get(names[i % count])
+    lookup = (time.perf_counter() - begin) * 1e9 / lookups
+
+    return _report("themes", {
+        "load_parsed_ms": parsed,
+        "load_cached_ms": cached,
+        "cache_hits": registry.cache_hits,
+        "get_ns": lookup,
+    })
+
+def bench_tick(active:tuple = (1, 10, 50), duration:float = 1.0) -> dict:
+    '''the cost of one tick for each active animation and the achieved fps
+    @param active: the numbers of animations playing at once
+    @param duration: how long each case is measured, in second'''
+
+    animation = [["move;10s;linear;(0, 0);(400, 400)", "alpha;10s;linear;(0, 1)"]]
+    configure = PrateWindowAppearanceConfigure.dark()
+    metrics = {}
+
+    for number in active:
+        done = threading.Event()
+        result = {}
+
+        def _run(number:int):
+            from PyQt5.QtCore import QTimer
+
+            windows = []
+            for i in range(number):
+                window = configure.craft_window()
+                window.set_infos(str(i), "content")
+                window.show()
+                anim = PrateAnimationParser.build_animation(window, animation)
+                anim.play()
+                window._keep = anim
+                windows.append(window)
+
+            clock = TweenFrameClock.instance()
+            clock.reset_stats()
+            begin = time.perf_counter()
+
+            def _done():
+                elapsed = time.perf_counter() - begin
+                stats = clock.stats()
+                result["fps"] = stats["ticks"] / elapsed
+                result["target"] = stats["fps"]
+                result["cost"] = stats["avg_tick_cost"] / number
+                for window in windows:
+                    window._keep.stop()
+                    window.close()
+                done.set()
+
+            QTimer.singleShot(round(duration * 1000), _done)
+
+        PrateRenderer.instance().post(_run, number)
+        done.wait(duration + 30)
+        metrics[f"tick_{number}_us_per_anim"] = result["cost"] * 1000
+        metrics[f"tick_{number}_fps"] = result["fps"]
+        metrics[f"tick_{number}_fps_error"] = abs(1 - result["fps"] / result["target"])
+
+    return _report("tick", metrics)
+
+def bench_stall(stall:int = 30, every:int = 50) -> dict:
+    '''inject event loop stalls and compare the animation time with the configured time
+    @param stall: how long each stall blocks the event loop, in millisecond
+    @param every: the interval between two stalls, in millisecond'''
+
+    animation = [["offset_from;0.5s;outexpo;(-400, 0)", "alpha;0.5s;linear;(0, 1)"], "wait;1s", "alpha;0.5s;linear;(1, 0)"]
+    expected = 2.0
+    results = {}
+    done = threading.Event()
+
+    def _run(time_based:bool):
+        '''run in the gui thread'''
+
+        from PyQt5.QtCore import QTimer
+
+        configure = PrateWindowAppearanceConfigure.dark()
+        window = configure.craft_window()
+        window.set_infos("stall", "content")
+        anim = PrateAnimationParser.build_animation(window, animation)
+        anim.time_based = time_based
+
+        staller = QTimer()
+        staller.timeout.connect(lambda: time.sleep(stall / 1000))
+        begin = time.perf_counter()
+
+        def _done():
+            staller.stop()
+            window.close()
+            results[time_based] = time.perf_counter() - begin
+            if len(results) == 2:
+                done.set()
+            else:
+                _run(True)
+
+        window.show()
+        anim.play(_done)
+        staller.start(every)
+        window._keep = (anim, staller)
+
+    PrateRenderer.instance().post(_run, False)
+    done.wait(60)
+    return _report("stall", {
+        "stall_tick_error": abs(results[False] / expected - 1),
+        "stall_time_error": abs(results[True] / expected - 1),
+    })
+
+def bench_easing(count:int = 100000) -> dict:
+    '''compare the ease functions with their lookup tables'''
+
+    values = [i / count for i in range(count)]
+    bezier = "cubic-bezier(0.25, 0.1, 0.25, 1)"
+    cases = [
+        ("out_expo", EaseFunction.out_expo, EaseType.get_table(EaseType.OUT_EXPO)),
+        ("out_back", EaseFunction.out_back, EaseType.get_table(EaseType.OUT_BACK)),
+        ("out_elastic", EaseFunction.out_elastic, EaseType.get_table(EaseType.OUT_ELASTIC)),
+        ("bezier", EaseType.get_function(bezier), EaseType.get_table(bezier)),
+    ]
+    metrics = {}
+    per = 1e9 / count
+
+    # the first batch imports numpy lazily, it is timed on its own so that no case pays for it
+    begin = time.perf_counter()
+    cases[0][2].batch(values[:1])
+    metrics["ease_first_batch_ms"] = (time.perf_counter() - begin) * 1e3
+    for name, function, lut in cases:
+        begin = time.perf_counter()
+        for x in values: function(x)
+        metrics[f"ease_{name}_function_ns"] = (time.perf_counter() - begin) * per
+
+        begin = time.perf_counter()
+        for x in values: lut(x)
+        metrics[f"ease_{name}_table_ns"] = (time.perf_counter() - begin) * per
+
+        begin = time.perf_counter()
+        lut.batch(values)
+        metrics[f"ease_{name}_batch_ns"] = (time.perf_counter() - begin) * per
+    return _report("easing", metrics)
+
+def bench_timeline(count:int = 2000) -> dict:
+    '''the cost of seeking the animation of a window, and the setter calls of a seek,
+    which depend on the number of tracks instead of the frames before the target'''
+
+    def _run():
+        window = PrateWindowAppearanceConfigure.dark().craft_window()
+        window.show_up()
+        anim = window.anim
+        positions = [(i * 7919) % anim.duration for i in range(count)]
+        anim.seek(anim.duration)
+
+        # count the position and opacity updates which reach the window
+        calls = [0]
+        place, fade = window._place, window.setWindowOpacity
+        def _count(setter):
+            def _counted(*args):
+                calls[0] += 1
+                return setter(*args)
+            return _counted
+        window._place, window.setWindowOpacity = _count(place), _count(fade)
+
+        begin = time.perf_counter()
+        for position in positions:
+            anim.seek(position)
+        elapsed = time.perf_counter() - begin
+        calls = calls[0]
+        window._place, window.setWindowOpacity = place, fade
+
+        window.reset()
+        window.close()
+        return {"seek_us": elapsed * 1e6 / count, "seek_setter_calls": calls / count}
+
+    return _report("timeline", _in_gui(_run))
+
+def bench_engine(active:tuple = (100, 1000, 5000), frames:int = 50) -> dict:
+    '''the cost of a frame which moves many tweens, with a TweenAnimation object for each tween 
+    and with the tween engine which keeps them in arrays, in numpy and in the array fallback
+    @param active: the numbers of tweens moving at once
+    @param frames: the ticks measured for each case'''
+
+    def _sink(x, y):
+        pass
+
+    def _frame_us(clock) -> float:
+        begin = time.perf_counter()
+        for _ in range(frames):
+            clock._tick()
+        return (time.perf_counter() - begin) * 1e6 / frames
+
+    def _run():
+        clock = TweenFrameClock.instance()
+        metrics = {}
+        for number in active:
+            # the positions change on each tick, so every tween reaches its setter in both cases
+            anims = []
+            for i in range(number):
+                anim = TweenAnimation()
+                anim.append(TweenMove(_sink, (i, 0), (i + 100000, 100000), 10000, EaseType.OUT_CUBIC))
+                anim.play()
+                anims.append(anim)
+            metrics[f"engine_{number}_objects_us"] = _frame_us(clock)
+            for anim in anims:
+                anim.stop()
+
+            for vectorized in (True, False):
+                if vectorized and not TweenEngine(clock).vectorized:
+                    continue
+                engine = TweenEngine(clock, vectorized=vectorized)
+                handles = [engine.add(_sink, (i, 0), (i + 100000, 100000), 10000, EaseType.OUT_CUBIC) for i in range(number)]
+                metrics[f"engine_{number}_{'numpy' if vectorized else 'array'}_us"] = _frame_us(clock)
+                for handle in handles:
+                    engine.cancel(handle)
+
+            fastest = metrics.get(f"engine_{number}_numpy_us", metrics[f"engine_{number}_array_us"])
+            metrics[f"engine_{number}_speedup"] = metrics[f"engine_{number}_objects_us"] / max(1e-9, fastest)
+        return metrics
+
+    return _report("engine", _in_gui(_run))
+
+BENCHMARKS = {
+    "import": bench_import,
+    "themes": bench_themes,
+    "easing": bench_easing,
+    "per_call": bench_per_call,
+    "timeline": bench_timeline,
+    "engine": bench_engine,
+    "craft": bench_craft,
+    "text": bench_text,
+    "snapshot": bench_snapshot,
+    "overlay": bench_overlay,
+    "batching": bench_batching,
+    "render": bench_render,
+    "tick": bench_tick,
+    "stall": bench_stall,
+    "daemon": bench_daemon,
+}
+
+# absolute limits which hold without a baseline
+THRESHOLDS = {
+    "import.import_client_qt_modules": 0,
+    "import.import_prate_qt_modules": 0,
+    "import.import_client_numpy_modules": 0,
+    "import.import_prate_numpy_modules": 0,
+    "stall.stall_time_error": 0.05,
+}
+
+def check(results:dict, baseline:dict = None, tolerance:float = 0.25) -> list:
+    '''compare the results with the absolute thresholds and a baseline
+    @param results: {benchmark: {metric: value}}
+    @param baseline: the results of an earlier run
+    @param tolerance: the max relative regression allowed against the baseline
+    @return: the descriptions of all the regressions'''
+
+    failures = []
+    for name, metrics in results.items():
+        for key, value in metrics.items():
+            path = f"{name}.{key}"
+            limit = THRESHOLDS.get(path)
+            if limit is not None and value > limit:
+                failures.append(f"{path} = {value:.4g} is above the threshold {limit:.4g}")
+
+            before = (baseline or {}).get(name, {}).get(key)
+            if not before or value != value:
+                continue
+            if key.endswith(LOWER_IS_BETTER):
+                change = value / before - 1
+            else:
+                change = before / value - 1 if value else float("inf")
+            if change > tolerance:
+                failures.append(f"{path} = {value:.4g} regressed {change * 100:.0f}% from {before:.4g}")
+    return failures
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="headless benchmarks of prate")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run, all by default: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--json", default=None, help="write the results to this file")
+    parser.add_argument("--baseline", default=None, help="compare with the results of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="the max relative regression, default 0.25")
+    parser.add_argument("--trace", default=None, help="record the tweens into a chrome trace file, it slows the benchmarks down")
+    args = parser.parse_args()
+
+    if args.trace:
+        recorder = TweenTraceRecorder()
+        TweenProbe.install(recorder)
+
+    results = {}
+    for name in args.names or BENCHMARKS:
+        results[name] = BENCHMARKS[name]()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"time": time.time(), "python": sys.version.split()[0], "results": results}, f, indent=4)
+
+    if args.trace:
+        TweenProbe.uninstall()
+        recorder.export(args.trace)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    failures = check(results, baseline, args.tolerance)
+    for failure in failures:
+        print("regression:", failure)
+    sys.exit(1 if failures else 0)
@@ -3,47 +3,148 @@
 # Date: 2024/02/02
 # Desc: an easy module based on pyqt5 to implement global message box or tip box
 
+import os
 import sys
 import json
 import math
+import pickle
+import hashlib
+import time
+import heapq
 import queue
+import atexit
+import itertools
 import threading
 import multiprocessing
+import socket
+import selectors
+import traceback
+import concurrent.futures
+
+from array import array
+from typing import NamedTuple, TYPE_CHECKING
+from collections import OrderedDict, deque
+from prate_client import PrateProtocol, PrateClient
+
+if TYPE_CHECKING:
+    from PyQt5.QtWidgets import QWidget
+    from prate_qt import PrateCompiledTheme
+
+# numpy is optional and slow to import, so producers never load it, 
+# _numpy() imports it on the first vectorized evaluation
+numpy = None
+_numpy_tried = False
+
+def _numpy() -> object:
+    '''import numpy on the first call
+    @return: the module, None if it is not installed'''
+
+    global numpy, _numpy_tried
+    if not _numpy_tried:
+        _numpy_tried = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+    return numpy
+
+# the gui parts live in prate_qt, PyQt5 is imported only when they are first used, 
+# so producers which only build and send messages never load it
+_QT_NAMES = (
+    "TweenFrameClock", "QtTweenHelper", "PrateTextLayoutCache", "PrateContentBase", "PrateContent", 
+    "PrateWindow", "ScreenPositionUtils", "ScreenPosition", "PrateStackLayout", "PrateCompiledTheme", 
+    "PrateThemeCache", "PrateWindowPool", "PrateOverlay", "PrateImageRenderer",
+)
+
+def __getattr__(name:str):
+    '''import the gui parts lazily, like `from prate import PrateWindow`'''
+
+    if name in _QT_NAMES:
+        import prate_qt
+        return getattr(prate_qt, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def qt_loaded() -> bool:
+    '''whether PyQt5 is imported in current process'''
+
+    return "PyQt5.QtWidgets" in sys.modules
+
+class PrateRenderer:
+    '''a long-lived renderer, one QApplication owns the gui thread and 
+    each message is just put into a queue which is consumed by it'''
+
+    __instances = {}
+    __lock = threading.Lock()
 
-from PyQt5.QtCore import Qt
-from PyQt5.QtCore import QTimer
-from PyQt5.QtCore import QObject
-from PyQt5.QtCore import QSize, QPoint
+    @staticmethod
+    def instance(as_sub_module:bool = True) -> "PrateRenderer":
+        '''get the shared renderer of current process, start it if necessary
+        @param as_sub_module: if True, render in a thread, otherwise in a process'''
+
+        with PrateRenderer.__lock:
+            renderer = PrateRenderer.__instances.get(as_sub_module)
+            if renderer is None:
+                renderer = PrateRenderer(as_sub_module)
+                PrateRenderer.__instances[as_sub_module] = renderer
+            renderer.start()
+            return renderer
+
+    def __init__(self, as_sub_module:bool = True):
+        '''init the renderer
+        @param as_sub_module: if True, render in a thread, otherwise in a process'''
+
+        self._as_sub_module = as_sub_module
+        self._pending = queue.Queue() if as_sub_module else multiprocessing.Queue()
+        self._worker = None
+
+    @property
+    def running(self) -> bool:
+        '''whether the renderer is running'''
+
+        return self._worker is not None and self._worker.is_alive()
+
+    @property
+    def in_gui_thread(self) -> bool:
+        '''whether the caller runs in the gui thread of this renderer, it can not wait for the renderer there'''
 
-from PyQt5.QtWidgets import QApplication, QWidget, QLabel
-from PyQt5.QtWidgets import QGraphicsDropShadowEffect
+        return self._worker is threading.current_thread()
 
-from PyQt5.QtGui import QMouseEvent, QMoveEvent
-from PyQt5.QtGui import QFont, QColor
+    def start(self):
+        '''start the renderer thread or process'''
 
-def _thread_func(_raise_window : object, *args, **kwargs):
-    '''wrapper invoke function'''
+        if self._worker is not None:
+            return
 
-    if not callable(_raise_window):
-        return
+        if self._as_sub_module and qt_loaded():
+            from PyQt5.QtWidgets import QApplication
+            if QApplication.instance() is not None:
+                raise RuntimeError(
+                    "a QApplication exists already in this process and windows can only be created in its thread, "
+                    "create Prate with as_sub_module=False to render in a process")
 
-    _app = QApplication(sys.argv)
-    _raise_window(*args, **kwargs)
-    _app.exec_()
+        from prate_qt import _renderer_func
+        if self._as_sub_module:
+            self._worker = threading.Thread(target=_renderer_func, args=(self._pending,), daemon=True)
+        else:
+            self._worker = multiprocessing.Process(target=_renderer_func, args=(self._pending,), daemon=True)
+        self._worker.start()
+        atexit.register(self.stop, 1)
 
-def _invoke_msg_window_as_thread(_craft_window : object, *args, **kwargs):
-    '''start to show tip window
-    @param _craft_window: the window handle function'''
+    def post(self, _craft_window:object, *args):
+        '''post a craft call to the renderer, it would be invoked in the gui thread
+        @param _craft_window: the window handle function, should return the crafted window'''
 
-    _thread = threading.Thread(target=_thread_func, args=(_craft_window, *args, *kwargs))
-    _thread.start()
+        self._pending.put((_craft_window, args))
 
-def _invoke_msg_window_as_process(_craft_window : object, *args, **kwargs):
-    '''start to show tip window
-    @param _craft_window: the window handle function'''
+    def stop(self, timeout:float = None):
+        '''stop the renderer and wait for it
+        @param timeout: the max seconds to wait, None means wait until it is stopped'''
 
-    _process = multiprocessing.Process(target=_thread_func, args=(_craft_window, *args, *kwargs))
-    _process.start()
+        if self._worker is None:
+            return
+        self._pending.put(None)
+        self._worker.join(timeout)
+        self._worker = None
 
 def _lerp(a:float, b:float, p:float) -> float:
     '''linear interpolation
@@ -74,78 +175,611 @@ class EaseFunction:
         c3 = c1 + 1
         return 1 + c3 * math.pow(x - 1, 3) + c1 * math.pow(x - 1, 2)
 
+    @staticmethod
+    def in_quad(x:float) -> float:
+        return x * x
+
+    @staticmethod
+    def out_quad(x:float) -> float:
+        return 1 - (1 - x) * (1 - x)
+
+    @staticmethod
+    def in_out_quad(x:float) -> float:
+        return 2 * x * x if x < 0.5 else 1 - math.pow(-2 * x + 2, 2) / 2
+
+    @staticmethod
+    def in_cubic(x:float) -> float:
+        return x * x * x
+
+    @staticmethod
+    def out_cubic(x:float) -> float:
+        return 1 - math.pow(1 - x, 3)
+
+    @staticmethod
+    def in_out_cubic(x:float) -> float:
+        return 4 * x * x * x if x < 0.5 else 1 - math.pow(-2 * x + 2, 3) / 2
+
+    @staticmethod
+    def in_quart(x:float) -> float:
+        return math.pow(x, 4)
+
+    @staticmethod
+    def out_quart(x:float) -> float:
+        return 1 - math.pow(1 - x, 4)
+
+    @staticmethod
+    def in_out_quart(x:float) -> float:
+        return 8 * math.pow(x, 4) if x < 0.5 else 1 - math.pow(-2 * x + 2, 4) / 2
+
+    @staticmethod
+    def in_quint(x:float) -> float:
+        return math.pow(x, 5)
+
+    @staticmethod
+    def out_quint(x:float) -> float:
+        return 1 - math.pow(1 - x, 5)
+
+    @staticmethod
+    def in_out_quint(x:float) -> float:
+        return 16 * math.pow(x, 5) if x < 0.5 else 1 - math.pow(-2 * x + 2, 5) / 2
+
+    @staticmethod
+    def in_sine(x:float) -> float:
+        return 1 - math.cos(x * math.pi / 2)
+
+    @staticmethod
+    def out_sine(x:float) -> float:
+        return math.sin(x * math.pi / 2)
+
+    @staticmethod
+    def in_out_sine(x:float) -> float:
+        return -(math.cos(math.pi * x) - 1) / 2
+
+    @staticmethod
+    def in_expo(x:float) -> float:
+        return 0 if x <= 0 else math.pow(2, 10 * x - 10)
+
+    @staticmethod
+    def in_out_expo(x:float) -> float:
+        if x <= 0 or x >= 1:
+            return min(1, max(0, x))
+        if x < 0.5:
+            return math.pow(2, 20 * x - 10) / 2
+        return (2 - math.pow(2, -20 * x + 10)) / 2
+
+    @staticmethod
+    def in_circ(x:float) -> float:
+        return 1 - math.sqrt(max(0, 1 - x * x))
+
+    @staticmethod
+    def out_circ(x:float) -> float:
+        return math.sqrt(max(0, 1 - (x - 1) * (x - 1)))
+
+    @staticmethod
+    def in_out_circ(x:float) -> float:
+        if x < 0.5:
+            return (1 - math.sqrt(max(0, 1 - 4 * x * x))) / 2
+        return (math.sqrt(max(0, 1 - math.pow(-2 * x + 2, 2))) + 1) / 2
+
+    @staticmethod
+    def in_back(x:float) -> float:
+        c1 = 1.70158
+        c3 = c1 + 1
+        return c3 * x * x * x - c1 * x * x
+
+    @staticmethod
+    def in_out_back(x:float) -> float:
+        c2 = 1.70158 * 1.525
+        if x < 0.5:
+            return (math.pow(2 * x, 2) * ((c2 + 1) * 2 * x - c2)) / 2
+        return (math.pow(2 * x - 2, 2) * ((c2 + 1) * (x * 2 - 2) + c2) + 2) / 2
+
+    @staticmethod
+    def in_elastic(x:float) -> float:
+        if x <= 0 or x >= 1:
+            return min(1, max(0, x))
+        return -math.pow(2, 10 * x - 10) * math.sin((x * 10 - 10.75) * (2 * math.pi / 3))
+
+    @staticmethod
+    def out_elastic(x:float) -> float:
+        if x <= 0 or x >= 1:
+            return min(1, max(0, x))
+        return math.pow(2, -10 * x) * math.sin((x * 10 - 0.75) * (2 * math.pi / 3)) + 1
+
+    @staticmethod
+    def in_out_elastic(x:float) -> float:
+        if x <= 0 or x >= 1:
+            return min(1, max(0, x))
+        c5 = 2 * math.pi / 4.5
+        if x < 0.5:
+            return -(math.pow(2, 20 * x - 10) * math.sin((20 * x - 11.125) * c5)) / 2
+        return (math.pow(2, -20 * x + 10) * math.sin((20 * x - 11.125) * c5)) / 2 + 1
+
+    @staticmethod
+    def out_bounce(x:float) -> float:
+        n1 = 7.5625
+        d1 = 2.75
+        if x < 1 / d1:
+            return n1 * x * x
+        if x < 2 / d1:
+            x -= 1.5 / d1
+            return n1 * x * x + 0.75
+        if x < 2.5 / d1:
+            x -= 2.25 / d1
+            return n1 * x * x + 0.9375
+        x -= 2.625 / d1
+        return n1 * x * x + 0.984375
+
+    @staticmethod
+    def in_bounce(x:float) -> float:
+        return 1 - EaseFunction.out_bounce(1 - x)
+
+    @staticmethod
+    def in_out_bounce(x:float) -> float:
+        if x < 0.5:
+            return (1 - EaseFunction.out_bounce(1 - 2 * x)) / 2
+        return (1 + EaseFunction.out_bounce(2 * x - 1)) / 2
+
+    @staticmethod
+    def cubic_bezier(x1:float, y1:float, x2:float, y2:float) -> object:
+        '''create a css like cubic-bezier ease function, the curve starts at (0, 0) and ends at (1, 1)
+        @param x1, y1: the first control point, x1 should be in [0, 1]
+        @param x2, y2: the second control point, x2 should be in [0, 1]'''
+
+        # polynomial coefficients of the curve
+        cx = 3 * x1
+        bx = 3 * (x2 - x1) - cx
+        ax = 1 - cx - bx
+        cy = 3 * y1
+        by = 3 * (y2 - y1) - cy
+        ay = 1 - cy - by
+
+        def _bezier(x:float) -> float:
+            if x <= 0 or x >= 1:
+                return min(1, max(0, x))
+
+            # solve t of x with newton's method, fall back to bisection
+            t = x
+            for _ in range(8):
+                error = ((ax * t + bx) * t + cx) * t - x
+                if abs(error) < 1e-7:
+                    return ((ay * t + by) * t + cy) * t
+                slope = (3 * ax * t + 2 * bx) * t + cx
+                if abs(slope) < 1e-6:
+                    break
+                t -= error / slope
+
+            low, high, t = 0.0, 1.0, x
+            while high - low > 1e-7:
+                if ((ax * t + bx) * t + cx) * t < x:
+                    low = t
+                else:
+                    high = t
+                t = (low + high) / 2
+            return ((ay * t + by) * t + cy) * t
+
+        return _bezier
+
+class EaseLUT:
+    '''sample an ease function into a lookup table once, then interpolate from the table, 
+    a batch of progress values can be evaluated at once with numpy if it is installed, 
+    numpy is imported on the first batch'''
+
+    __slots__ = ("function", "size", "_table", "_array")
+
+    def __init__(self, function:object, size:int = 1024):
+        '''init the lookup table
+        @param function: the ease function, takes a progress from 0 to 1
+        @param size: the number of segments of the table'''
+
+        self.function = function
+        self.size = max(1, size)
+        self._table = [function(i / self.size) for i in range(self.size + 1)]
+        self._array = None
+
+    def __call__(self, x:float) -> float:
+        '''get the eased value of progress x by linear interpolation of the table'''
+
+        if x <= 0:
+            return self._table[0]
+        if x >= 1:
+            return self._table[-1]
+        x *= self.size
+        i = int(x)
+        a = self._table[i]
+        return a + (self._table[i + 1] - a) * (x - i)
+
+    def batch(self, values) -> list:
+        '''get the eased values of a batch of progress values, 
+        return a numpy array if numpy is installed, otherwise a list'''
+
+        if _numpy() is None:
+            return [self(x) for x in values]
+        if self._array is None:
+            self._array = numpy.array(self._table, dtype=numpy.float64)
+
+        x = numpy.clip(numpy.asarray(values, dtype=numpy.float64), 0, 1) * self.size
+        i = numpy.minimum(x.astype(numpy.intp), self.size - 1)
+        a = self._array[i]
+        return a + (self._array[i + 1] - a) * (x - i)
+
 class EaseType:
     '''mark ease function'''
 
     LINEAR = 0
     OUT_EXPO = 1
     OUT_BACK = 2
+    IN_QUAD = 3
+    OUT_QUAD = 4
+    IN_OUT_QUAD = 5
+    IN_CUBIC = 6
+    OUT_CUBIC = 7
+    IN_OUT_CUBIC = 8
+    IN_QUART = 9
+    OUT_QUART = 10
+    IN_OUT_QUART = 11
+    IN_QUINT = 12
+    OUT_QUINT = 13
+    IN_OUT_QUINT = 14
+    IN_SINE = 15
+    OUT_SINE = 16
+    IN_OUT_SINE = 17
+    IN_EXPO = 18
+    IN_OUT_EXPO = 19
+    IN_CIRC = 20
+    OUT_CIRC = 21
+    IN_OUT_CIRC = 22
+    IN_BACK = 23
+    IN_OUT_BACK = 24
+    IN_ELASTIC = 25
+    OUT_ELASTIC = 26
+    IN_OUT_ELASTIC = 27
+    IN_BOUNCE = 28
+    OUT_BOUNCE = 29
+    IN_OUT_BOUNCE = 30
 
     __functions = [
         EaseFunction.linear,
         EaseFunction.out_expo,
-        EaseFunction.out_back
+        EaseFunction.out_back,
+        EaseFunction.in_quad,
+        EaseFunction.out_quad,
+        EaseFunction.in_out_quad,
+        EaseFunction.in_cubic,
+        EaseFunction.out_cubic,
+        EaseFunction.in_out_cubic,
+        EaseFunction.in_quart,
+        EaseFunction.out_quart,
+        EaseFunction.in_out_quart,
+        EaseFunction.in_quint,
+        EaseFunction.out_quint,
+        EaseFunction.in_out_quint,
+        EaseFunction.in_sine,
+        EaseFunction.out_sine,
+        EaseFunction.in_out_sine,
+        EaseFunction.in_expo,
+        EaseFunction.in_out_expo,
+        EaseFunction.in_circ,
+        EaseFunction.out_circ,
+        EaseFunction.in_out_circ,
+        EaseFunction.in_back,
+        EaseFunction.in_out_back,
+        EaseFunction.in_elastic,
+        EaseFunction.out_elastic,
+        EaseFunction.in_out_elastic,
+        EaseFunction.in_bounce,
+        EaseFunction.out_bounce,
+        EaseFunction.in_out_bounce,
     ]
 
+    # the names used by animation strings, like "alpha;0.5s;inoutsine;(0, 1)"
+    NAMES = {
+        name.replace("_", ""): index 
+        for index, name in enumerate(function.__name__ for function in __functions)
+    }
+
+    # css keywords, they are cubic-bezier curves
+    KEYWORDS = {
+        "ease": (0.25, 0.1, 0.25, 1),
+        "ease-in": (0.42, 0, 1, 1),
+        "ease-out": (0, 0, 0.58, 1),
+        "ease-in-out": (0.42, 0, 0.58, 1),
+    }
+
+    __luts = {}
+
     @staticmethod
-    def get_method(ease_type:int) -> object:
-        '''get ease function by ease type
-        @param ease_type: the type of ease function
+    def get_method(ease_type) -> object:
+        '''get ease function by ease type, the closed form curves are cheaper to call directly, 
+        cubic bezier curves are solved numerically so they are sampled into lookup tables once
+        @param ease_type: the type of ease function, or a name like "outexpo" or "cubic-bezier(x1, y1, x2, y2)"
         @return: the ease function, if the ease type is invalid, return linear function'''
 
         if callable(ease_type):
             return ease_type
 
-        if ease_type < 0 or ease_type >= len(EaseType.__functions):
+        if isinstance(ease_type, str) and EaseType.parse_bezier(ease_type) is not None:
+            return EaseType.get_table(ease_type)
+        return EaseType.get_function(ease_type)
+
+    @staticmethod
+    def get_table(ease_type) -> EaseLUT:
+        '''get the lookup table of ease type, it is sampled once and can evaluate a batch of progress values
+        @param ease_type: the type of ease function, or a name like "outexpo" or "cubic-bezier(x1, y1, x2, y2)"'''
+
+        lut = EaseType.__luts.get(ease_type)
+        if lut is None:
+            lut = EaseLUT(EaseType.get_function(ease_type))
+            EaseType.__luts[ease_type] = lut
+        return lut
+
+    @staticmethod
+    def get_function(ease_type) -> object:
+        '''get the exact ease function by ease type, without lookup table
+        @param ease_type: the type of ease function, or a name like "outexpo" or "cubic-bezier(x1, y1, x2, y2)"
+        @return: the ease function, if the ease type is invalid, return linear function'''
+
+        if isinstance(ease_type, str):
+            bezier = EaseType.parse_bezier(ease_type)
+            if bezier is not None:
+                return EaseFunction.cubic_bezier(*bezier)
+            ease_type = EaseType.NAMES.get(ease_type.strip().lower(), EaseType.LINEAR)
+
+        if not isinstance(ease_type, int) or ease_type < 0 or ease_type >= len(EaseType.__functions):
             return EaseFunction.linear
         return EaseType.__functions[ease_type]
 
+    @staticmethod
+    def parse_bezier(easestr:str) -> tuple:
+        '''parse "cubic-bezier(x1, y1, x2, y2)" or a css keyword like "ease-in-out", 
+        return None if it is not a valid cubic bezier'''
+
+        easestr = easestr.strip().lower().replace(" ", "")
+        if easestr in EaseType.KEYWORDS:
+            return EaseType.KEYWORDS[easestr]
+        if not easestr.startswith("cubic-bezier(") or not easestr.endswith(")"):
+            return None
+
+        try:
+            points = tuple(float(value) for value in easestr[len("cubic-bezier("):-1].split(","))
+        except ValueError:
+            return None
+        if len(points) != 4 or not 0 <= points[0] <= 1 or not 0 <= points[2] <= 1:
+            return None
+        return points
+
+class TweenProbe:
+    '''the sink of tween instrumentation, override the methods you need and 
+    install it with TweenProbe.install(), nothing is measured while no probe is installed'''
+
+    # the installed probe, the hot paths only check it against None
+    active = None
+
+    @staticmethod
+    def install(probe:"TweenProbe"):
+        '''install a probe for all the frame clocks and animations'''
+
+        TweenProbe.active = probe
+
+    @staticmethod
+    def uninstall():
+        '''remove the installed probe'''
+
+        TweenProbe.active = None
+
+    def on_frame(self, begin:float, cost:float, late:float, dropped:int, active:int):
+        '''called after each tick of a frame clock
+        @param begin: the monotonic time when the tick began, in second
+        @param cost: the time spent in the tick, in second
+        @param late: how much later the tick came than scheduled, in second
+        @param dropped: the number of frames skipped before this tick
+        @param active: the number of animations updated in the tick'''
+
+    def on_tween_start(self, tween:"_TweenBase", at:float):
+        '''called when a tween of an animation starts
+        @param at: the monotonic time, in second'''
+
+    def on_tween_finish(self, tween:"_TweenBase", at:float):
+        '''called when a tween of an animation finishes
+        @param at: the monotonic time, in second'''
+
+    def on_setter(self, name:str):
+        '''called each time a tween calls its setter, like setWindowOpacity'''
+
+class TweenTraceRecorder(TweenProbe):
+    '''record the instrumentation as chrome trace events, 
+    open the exported file with chrome://tracing or https://ui.perfetto.dev'''
 
-class TweenTimer(QObject):
-    '''provide timer based on pyqt5 to implement tween animation'''
+    def __init__(self, max_events:int = 100000):
+        '''init the recorder
+        @param max_events: the oldest events are dropped beyond this'''
 
-    def __init__(self, interval:int = 5) -> None:
+        self.events = deque(maxlen=max_events)
+        self.setter_calls = {}
+        self._frame_setters = {}
+        self._starts = {}
+        self._pid = os.getpid()
+
+    @staticmethod
+    def _us(at:float) -> float:
+        '''convert a monotonic time in second to microsecond'''
+
+        return at * 1e6
+
+    def on_frame(self, begin:float, cost:float, late:float, dropped:int, active:int):
+        tid = threading.get_ident()
+        self.events.append({
+            "name": "tick", "cat": "frame", "ph": "X", "pid": self._pid, "tid": tid,
+            "ts": self._us(begin), "dur": self._us(cost),
+            "args": {"active": active, "late_ms": late * 1000, "dropped": dropped},
+        })
+        if dropped > 0:
+            self.events.append({
+                "name": "dropped frames", "cat": "frame", "ph": "i", "s": "t", "pid": self._pid, "tid": tid,
+                "ts": self._us(begin), "args": {"dropped": dropped},
+            })
+        if len(self._frame_setters) > 0:
+            self.events.append({
+                "name": "setters", "ph": "C", "pid": self._pid, "tid": tid,
+                "ts": self._us(begin), "args": self._frame_setters,
+            })
+            self._frame_setters = {}
+
+    def on_tween_start(self, tween:"_TweenBase", at:float):
+        self._starts[id(tween)] = at
+
+    def on_tween_finish(self, tween:"_TweenBase", at:float):
+        begin = self._starts.pop(id(tween), None)
+        if begin is None:
+            return
+        self.events.append({
+            "name": str(tween), "cat": "tween", "ph": "X", "pid": self._pid, "tid": threading.get_ident(),
+            "ts": self._us(begin), "dur": self._us(at - begin),
+        })
+
+    def on_setter(self, name:str):
+        self.setter_calls[name] = self.setter_calls.get(name, 0) + 1
+        self._frame_setters[name] = self._frame_setters.get(name, 0) + 1
+
+    def to_dict(self) -> dict:
+        '''get the trace in chrome trace event format'''
+
+        return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def export(self, path:str):
+        '''write the trace into a json file'''
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+class TweenTimer:
+    '''drive a tween animation by the shared frame clock of current thread'''
+
+    def __init__(self, interval:int = 5, time_based:bool = True) -> None:
         '''init the tween handle
-        @param update: the update callback function'''
+        @param interval: not used any more, the interval is decided by the frame clock
+        @param time_based: if True, the progress comes from the elapsed time and late frames are skipped, 
+        otherwise the progress comes from the count of ticks'''
 
-        super().__init__(None)
-        self.timer = QTimer(self)
-        self.timer.setInterval(max(1, interval))
-        self.timer.timeout.connect(self._update)
+        from prate_qt import TweenFrameClock
+        self.clock = TweenFrameClock.instance()
+        self.time_based = time_based
         self.__on_update = self.empty_update
+        self.__on_completed = None
+        self.__duration = 0
+        self.__duration_ms = 0
+        self.__tick = 0
+        self.__start = 0
+        self.__paused_at = None
+        self.__chain_from = None
+
+    @property
+    def interval(self) -> int:
+        '''the interval between two updates, in millisecond'''
+
+        return self.clock.interval
 
-    def empty_update(self):
+    def empty_update(self, *args):
         '''empty callback function'''
         pass
 
     def _update(self) -> None:
         '''update the tween animation and wait for it to finish'''
 
+        if self.time_based:
+            self._update_by_time()
+            return
+
         self.__tick += 1
         if self.__tick >= self.__duration:
-            self.timer.stop()
+            self.stop()
+            self.__on_update(self.__duration_ms)
             if self.__on_completed != None and callable(self.__on_completed):
                 self.__on_completed()
             return
-        self.__on_update()
+        self.__on_update(self.__tick * self.interval)
+
+    def _update_by_time(self) -> None:
+        '''update the tween animation with the elapsed time'''
+
+        elapsed = (self.clock.now - self.__start) * 1000
+        if elapsed < self.__duration_ms:
+            self.__on_update(elapsed)
+            return
+
+        self.stop()
+        self.__on_update(self.__duration_ms)
+        if self.__on_completed != None and callable(self.__on_completed):
+            # the next tween starts when this one should end, not when this late frame comes
+            self.__chain_from = self.__start + self.__duration_ms / 1000
+            try:
+                self.__on_completed()
+            finally:
+                self.__chain_from = None
 
     def start(self, update:object, after_done:object = None, duration : int = 1000) -> None:
         '''start the tween animation
-        @param callback: the callback function to update the window
-        @param duration: the duration of the animation, in millisecond
-        @param interval: the interval of the animation, in millisecond'''
+        @param callback: the callback function to update the window, it takes the elapsed time in millisecond,
+        which comes from the count of ticks when not time_based
+        @param duration: the duration of the animation, in millisecond'''
 
         self.__on_update = update if callable(update) else self.empty_update
         
         duration = max(1, duration)
         self.__on_completed = after_done
-        self.__duration = duration // self.timer.interval()
+        self.__duration = duration // self.interval
+        self.__duration_ms = duration
         self.__tick = 0
-        self.timer.start()
+        self.__start = self.clock.now if self.__chain_from is None else self.__chain_from
+        self.__paused_at = None
+        self.clock.register(self)
+
+    def stop(self):
+        '''stop the tween animation'''
+
+        self.clock.unregister(self)
+
+    def pause(self):
+        '''stop updating without losing the progress'''
+
+        if self.__paused_at is None:
+            self.__paused_at = self.clock.now
+            self.clock.unregister(self)
+
+    def resume(self):
+        '''go on updating from the progress where it is paused'''
+
+        if self.__paused_at is not None:
+            self.__start += self.clock.now - self.__paused_at
+            self.__paused_at = None
+            self.clock.register(self)
+
+    @property
+    def elapsed(self) -> float:
+        '''the progress of the running tween, in millisecond'''
+
+        if not self.time_based:
+            return self.__tick * self.interval
+        now = self.clock.now if self.__paused_at is None else self.__paused_at
+        return (now - self.__start) * 1000
+
+    def finish_early(self, remaining:int = 0):
+        '''let the running tween end in at most the remaining time,
+        it ends on a normal tick so no other timer is needed
+        @param remaining: the max time left, in millisecond'''
+
+        if self.time_based:
+            now = self.clock.now if self.__paused_at is None else self.__paused_at
+            self.__start = min(self.__start, now - (self.__duration_ms - max(0, remaining)) / 1000)
+            return
+        self.__tick = max(self.__tick, self.__duration - max(0, remaining) // self.interval)
 
 class _TweenBase:
     '''the specific tween animation'''
 
+    # the attributes of setters which are counted by TweenProbe
+    SETTERS = ()
+
     def __init__(self, duration:int = 2000):
         '''init the tween animation
         @param on_update: the update callback function
@@ -170,7 +804,7 @@ class _TweenBase:
         @param interval: the interval of the animation, in millisecond'''
 
         interval = max(interval , 1)
-        self.__counter = self._duration // interval
+        self.__counter = max(1, self._duration // interval)
         self.__counter_reci = 1 / self.__counter
         self.__tick = 0
         
@@ -194,11 +828,45 @@ class _TweenBase:
             return
         self.on_update(self.__tick * self.__counter_reci)
 
+    @property
+    def tracks(self) -> frozenset:
+        '''the properties this tween sets, named by their setters'''
+
+        return frozenset(self.SETTERS)
+
+    def instrument(self, probe:TweenProbe = None):
+        '''report the setter calls of this tween to a probe
+        @param probe: the probe, None restores the original setters'''
+
+        for attr in self.SETTERS:
+            setter = getattr(self, attr)
+            origin = getattr(setter, "__wrapped__", setter)
+            if probe is None:
+                setattr(self, attr, origin)
+                continue
+
+            def _counted(*args, _origin = origin, _name = getattr(origin, "__name__", attr)):
+                probe.on_setter(_name)
+                return _origin(*args)
+            _counted.__wrapped__ = origin
+            setattr(self, attr, _counted)
+
     def run(self):
         '''run the tween animation'''
 
         self.__update()
 
+    def run_at(self, elapsed:float):
+        '''run the tween animation by the elapsed time
+        @param elapsed: the time since this tween started, in millisecond'''
+
+        if elapsed >= self._duration:
+            self.on_update(1)
+            if self.on_completed != None and callable(self.on_completed):
+                self.on_completed()
+            return
+        self.on_update(elapsed / self._duration)
+
 class _TweenSequence(_TweenBase):
     '''list of tween animation'''
 
@@ -232,17 +900,59 @@ class _TweenSequence(_TweenBase):
         for tween in self.tweens:
             tween.run()
 
+    @property
+    def tracks(self) -> frozenset:
+        '''the properties the tweens set'''
+
+        return frozenset().union(*(tween.tracks for tween in self.tweens))
+
+    def instrument(self, probe:TweenProbe = None):
+        '''report the setter calls of all the tweens to a probe'''
+
+        for tween in self.tweens:
+            tween.instrument(probe)
+
+    def __str__(self):
+        '''get the string of this tween animation'''
+
+        return " | ".join(str(tween) for tween in self.tweens)
+
+    def run_at(self, elapsed:float):
+        '''run all the tweens by the elapsed time'''
+
+        for tween in self.tweens:
+            tween.run_at(elapsed)
+
 
 class TweenAnimation:
-    '''the final control element of the tween'''
+    '''the final control element of the tween, a timeline over the tween list which can be paused,
+    resumed, seeked, reversed and finished while it is playing'''
 
-    def __init__(self, interval:int = 5):
+    def __init__(self, interval:int = 5, time_based:bool = True):
         '''init the tween animation
-        @param interval: the interval of the animation, in millisecond'''
+        @param interval: not used any more, all animations are driven by the shared TweenFrameClock
+        @param time_based: if True, the progress comes from a monotonic clock, late frames are skipped 
+        and durations stay accurate when the event loop is busy'''
 
-        self.__timer = TweenTimer(max(1, interval))
+        self.__timer = TweenTimer(max(1, interval), time_based)
         self.__tweens = list()
 
+        # whether each tween is ready in this play, a tween is ready once so that seeking back 
+        # reuses the positions it started from
+        self.__ready = []
+        # the playing tween, the direction of play and where the tween started from, in millisecond
+        self.__index = -1
+        self.__current = None
+        self.__direction = 1
+        self.__from = 0
+        # the position when nothing is playing
+        self.__rest = 0
+        self.__jump = None
+        self.__paused = False
+        self.__expedited = False
+        self.__on_done = None
+        self.__instrumented = None
+
     def append(self, tween: _TweenBase):
         '''append a new tween to the last of current animation list'''
 
@@ -250,6 +960,16 @@ class TweenAnimation:
             return
         self.__tweens.append(tween)
 
+    @property
+    def time_based(self) -> bool:
+        '''whether the progress comes from the elapsed time instead of the count of ticks'''
+
+        return self.__timer.time_based
+
+    @time_based.setter
+    def time_based(self, value:bool):
+        self.__timer.time_based = value
+
     def append_wait(self, duration:int = 1000):
         '''wait for some seconds'''
 
@@ -282,33 +1002,283 @@ class TweenAnimation:
         self.__tweens.clear()
 
     def play(self, on_animation_done:object = None):
-        '''start to play this animation'''
+        '''start to play this animation
+        @param on_animation_done: called when the animation runs out of its end, or out of its start when reversed'''
 
         if len(self.__tweens) == 0:
             return
-        
-        anim_queue = queue.Queue()
-        for tween in self.__tweens:
-            anim_queue.put(tween)
 
-        def __next():
-            '''callback when a single animation is done'''
+        self.stop()
+        self.__ready = [False] * len(self.__tweens)
+        self.__direction = 1
+        self.__expedited = False
+        self.__on_done = on_animation_done
+        self.__run(0, 0)
+
+    def __run(self, index:int, local:float = 0):
+        '''play the tween at index from local millisecond in the current direction'''
+
+        self.__uninstrument()
+        if index < 0 or index >= len(self.__tweens):
+            self.__current = None
+            self.__index = -1
+            self.__paused = False
+            self.__rest = self.duration if index >= 0 else 0
+            if self.__on_done != None and callable(self.__on_done):
+                self.__on_done()
+            return
 
-            if anim_queue.empty():
-                if on_animation_done != None and callable(on_animation_done):
-                    on_animation_done()
-                return
-            
-            _anim = anim_queue.get()
-            _anim.on_ready(self.__timer.timer.interval())
-            self.__timer.start( _anim.run, __next, _anim.duration)
+        tween = self.__tweens[index]
+        self.__prepare(index)
+        self.__index = index
+        self.__current = tween
+        self.__from = local
+
+        probe = TweenProbe.active
+        if probe is not None:
+            self.__instrumented = tween
+            tween.instrument(probe)
+            probe.on_tween_start(tween, self.__timer.clock.now)
+
+        if self.__direction > 0:
+            self.__timer.start(lambda elapsed: tween.run_at(local + elapsed), self.__advance, tween.duration - local)
+        else:
+            self.__timer.start(lambda elapsed: tween.run_at(max(0, local - elapsed)), self.__advance, local)
 
-        __next()
+    def __advance(self):
+        '''called when the playing tween reaches its end in the current direction'''
+
+        if self.__direction > 0:
+            index = self.__index + 1 if self.__jump is None else self.__jump
+            self.__jump = None
+            self.__run(index, 0)
+            return
+
+        # the tweens skipped by expedite never played, so they are skipped backward as well
+        index = self.__index - 1
+        while index >= 0 and not self.__ready[index]:
+            index -= 1
+        self.__run(index, self.__tweens[index].duration if index >= 0 else 0)
+
+    def __prepare(self, index:int):
+        '''ready the tween at index if it is not ready in this play'''
+
+        if not self.__ready[index]:
+            self.__tweens[index].on_ready(self.__timer.interval)
+            self.__ready[index] = True
+
+    def __uninstrument(self):
+        '''restore the setters of the tween reported to the probe'''
+
+        if self.__instrumented is None:
+            return
+        self.__instrumented.instrument(None)
+        probe = TweenProbe.active
+        if probe is not None:
+            probe.on_tween_finish(self.__instrumented, self.__timer.clock.now)
+        self.__instrumented = None
 
     def stop(self):
-        '''stop the animation'''
+        '''stop the animation, the window stays in the state it is in'''
 
-        self.__timer.timer.stop()
+        self.__rest = self.position
+        self.__timer.stop()
+        self.__uninstrument()
+        self.__current = None
+        self.__index = -1
+        self.__jump = None
+        self.__paused = False
+
+    @property
+    def playing(self) -> bool:
+        '''whether the animation is playing, a paused animation is still playing'''
+
+        return self.__current is not None
+
+    @property
+    def paused(self) -> bool:
+        '''whether the animation is paused'''
+
+        return self.__paused
+
+    @property
+    def reversed(self) -> bool:
+        '''whether the animation plays backward'''
+
+        return self.__direction < 0
+
+    @property
+    def duration(self) -> int:
+        '''get the total duration of the animation, in millisecond'''
+
+        return sum(tween.duration for tween in self.__tweens)
+
+    @property
+    def entry_duration(self) -> int:
+        '''get the duration of the tweens before the first wait, in millisecond'''
+
+        duration = 0
+        for tween in self.__tweens:
+            if isinstance(tween, TweenWait):
+                break
+            duration += tween.duration
+        return duration
+
+    @property
+    def position(self) -> float:
+        '''get the time of the timeline, in millisecond'''
+
+        if self.__current is None:
+            return self.__rest
+        local = min(max(0, self.__from + self.__direction * self.__timer.elapsed), self.__current.duration)
+        return sum(tween.duration for tween in self.__tweens[:self.__index]) + local
+
+    def pause(self) -> bool:
+        '''hold the animation where it is
+        @return: False if it is not playing or already paused'''
+
+        if self.__current is None or self.__paused:
+            return False
+        self.__timer.pause()
+        self.__paused = True
+        return True
+
+    def resume(self) -> bool:
+        '''go on playing from where it is paused
+        @return: False if it is not paused'''
+
+        if self.__current is None or not self.__paused:
+            return False
+        self.__timer.resume()
+        self.__paused = False
+        return True
+
+    def __settle(self, position:float) -> tuple:
+        '''put the window into its state at a time of the timeline, the tweens before are readied in order 
+        if necessary, then only the last tween of each track before the time is applied, no frame is replayed
+        @return: the index of the tween at the time and the time inside it'''
+
+        if len(self.__ready) != len(self.__tweens):
+            self.__ready = [False] * len(self.__tweens)
+
+        index, local, offset = 0, position, 0
+        for index, tween in enumerate(self.__tweens):
+            if position < offset + tween.duration or index == len(self.__tweens) - 1:
+                local = min(position - offset, tween.duration)
+                break
+            offset += tween.duration
+
+        for i in range(index + 1):
+            if not self.__ready[i] and i > 0:
+                # a tween starts from the end state of the previous one
+                self.__tweens[i - 1].run_at(self.__tweens[i - 1].duration)
+            self.__prepare(i)
+
+        tracks = set(self.__tweens[index].tracks)
+        latest = []
+        for i in range(index - 1, -1, -1):
+            tween_tracks = self.__tweens[i].tracks
+            if self.__ready[i] and not tween_tracks.issubset(tracks):
+                latest.append(i)
+                tracks |= tween_tracks
+        for i in reversed(latest):
+            self.__tweens[i].run_at(self.__tweens[i].duration)
+        self.__tweens[index].run_at(local)
+        return index, local
+
+    def seek(self, position:float):
+        '''jump to a time of the timeline, the window gets the state of that time at once,
+        a playing animation goes on from there, otherwise it is paused there until resume()
+        @param position: the time since the start, in millisecond, it is clamped into the timeline'''
+
+        if len(self.__tweens) == 0:
+            return
+
+        was_running = self.__current is not None and not self.__paused
+        self.__timer.stop()
+        index, local = self.__settle(min(max(0, position), self.duration))
+        self.__run(index, local)
+        if not was_running:
+            self.pause()
+
+    def reverse(self) -> bool:
+        '''turn the direction of play where it is, reaching the start when backward calls the done callback too
+        @return: False if the animation is not playing'''
+
+        if self.__current is None:
+            return False
+        local = min(max(0, self.__from + self.__direction * self.__timer.elapsed), self.__current.duration)
+        paused = self.__paused
+        self.__direction = -self.__direction
+        self.__jump = None
+        self.__timer.stop()
+        self.__run(self.__index, local)
+        if paused:
+            self.pause()
+        return True
+
+    def finish(self) -> bool:
+        '''jump to the end of the animation in the current direction, 
+        the window gets the state of the end at once and the done callback is called
+        @return: False if the animation is not playing'''
+
+        if self.__current is None:
+            return False
+        self.__timer.stop()
+        end = self.duration if self.__direction > 0 else 0
+        self.__settle(end)
+        self.__run(len(self.__tweens) if self.__direction > 0 else -1)
+        return True
+
+    def expedite(self, linger:int = 0) -> bool:
+        '''jump to the exit of the animation, which is the tweens after its last wait,
+        a running wait ends after linger, the waits and tweens queued before the exit are skipped,
+        a running tween which is not a wait finishes as usual, so the window does not jump,
+        a paused animation is resumed
+        @param linger: the max time the running wait is kept, in millisecond
+        @return: False if the animation is not playing, reversed or already exiting'''
+
+        if self.__current is None or self.__expedited or self.__direction < 0:
+            return False
+
+        waits = [i for i in range(self.__index + 1, len(self.__tweens)) if isinstance(self.__tweens[i], TweenWait)]
+        if len(waits) > 0:
+            self.__jump = waits[-1] + 1
+        elif not isinstance(self.__current, TweenWait):
+            return False
+
+        self.resume()
+        if isinstance(self.__current, TweenWait):
+            self.__timer.finish_early(linger)
+        self.__expedited = True
+        return True
+
+    def drive(self, times:list, on_frame:object = None):
+        '''play the animation at the given times instead of by the frame clock, used to render it offscreen,
+        each tween ends on its last value before the next one starts
+        @param times: the increasing times since the animation starts, in millisecond
+        @param on_frame: called with each time after the tweens are updated'''
+
+        self.stop()
+        index = -1
+        current = None
+        start = 0
+        for at in times:
+            while True:
+                if current is None:
+                    index += 1
+                    if index >= len(self.__tweens):
+                        break
+                    current = self.__tweens[index]
+                    current.on_ready(self.__timer.interval)
+                if at - start < current.duration:
+                    current.run_at(at - start)
+                    break
+                current.run_at(current.duration)
+                start += current.duration
+                current = None
+            if on_frame != None and callable(on_frame):
+                on_frame(at)
 
     def debug(self):
         '''print the animation list'''
@@ -341,6 +1311,8 @@ class TweenWait(_TweenBase):
 class TweenAlpha(_TweenBase):
     '''control the alpha of target element'''
 
+    SETTERS = ("_alpha_setter",)
+
     @staticmethod
     def to_alpha(alpha_setter:object, from_alpha:float, to_alpha:float, duration:int = 1000, ease_type = EaseType.LINEAR):
         '''create a new tween animation to control the alpha of target element'''
@@ -391,6 +1363,8 @@ class TweenAlpha(_TweenBase):
 class TweenMove(_TweenBase):
     '''control the position of target element'''
 
+    SETTERS = ("_pos_setter",)
+
     @staticmethod
     def to_pos(pos_setter:object, from_pos:tuple, to_pos:tuple, duration:int = 1000, ease_type:int = EaseType.LINEAR):
         '''create a new tween animation to control the position of target element'''
@@ -424,6 +1398,8 @@ class TweenMove(_TweenBase):
 class TweenOffset(_TweenBase):
     '''control the offset of target element'''
 
+    SETTERS = ("_pos_setter",)
+
     @staticmethod
     def offset(pos_setter, pos_getter, offset:tuple, duration:int = 1000, ease_type:int = EaseType.LINEAR):
         '''create a new tween animation to control the offset of target element'''
@@ -452,7 +1428,6 @@ class TweenOffset(_TweenBase):
         super().on_ready(interval)
         self._from_pos = self._pos_getter()
         self._to_pos = (self._from_pos[0] + self._offset[0], self._from_pos[1] + self._offset[1])
-        print("from", self._from_pos, "to", self._to_pos)
 
     def on_update(self, p: float):
         '''update the tween animation'''
@@ -465,6 +1440,8 @@ class TweenOffset(_TweenBase):
 class TweenOffsetFrom(_TweenBase):
     '''move to the target position'''
 
+    SETTERS = ("_pos_setter",)
+
     @staticmethod
     def from_offset(pos_setter, pos_getter, offset:tuple, duration:int = 1000, ease_type:int = EaseType.LINEAR):
         '''create a new tween animation to control the offset of target element'''
@@ -502,71 +1479,308 @@ class TweenOffsetFrom(_TweenBase):
         y = _lerp(self._from_pos[1], self._to_pos[1], t)
         self._pos_setter(int(x), int(y))
 
+class TweenEngine:
+    '''drive a large number of simple tweens at once, a tween is a slot in preallocated columns of 
+    start and end values, start time, duration and ease id instead of an object, 
+    all of them are advanced in one vectorized pass per frame with numpy if it is installed, 
+    otherwise in one loop over array columns, then only the changed values are passed to their setters,
+    an ease is evaluated from its lookup table, a single value is set as a float, a pair as ints like TweenMove'''
+
+    # the serials of tweens are unique across engines, so a stale handle never matches a new tween
+    __serial = itertools.count(1)
+
+    def __init__(self, clock = None, capacity:int = 256, vectorized:bool = None):
+        '''init the engine
+        @param clock: the TweenFrameClock which drives the engine, default to the clock of current thread
+        @param capacity: the number of slots allocated at first, it doubles when they are used up
+        @param vectorized: whether to use numpy, default to True if numpy is installed, it is imported here'''
+
+        if clock is None:
+            from prate_qt import TweenFrameClock
+            clock = TweenFrameClock.instance()
+        self.clock = clock
+        self.vectorized = vectorized is not False and _numpy() is not None
+
+        self._capacity = 0
+        self._count = 0
+        # slots above it are never used, the pass only looks at the slots below
+        self._high = 0
+        self._free = []
+        # the slots released while setters are called, they are not reused until the dispatch ends
+        self._released = []
+        self._dispatching = False
+        self._setters = []
+        self._on_done = []
+        self._serials = []
+
+        # the lookup tables of eases, an ease id is the row of its table
+        self._ease_ids = {}
+        self._luts = []
+        self._tables = None
+
+        self._columns = {}
+        self._grow(max(1, capacity))
+
+    def _column(self, name:str, typecode:str, size:int, fill = 0):
+        '''allocate a column or grow it to the size, new cells are filled with the given value'''
+
+        old = self._columns.get(name)
+        used = 0 if old is None else len(old)
+        if self.vectorized:
+            dtype = {"d": numpy.float64, "l": numpy.intp, "b": numpy.bool_}[typecode]
+            extra = numpy.full(size - used, fill, dtype=dtype)
+            column = extra if old is None else numpy.concatenate((old, extra))
+        else:
+            column = array(typecode, [fill]) * (size - used)
+            if old is not None:
+                column = old + column
+        self._columns[name] = column
+        setattr(self, name, column)
+
+    def _grow(self, capacity:int):
+        '''grow all the columns to the capacity'''
+
+        nan = float("nan")
+        for name, typecode, fill in (
+            ("_from_x", "d", 0), ("_from_y", "d", 0), ("_to_x", "d", 0), ("_to_y", "d", 0),
+            ("_last_x", "d", nan), ("_last_y", "d", nan), ("_start", "d", 0), ("_duration", "d", 1),
+            ("_ease", "l", 0), ("_pair", "b", 0), ("_active", "b", 0),
+        ):
+            self._column(name, typecode, capacity, fill)
+
+        extra = capacity - self._capacity
+        self._setters.extend([None] * extra)
+        self._on_done.extend([None] * extra)
+        self._serials.extend([0] * extra)
+        for slot in range(self._capacity, capacity):
+            heapq.heappush(self._free, slot)
+        self._capacity = capacity
+
+    def __len__(self):
+        '''get the number of running tweens'''
+
+        return self._count
 
-class QtTweenHelper:
-    '''provide some fast api to control the animation of qt element'''
-
-    @staticmethod
-    def fade_out(window:QWidget, duration:int = 1000, ease_type:int = EaseType.LINEAR):
-        '''create a new tween animation to fade out the target element'''
-
-        if window is None:
-            return None
-        return TweenAlpha.fade_out(window.setWindowOpacity, duration, ease_type)
-
-    @staticmethod
-    def fade_in(window:QWidget, duration:int = 1000, ease_type:int = EaseType.LINEAR):
-        '''create a new tween animation to fade in the target element'''
-
-        if window is None:
-            return None
-        return TweenAlpha.fade_in(window.setWindowOpacity, duration, ease_type)
-
-    @staticmethod
-    def move_up_here(window:QWidget, distance:int = 100, duration:int = 1000, ease_type:int = EaseType.LINEAR):
-        '''create a new tween animation to move up the target element'''
-
-        if window is None:
-            return None
-        
-        currentPos = window.pos()
-        x = currentPos.x()
-        y = currentPos.y()
-        return TweenMove.to_pos(window.move, (x, y + distance), (x, y), duration, ease_type)
-    
-    @staticmethod
-    def move_up(window:QWidget, distance:int = 100, duration:int = 1000, ease_type:int = EaseType.LINEAR):
-        '''create a new tween animation to move up the target element'''
-
-        if window is None:
-            return None
-        
-        currentPos = window.pos()
-        x = currentPos.x()
-        y = currentPos.y()
-        return TweenMove.to_pos(window.move, (x, y), (x, y - distance), duration, ease_type)
+    @property
+    def capacity(self) -> int:
+        '''the number of allocated slots'''
+
+        return self._capacity
+
+    def ease_id(self, ease_type) -> int:
+        '''get the id of an ease, its lookup table is added on the first use
+        @param ease_type: the type of ease function, a name like "outexpo" or "cubic-bezier(x1, y1, x2, y2)", or an ease function'''
+
+        ease = self._ease_ids.get(ease_type)
+        if ease is not None:
+            return ease
+
+        lut = EaseLUT(ease_type) if callable(ease_type) else EaseType.get_table(ease_type)
+        ease = len(self._luts)
+        self._luts.append(lut)
+        self._ease_ids[ease_type] = ease
+        if self.vectorized:
+            self._tables = numpy.array([lut._table for lut in self._luts], dtype=numpy.float64)
+        return ease
+
+    def add(self, setter:object, from_value, to_value, duration:int = 1000, ease_type = EaseType.LINEAR, on_done:object = None) -> tuple:
+        '''start a tween, it is advanced from the next frame of the clock
+        @param setter: takes a float if the values are numbers, or two ints if they are pairs like positions
+        @param from_value: the start value, a number or a pair
+        @param to_value: the end value, of the same kind as from_value
+        @param duration: the duration of the tween, in millisecond
+        @param on_done: called without arguments after the end value is set
+        @return: the handle of the tween to cancel it'''
+
+        if len(self._free) == 0:
+            self._grow(self._capacity * 2)
+        slot = heapq.heappop(self._free)
+        pair = isinstance(from_value, (tuple, list))
+
+        self._from_x[slot], self._from_y[slot] = from_value if pair else (from_value, 0)
+        self._to_x[slot], self._to_y[slot] = to_value if pair else (to_value, 0)
+        self._last_x[slot] = self._last_y[slot] = float("nan")
+        self._start[slot] = self.clock.now
+        self._duration[slot] = max(1, duration) / 1000
+        self._ease[slot] = self.ease_id(ease_type)
+        self._pair[slot] = pair
+        self._active[slot] = True
+        self._setters[slot] = setter
+        self._on_done[slot] = on_done
+        serial = next(TweenEngine.__serial)
+        self._serials[slot] = serial
+
+        self._high = max(self._high, slot + 1)
+        self._count += 1
+        if self._count == 1:
+            self.clock.register(self)
+        return (slot, serial)
+
+    def running(self, handle:tuple) -> bool:
+        '''whether the tween of the handle is running'''
+
+        return handle is not None and handle[0] < self._capacity and self._serials[handle[0]] == handle[1]
+
+    def cancel(self, handle:tuple) -> bool:
+        '''stop a tween where it is, its on_done is not called
+        @return: False if it has ended already'''
+
+        if not self.running(handle):
+            return False
+        self._release(handle[0])
+        return True
+
+    def _release(self, slot:int):
+        '''give the slot back, the engine leaves the clock when nothing is running'''
+
+        self._active[slot] = False
+        self._setters[slot] = None
+        self._on_done[slot] = None
+        self._serials[slot] = 0
+        if self._dispatching:
+            self._released.append(slot)
+        else:
+            heapq.heappush(self._free, slot)
+        self._count -= 1
+        if self._count == 0:
+            self._high = 0
+            self.clock.unregister(self)
+
+    def _update(self):
+        '''advance the tweens on a tick of the clock'''
+
+        self.step(self.clock.now)
+
+    def step(self, now:float) -> int:
+        '''advance all the running tweens to a time, then set the changed values and end the finished tweens
+        @param now: the time of the frame, in second of the clock
+        @return: the number of setter calls'''
+
+        if self._count == 0:
+            return 0
+        if self.vectorized:
+            singles, pairs, finished = self._pass_numpy(now)
+        else:
+            singles, pairs, finished = self._pass_array(now)
 
-    @staticmethod
-    def move_down_here(window:QWidget, distance:int = 100, duration:int = 1000, ease_type:int = EaseType.LINEAR):
-        '''create a new tween animation to move down the target element'''
+        probe = TweenProbe.active
+        setters = self._setters
+        calls = 0
+        done = []
+        self._dispatching = True
+        try:
+            for slot, value in singles:
+                setter = setters[slot]
+                # None if it is cancelled by an earlier setter
+                if setter is not None:
+                    if probe is not None:
+                        probe.on_setter(getattr(setter, "__name__", "setter"))
+                    setter(value)
+                    calls += 1
+
+            for slot, x, y in pairs:
+                setter = setters[slot]
+                if setter is not None:
+                    if probe is not None:
+                        probe.on_setter(getattr(setter, "__name__", "setter"))
+                    setter(x, y)
+                    calls += 1
+
+            for slot in finished:
+                if setters[slot] is None:
+                    continue
+                if self._on_done[slot] is not None:
+                    done.append(self._on_done[slot])
+                self._release(slot)
+        finally:
+            self._dispatching = False
+            for slot in self._released:
+                heapq.heappush(self._free, slot)
+            self._released.clear()
+
+        for on_done in done:
+            on_done()
+        return calls
+
+    def _pass_numpy(self, now:float) -> tuple:
+        '''the vectorized pass over the slots in use
+        @return: the (slot, value) of changed numbers, the (slot, x, y) of changed pairs and the finished slots'''
+
+        high = self._high
+        slots = numpy.flatnonzero(self._active[:high])
+        p = numpy.clip((now - self._start[slots]) / self._duration[slots], 0, 1)
+
+        tables = self._tables
+        size = tables.shape[1] - 1
+        position = p * size
+        i = numpy.minimum(position.astype(numpy.intp), size - 1)
+        rows = self._ease[slots]
+        a = tables[rows, i]
+        t = a + (tables[rows, i + 1] - a) * (position - i)
+        # the ends are exact like the ease functions
+        end = p >= 1
+        t[end] = tables[rows[end], size]
+
+        from_x, from_y = self._from_x[slots], self._from_y[slots]
+        x = from_x + (self._to_x[slots] - from_x) * t
+        y = from_y + (self._to_y[slots] - from_y) * t
+        pair = self._pair[slots]
+        x = numpy.where(pair, numpy.trunc(x), x)
+        y = numpy.where(pair, numpy.trunc(y), y)
+
+        changed = (x != self._last_x[slots]) | (y != self._last_y[slots])
+        self._last_x[slots] = x
+        self._last_y[slots] = y
+        single = changed & ~pair
+        changed &= pair
+        return (
+            zip(slots[single].tolist(), x[single].tolist()),
+            zip(slots[changed].tolist(), x[changed].astype(numpy.intp).tolist(), y[changed].astype(numpy.intp).tolist()),
+            slots[end].tolist()
+        )
 
-        if window is None:
-            return None
-        currentPos = window.pos()
-        x = currentPos.x()
-        y = currentPos.y()
-        return TweenMove.to_pos(window.move, (x, y - distance), (x, y), duration, ease_type)
-    
-    @staticmethod
-    def move_down(window:QWidget, distance:int = 100, duration:int = 1000, ease_type:int = EaseType.LINEAR):
-        '''create a new tween animation to move down the target element'''
+    def _pass_array(self, now:float) -> tuple:
+        '''the pass over the slots in use without numpy
+        @return: the (slot, value) of changed numbers, the (slot, x, y) of changed pairs and the finished slots'''
+
+        singles = []
+        pairs = []
+        finished = []
+        tables = [lut._table for lut in self._luts]
+        active, start, duration, ease, pair = self._active, self._start, self._duration, self._ease, self._pair
+        from_x, from_y, to_x, to_y = self._from_x, self._from_y, self._to_x, self._to_y
+        last_x, last_y = self._last_x, self._last_y
+        for slot in range(self._high):
+            if not active[slot]:
+                continue
+
+            # the lookup of EaseLUT without a call
+            table = tables[ease[slot]]
+            p = (now - start[slot]) / duration[slot]
+            if p >= 1:
+                finished.append(slot)
+                t = table[-1]
+            elif p <= 0:
+                t = table[0]
+            else:
+                p *= len(table) - 1
+                i = int(p)
+                t = table[i]
+                t += (table[i + 1] - t) * (p - i)
+
+            x = from_x[slot]
+            x += (to_x[slot] - x) * t
+            if pair[slot]:
+                y = from_y[slot]
+                x, y = int(x), int(y + (to_y[slot] - y) * t)
+                if x != last_x[slot] or y != last_y[slot]:
+                    last_x[slot], last_y[slot] = x, y
+                    pairs.append((slot, x, y))
+            elif x != last_x[slot]:
+                last_x[slot] = x
+                singles.append((slot, x))
+        return singles, pairs, finished
 
-        if window is None:
-            return None
-        currentPos = window.pos()
-        x = currentPos.x()
-        y = currentPos.y()
-        return TweenMove.to_pos(window.move, (x, y), (x, y + distance), duration, ease_type)
 
 class PrateStyleUtils:
 
@@ -594,355 +1808,173 @@ class PrateName:
     Title = "PrateTitle"
     Info = "PrateInfo"
 
-class PrateContentBase(QLabel):
-    '''add overlay to prate content'''
-
-    def __init__(self, parent: QWidget, size: QSize):
-        '''init the prate content'''
-
-        super().__init__(parent)
-        self.setObjectName(PrateName.Content)
-        self.resize(size)
+class PrateAnimationError(ValueError):
+    '''raised when an animation entry of configure is invalid'''
+
+    def __init__(self, index:tuple, token:str, reason:str):
+        '''init the error
+        @param index: the index of the entry, (i,) or (i, j) for an entry inside a group
+        @param token: the invalid token
+        @param reason: why the token is invalid'''
+
+        self.index = index
+        self.token = token
+        self.reason = reason
+        location = "".join(f"[{i}]" for i in index)
+        super().__init__(f"animation{location} {token!r}: {reason}")
+
+class PrateTweenSpec(NamedTuple):
+    '''the typed and validated form of an animation entry like "alpha;0.5s;linear;(0, 1)"'''
+
+    kind: str
+    duration: int
+    ease: int|str = EaseType.LINEAR
+    values: tuple = ()
+
+    def bind(self, window:"QWidget") -> _TweenBase:
+        '''create the tween which controls the window'''
+
+        from prate_qt import PrateWindow
+
+        # a prate window is moved inside its stack slot, and maybe painted by an overlay
+        mover = window.anim_move if isinstance(window, PrateWindow) else window.move
+        if self.kind == "move":
+            return TweenMove(mover, self.values[0], self.values[1], self.duration, self.ease)
+        if self.kind == "wait":
+            return TweenWait(self.duration)
+        if self.kind == "alpha":
+            fader = window.anim_alpha if isinstance(window, PrateWindow) else window.setWindowOpacity
+            return TweenAlpha(fader, self.values[0], self.values[1], self.duration, self.ease)
         
-        self._overlay = QLabel(self)
-        self._overlay.setObjectName(PrateName.Overlay)
-        self._overlay.move(-1, -1)
-        self._overlay.resize(size + QSize(2, 2))
+        pos_getter = PrateAnimationParser.craft_pos_getter(window)
+        if self.kind == "offset":
+            return TweenOffset(mover, pos_getter, self.values, self.duration, self.ease)
+        return TweenOffsetFrom(mover, pos_getter, self.values, self.duration, self.ease)
 
-    @property
-    def overlay(self):
-        return self._overlay
+class PrateAnimationPlan(NamedTuple):
+    '''the compiled animation list of a configure, each step is a tuple of specs which run together, 
+    a window only binds the plan to its setters'''
 
-class PrateContent(PrateContentBase):
-    '''the main content of prate message box'''
+    steps: tuple
 
-    def __init__(self, 
-        parent: QWidget, 
-        size: QSize,
-        has_title = True, 
-        padding = 12, 
-        gap:int = 8, 
-        title_font: QFont = None, 
-        info_font: QFont = None):
-        '''initialize prate main content'''
-
-        super().__init__(parent, size)
-        self._padding_size = QSize(padding * 2, padding * 2)
-        self._padding_offset = QPoint(padding, padding)
-        self._gap = gap
-        self._has_title = has_title
-
-        # about message title
-        if self._has_title:
-            self.title = QLabel(self.overlay)
-            self.title.setObjectName(PrateName.Title)
-            if title_font != None: 
-                self.title.setFont(title_font)
-            self.title.move(self.title_pos)
-            self.title.resize(self.title_size)
-
-        # about message description
-        self.info = QLabel(self.overlay)
-        self.info.setObjectName(PrateName.Info)
-        self.info.setWordWrap(True)
-        self.info.setAlignment(Qt.AlignmentFlag.AlignTop)
-
-        if info_font != None:
-            self.info.setFont(info_font)
-        self.info.move(self.info_pos)
-        self.info.resize(self.info_size)
+    @staticmethod
+    def compile(animation_list) -> "PrateAnimationPlan":
+        '''compile the animation list, raise PrateAnimationError if any entry is invalid'''
+
+        if not isinstance(animation_list, (list, tuple)):
+            raise PrateAnimationError((), animation_list, "the animation should be a list")
+
+        steps = []
+        for i, info in enumerate(animation_list):
+            if isinstance(info, (list, tuple)):
+                if len(info) == 0:
+                    raise PrateAnimationError((i,), info, "empty group")
+                steps.append(tuple(PrateAnimationParser.compile_tween(subinfo, (i, j)) for j, subinfo in enumerate(info)))
+            else:
+                steps.append((PrateAnimationParser.compile_tween(info, (i,)),))
+        return PrateAnimationPlan(tuple(steps))
 
-    @property
-    def title_pos(self):
-        '''get the position of title'''
-
-        return self._padding_offset
-    
-    @property
-    def title_size(self):
-        '''get the size of title'''
-
-        fontMetrics = self.title.fontMetrics()
-        return QSize(self.width() - self._padding_size.width(), fontMetrics.height())
-    
-    @property
-    def info_pos(self):
-        '''get the position of info'''
-
-        if self._has_title:
-            return self.title.pos() + QPoint(0, self.title.height() + self._gap)
-        return self._padding_offset
-    
-    @property
-    def info_size(self):
-        '''get the size of info'''
-
-        if self._has_title:
-            return QSize(self.title.width(), self.height() - self.title.height() - self._padding_size.height() - self._gap)
-        return self.size() - self._padding_size
-        
-    def set_content(self, title, info):
-        '''set title and info'''
-
-        if self._has_title:
-            fontMetrics = self.title.fontMetrics()
-            text = fontMetrics.elidedText(title, Qt.TextElideMode.ElideRight, self.title_size.width())
-            self.title.setText(text)
-
-        fontMetrics = self.info.fontMetrics()
-        lineHeight = fontMetrics.lineSpacing() + fontMetrics.lineWidth()
-        lineCapacity = math.floor(self.info_size.height() / lineHeight)
-        totalWidth = lineCapacity * self.info.width()
-        info = fontMetrics.elidedText(info, Qt.TextElideMode.ElideRight, totalWidth)
-        self.info.setText(info)
-
-class PrateWindow(QWidget):
-    '''provide base window of prate'''
-
-    def __init__(self,
-        window_size = (280, 400),
-        padding = 10,
-        content_padding = 12,
-        content_gap = 8,
-        has_title = True,
-        title_font_name = "Microsoft YaHei",
-        title_font_size = 16,
-        info_font_name = "Microsoft YaHei",
-        info_font_size = 12,
-    ):
-        '''init the window'''
-
-        super().__init__(None)
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-        self.setAttribute(Qt.WA_TranslucentBackground)
-        self.setAttribute(Qt.WA_ShowWithoutActivating)
-        self.resize(*window_size)
-        self._padding_offset = QPoint(padding, padding)
-        self._padding_size = QSize(padding * 2, padding * 2)
-
-        # about content
-        self.content = PrateContent(
-            self, 
-            self.size() - self._padding_size,
-            has_title, 
-            content_padding, 
-            content_gap, 
-            QFont(title_font_name, title_font_size), 
-            QFont(info_font_name, info_font_size)
-        )
-        self.content.move(self._padding_offset)
-        self.content.resize(self.size() - self._padding_size)
-        self.anim = None
-
-    def show_up(self):
-        '''play the animation of the window'''
-
-        if self.anim != None:
-            if self.isHidden():
-                self.show()
-            self.anim.play(self.close)
-    
-    def mouseDoubleClickEvent(self, a0: QMouseEvent) -> None:
-        self.anim.stop()
-        self.close()
-
-    def moveEvent(self, a0: QMoveEvent) -> None:
-        self.setWindowTitle(str(a0.pos().y()))
-        return super().moveEvent(a0)
+    def bind(self, window:"QWidget") -> "TweenAnimation":
+        '''create the animation which controls the window'''
 
-    def set_infos(self, title: str, content:str):
-        '''set the title and content of the window'''
-
-        self.content.set_content(title, content)
-
-    def set_anim(self, anim:TweenAnimation):
-        '''set the animation of the window'''
-
-        if isinstance(anim, TweenAnimation):
-            self.anim = anim
-
-    @property
-    def visible_size(self):
-        '''get the real size of the window'''
+        anim = TweenAnimation()
+        for step in self.steps:
+            if len(step) == 1:
+                anim.append(step[0].bind(window))
+                continue
+            _sequence = _TweenSequence()
+            for spec in step:
+                _sequence.append(spec.bind(window))
+            anim.append(_sequence)
+        return anim
 
-        return self.size() - self._padding_size
+class PrateAnimationParser:
+    '''parse the animation string'''
 
+    # the number of arguments after the tween name
+    TWEENS = {
+        "move": 4,
+        "wait": 1,
+        "alpha": 3,
+        "offset": 3,
+        "offset_from": 3,
+    }
 
-class ScreenPositionUtils:
-    '''provide some utils to get the position of screen'''
+    EASES = EaseType.NAMES
 
     @staticmethod
-    def get_left_bottom(size: QSize, padding: QSize = QSize(12, 12)):
-        
-        screen_size = QApplication.primaryScreen().size()
-        return QPoint(padding.width(), screen_size.height() - size.height() - padding.height())
-    
-    @staticmethod
-    def get_left_top(size: QSize, padding: QSize = QSize(12, 12)):
-        
-        return QPoint(padding.width(), padding.height())
-    
-    @staticmethod
-    def get_right_bottom(size: QSize, padding: QSize = QSize(12, 12)):
-            
-        screen_size = QApplication.primaryScreen().size()
-        return QPoint(screen_size.width() - size.width() - padding.width(), screen_size.height() - size.height() - padding.height())
-    
-    @staticmethod
-    def get_right_top(size: QSize, padding: QSize = QSize(12, 12)):
-        
-        screen_size = QApplication.primaryScreen().size()
-
-        return QPoint(screen_size.width() - size.width() - padding.width(), padding.height())
-    
-    @staticmethod
-    def get_center(size: QSize):
-        
-        screen_size = QApplication.primaryScreen().size()
-        return QPoint((screen_size.width() - size.width()) // 2, (screen_size.height() - size.height()) // 2)
-    
-    @staticmethod
-    def get_top_center(size: QSize, padding: QSize = QSize(12, 12)):
-            
-        screen_size = QApplication.primaryScreen().size()
-        return QPoint((screen_size.width() - size.width()) // 2, padding.height())
-    
-    @staticmethod
-    def get_bottom_center(size: QSize, padding: QSize = QSize(12, 12)):
-            
-        screen_size = QApplication.primaryScreen().size()
-        return QPoint((screen_size.width() - size.width()) // 2, screen_size.height() - size.height() - padding.height())
-    
-    @staticmethod
-    def get_left_center(size: QSize, padding: QSize = QSize(12, 12)):
-                
-        screen_size = QApplication.primaryScreen().size()
-        return QPoint(padding.width(), (screen_size.height() - size.height()) // 2)
-    
-    @staticmethod
-    def get_right_center(size: QSize, padding: QSize = QSize(12, 12)):
-                    
-        screen_size = QApplication.primaryScreen().size()
-        return QPoint(screen_size.width() - size.width() - padding.width(), (screen_size.height() - size.height()) // 2)
-
-class ScreenPosition:
-
-    LeftBottom = "leftbottom"
-    LeftTop = "lefttop"
-    RightBottom = "rightbottom"
-    RightTop = "righttop"
-    Center = "center"
-    CenterTop = "topcenter"
-    CenterBottom = "bottomcenter"
-    CenterLeft = "leftcenter"
-    CenterRight = "rightcenter"
-
-    functions = {
-        LeftBottom: ScreenPositionUtils.get_left_bottom,
-        LeftTop: ScreenPositionUtils.get_left_top,
-        RightBottom: ScreenPositionUtils.get_right_bottom,
-        RightTop: ScreenPositionUtils.get_right_top,
-        Center: ScreenPositionUtils.get_center,
-        CenterTop: ScreenPositionUtils.get_top_center,
-        CenterBottom: ScreenPositionUtils.get_bottom_center,
-        CenterLeft: ScreenPositionUtils.get_left_center,
-        CenterRight: ScreenPositionUtils.get_right_center
-    }
+    def build_animation(window:"QWidget", animation_list) -> TweenAnimation:
+        '''build the animation from an animation list or a compiled plan, 
+        raise PrateAnimationError if the animation list is invalid'''
 
-    def get_pos(size, flag:str, padding:list = (12, 12)):
+        if not isinstance(animation_list, PrateAnimationPlan):
+            animation_list = PrateAnimationPlan.compile(animation_list)
+        return animation_list.bind(window)
 
-        if isinstance(size, list) or isinstance(size, tuple):
-            size = QSize(*size)
+    @staticmethod
+    def build_single_animaion(window:"QWidget", info:str) -> _TweenBase:
+        '''build the animation, return None if the info is invalid'''
 
-        _lower = flag.lower()
-        if _lower in ScreenPosition.functions:
-            return ScreenPosition.functions[_lower](size, QSize(*padding))
-        return QPoint()
+        try:
+            return PrateAnimationParser.compile_tween(info).bind(window)
+        except PrateAnimationError:
+            return None
 
+    @staticmethod
+    def compile_tween(info:str, index:tuple = (0,)) -> PrateTweenSpec:
+        '''compile a single animation entry
+        @param info: the entry, like "offset_from;0.5s;outexpo;(-400, 0)"
+        @param index: the index of the entry, used to report errors'''
 
-class PrateAnimationParser:
-    '''parse the animation string'''
+        if not isinstance(info, str):
+            raise PrateAnimationError(index, info, "the entry should be a string")
 
-    @staticmethod
-    def build_animation(window: QWidget, animation_list) -> TweenAnimation:
-        '''build the animation'''
+        args = [arg.strip() for arg in info.split(";")]
+        tween_name = args[0]
+        if tween_name not in PrateAnimationParser.TWEENS:
+            raise PrateAnimationError(index, tween_name, f"unknown tween, expect one of {', '.join(PrateAnimationParser.TWEENS)}")
 
-        anim = TweenAnimation()
-        for info in animation_list:
-            if isinstance(info, list):
-                _sequence = _TweenSequence()
-                for subinfo in info:
-                    sub_anim = PrateAnimationParser.build_single_animaion(window, subinfo)
-                    _sequence.append(sub_anim)
-                anim.append(_sequence)
-            else:
-                sub_anim = PrateAnimationParser.build_single_animaion(window, info)
-                anim.append(sub_anim)
-        return anim
+        count = PrateAnimationParser.TWEENS[tween_name]
+        if len(args) - 1 != count:
+            raise PrateAnimationError(index, info, f"{tween_name} takes {count} arguments but {len(args) - 1} were given")
 
-    @staticmethod
-    def build_single_animaion(window: QWidget, info:str) -> _TweenBase:
-        '''build the animation'''
+        _duration = PrateAnimationParser.get_time(args[1])
+        if _duration is None or _duration < 0:
+            raise PrateAnimationError(index, args[1], "invalid duration, expect seconds like 0.5s")
+        if tween_name == "wait":
+            return PrateTweenSpec(tween_name, _duration)
 
-        if not isinstance(info, str):return None
+        _ease = PrateAnimationParser.find_ease_type(args[2])
+        if _ease is None:
+            raise PrateAnimationError(index, args[2], "unknown ease, expect a name like outexpo, a css keyword like ease-in-out or cubic-bezier(x1, y1, x2, y2)")
 
-        args = info.split(";")
-        if len(args) < 2:return None
-        
-        tween_name = args[0]
         if tween_name == "move":
-            if len(args) < 5:return None
-            _duration = PrateAnimationParser.get_time(args[1])
-            if _duration is None:return None
-            _ease = PrateAnimationParser.get_ease_type(args[2])
-            _offset = PrateAnimationParser.parse_pos_tuple(args[3])
-            _offset = PrateAnimationParser.parse_pos_tuple(args[4])
-            if _offset is None or _offset is None:
-                return None
-            return TweenMove(window.move, _offset, _offset, _duration, _ease)
-
-        elif tween_name == "wait":
-            _duration = PrateAnimationParser.get_time(args[1])
-            if _duration is None:
-                return None
-            return TweenWait(_duration)
-        
-        elif tween_name == "alpha":
-            if len(args) < 4:return None
-            _duration = PrateAnimationParser.get_time(args[1])
-            if _duration is None:return None
-            _ease = PrateAnimationParser.get_ease_type(args[2])
-            _offset = PrateAnimationParser.parse_alpha_tuple(args[3])
-            if _offset is None:return None
-            return TweenAlpha(window.setWindowOpacity, _offset[0], _offset[1], _duration, _ease)
-        
-        elif tween_name == "offset":
-            if len(args) < 4:return None
-            _duration = PrateAnimationParser.get_time(args[1])
-            if _duration is None:return None
-            _ease = PrateAnimationParser.get_ease_type(args[2])
-            _offset = PrateAnimationParser.parse_pos_tuple(args[3])
-            if _offset is None:return None
-            pos_getter = PrateAnimationParser.craft_pos_getter(window)
-            return TweenOffset(window.move, pos_getter, _offset, _duration, _ease)
-        
-        elif tween_name == "offset_from":
-            '''to the target pos'''
-
-            if len(args) < 4:return None
-            _duration = PrateAnimationParser.get_time(args[1])
-            if _duration is None:return None
-            _ease = PrateAnimationParser.get_ease_type(args[2])
-            _offset = PrateAnimationParser.parse_pos_tuple(args[3])
-            if _offset is None:return None
-            pos_getter = PrateAnimationParser.craft_pos_getter(window)
-            return TweenOffsetFrom(window.move, pos_getter, _offset, _duration, _ease)
-        
-        return None
-    
-    def craft_pos_getter(window:QWidget):
+            _from = PrateAnimationParser.parse_pos_tuple(args[3])
+            _to = PrateAnimationParser.parse_pos_tuple(args[4])
+            for token, pos in ((args[3], _from), (args[4], _to)):
+                if pos is None or len(pos) != 2:
+                    raise PrateAnimationError(index, token, "invalid position, expect (x, y)")
+            return PrateTweenSpec(tween_name, _duration, _ease, (_from, _to))
+
+        if tween_name == "alpha":
+            _alpha = PrateAnimationParser.parse_alpha_tuple(args[3])
+            if _alpha is None or len(_alpha) != 2:
+                raise PrateAnimationError(index, args[3], "invalid alpha, expect (from, to)")
+            return PrateTweenSpec(tween_name, _duration, _ease, _alpha)
+
+        _offset = PrateAnimationParser.parse_pos_tuple(args[3])
+        if _offset is None or len(_offset) != 2:
+            raise PrateAnimationError(index, args[3], "invalid offset, expect (x, y)")
+        return PrateTweenSpec(tween_name, _duration, _ease, _offset)
+
+    def craft_pos_getter(window:"QWidget"):
         '''craft the position getter'''
 
+        from prate_qt import PrateWindow
+
+        if isinstance(window, PrateWindow):
+            return window.anim_pos
+
         def pos_getter():
             return (window.x(), window.y())
         return pos_getter
@@ -961,16 +1993,22 @@ class PrateAnimationParser:
         '''get the ease type from string
         @param easestr: the ease type string'''
 
-        if easestr.lower() == "linear":
-            return EaseType.LINEAR
-        
-        if easestr.lower() == "outexpo":
-            return EaseType.OUT_EXPO
-        
-        if easestr.lower() == "outback":
-            return EaseType.OUT_BACK
+        _ease = PrateAnimationParser.find_ease_type(easestr)
+        return EaseType.LINEAR if _ease is None else _ease
+
+    def find_ease_type(easestr:str) -> int|str:
+        '''get the ease type from string, return None if it is unknown
+        @param easestr: the ease type string, a name like "outexpo" or "cubic-bezier(x1, y1, x2, y2)"
+        @return: the ease type, a cubic bezier curve is returned as its normalized string'''
+
+        _ease = PrateAnimationParser.EASES.get(easestr.strip().lower())
+        if _ease is not None:
+            return _ease
         
-        return EaseType.LINEAR
+        bezier = EaseType.parse_bezier(easestr)
+        if bezier is None:
+            return None
+        return f"cubic-bezier({', '.join(f'{value:g}' for value in bezier)})"
     
     def get_float(floatstr:str) -> float:
         '''get the float from string
@@ -1001,11 +2039,6 @@ class PrateAnimationParser:
         except Exception:
             return None
 
-
-
-
-
-
 class PrateWindowAppearanceConfigure:
     '''configure the appearance of prate window'''
 
@@ -1018,75 +2051,20 @@ class PrateWindowAppearanceConfigure:
     def save(style, filepath):
         '''save style to json'''
 
-        configure = {}
-        configure.setdefault("name", style.name)
-        configure.setdefault("window-size", style.window_size)
-        configure.setdefault("screen-pos", style.screen_pos)
-        configure.setdefault("screen-padding", style.screen_padding)
-        configure.setdefault("border-radius", style.border_radius)
-        configure.setdefault("background-image", style.background_image)
-        configure.setdefault("overlay-color", style.overlay_color)
-        configure.setdefault("title-color", style.title_color)
-        configure.setdefault("info-color", style.info_color)
-        configure.setdefault("padding", style.padding)
-        configure.setdefault("content-padding", style.content_padding)
-        configure.setdefault("content-gap", style.content_gap)
-        configure.setdefault("has-title", style.has_title)
-        configure.setdefault("title-font-name", style.title_font_name)
-        configure.setdefault("title-font-size", style.title_font_size)
-        configure.setdefault("title-font-style", style.title_font_style)
-        configure.setdefault("title-font-bold", style.title_font_bold)
-        configure.setdefault("info-font-name", style.info_font_name)
-        configure.setdefault("info-font-size", style.info_font_size)
-        configure.setdefault("info-font-style", style.info_font_style)
-        configure.setdefault("info-font-bold", style.info_font_bold)
-        configure.setdefault("shadow-blur-radius", style.shadow_blur_radius)
-        configure.setdefault("shadow-x-offset", style.shadow_x_offset)
-        configure.setdefault("shadow-y-offset", style.shadow_y_offset)
-        configure.setdefault("shadow-color", style.shadow_color)
-        configure.setdefault("animation", style.animation)
-
         with open(filepath, "w", encoding='utf-8') as file:
-            file.write(json.dumps(configure, indent=4))
+            file.write(json.dumps(style.to_dict(), indent=4))
 
     @staticmethod
     def read(filepath):
-        '''read style from json'''
+        '''read style from json, the fields are validated by PrateThemeSchema and missing ones take their defaults
+        @return: the configure, None if the json is not a valid theme, the reason is printed'''
 
         with open(filepath, "r", encoding='utf-8') as file:
             configure = json.loads(file.read())
 
         try:
-            return PrateWindowAppearanceConfigure(
-                configure["name"],
-                configure["window-size"],
-                configure["screen-pos"],
-                configure["screen-padding"],
-                configure["border-radius"],
-                configure["background-image"],
-                configure["overlay-color"],
-                configure["title-color"],
-                configure["info-color"],
-                configure["padding"],
-                configure["content-padding"],
-                configure["content-gap"],
-                configure["has-title"],
-                configure["title-font-name"],
-                configure["title-font-size"],
-                configure["title-font-bold"],
-                configure["title-font-style"],
-
-                configure["info-font-name"],
-                configure["info-font-size"],
-                configure["info-font-bold"],
-                configure["info-font-style"],
-                configure["shadow-blur-radius"],
-                configure["shadow-x-offset"],
-                configure["shadow-y-offset"],
-                configure["shadow-color"],
-                configure["animation"]
-            )
-        except Exception as e:
+            return PrateThemeSchema.validate(configure, filepath)
+        except PrateThemeError as e:
             print(e)
             return None
 
@@ -1147,19 +2125,27 @@ class PrateWindowAppearanceConfigure:
         shadow_x_offset:int = 2,
         shadow_y_offset:int = 2,
         shadow_color:list = [ 0, 0, 0, 100 ],
+        snapshot:bool = False,
+        overlay:bool = False,
+        hover_hold:bool = False,
         animation = [
             [
-                "move;0.5s;linear;(100, 0)",
+                "offset_from;0.5s;linear;(100, 0)",
                 "alpha;0.5s;linear;(0, 1)"
             ],
             "wait;4s",
             [
-                "move;0.5s;linear;(-100, 0)",
+                "offset;0.5s;linear;(-100, 0)",
                 "alpha;0.5s;linear;(1, 0)"
             ]
         ]
     ):
-        '''init the configure'''
+        '''init the configure
+        @param snapshot: if True, each window rasterizes its content once and only animates the pixmap,
+        the shadow effect is not rendered again on every frame
+        @param overlay: if True, windows are not shown by themselves, one overlay window of the screen anchor
+        paints all of them, it implies the snapshot mode and the windows can not be clicked
+        @param hover_hold: if True, the animation of a window is paused while the cursor is on it'''
 
         self.name = name
         self.window_size = window_size
@@ -1192,20 +2178,98 @@ class PrateWindowAppearanceConfigure:
         self.shadow_x_offset = shadow_x_offset
         self.shadow_y_offset = shadow_y_offset
         self.shadow_color = shadow_color
+        self.snapshot = snapshot
+        self.overlay = overlay
+        self.hover_hold = hover_hold
         self.animation = animation
 
-    def craft_window(self, debug = False):
-        '''craft the window'''
+    def __setattr__(self, name, value):
+        '''drop the cached fingerprint when a public field changes, 
+        and compile the animation list as soon as it is set'''
 
-        if debug:
-            print("using configure: ", self.name, "to craft window")
+        if name == "animation":
+            plan = PrateAnimationPlan.compile(value)
+            super().__setattr__("_animation_plan", plan)
 
-        qss = f'''
-#{PrateName.Content}{{
-    border-radius: {self.border_radius}px;
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            super().__setattr__("_fingerprint", None)
+
+    def invalidate(self):
+        '''drop the cached fingerprint and recompile the animation list, 
+        call it after changing a field in place, for example appending to the animation list'''
+
+        self.animation = self.animation
+
+    @property
+    def animation_plan(self) -> PrateAnimationPlan:
+        '''the compiled animation list'''
+
+        return self._animation_plan
+
+    def to_dict(self) -> dict:
+        '''get the json fields of this configure'''
+
+        configure = {}
+        configure.setdefault("name", self.name)
+        configure.setdefault("window-size", self.window_size)
+        configure.setdefault("screen-pos", self.screen_pos)
+        configure.setdefault("screen-padding", self.screen_padding)
+        configure.setdefault("border-radius", self.border_radius)
+        configure.setdefault("background-image", self.background_image)
+        configure.setdefault("overlay-color", self.overlay_color)
+        configure.setdefault("title-color", self.title_color)
+        configure.setdefault("info-color", self.info_color)
+        configure.setdefault("padding", self.padding)
+        configure.setdefault("content-padding", self.content_padding)
+        configure.setdefault("content-gap", self.content_gap)
+        configure.setdefault("has-title", self.has_title)
+        configure.setdefault("title-font-name", self.title_font_name)
+        configure.setdefault("title-font-size", self.title_font_size)
+        configure.setdefault("title-font-style", self.title_font_style)
+        configure.setdefault("title-font-bold", self.title_font_bold)
+        configure.setdefault("info-font-name", self.info_font_name)
+        configure.setdefault("info-font-size", self.info_font_size)
+        configure.setdefault("info-font-style", self.info_font_style)
+        configure.setdefault("info-font-bold", self.info_font_bold)
+        configure.setdefault("shadow-blur-radius", self.shadow_blur_radius)
+        configure.setdefault("shadow-x-offset", self.shadow_x_offset)
+        configure.setdefault("shadow-y-offset", self.shadow_y_offset)
+        configure.setdefault("shadow-color", self.shadow_color)
+        configure.setdefault("snapshot", self.snapshot)
+        configure.setdefault("overlay", self.overlay)
+        configure.setdefault("hover-hold", self.hover_hold)
+        configure.setdefault("animation", self.animation)
+        return configure
+
+    @property
+    def fingerprint(self) -> str:
+        '''the content hash of this configure, used as the key of compiled theme'''
+
+        if self._fingerprint is None:
+            content = json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False)
+            self._fingerprint = hashlib.sha1(content.encode("utf-8")).hexdigest()
+        return self._fingerprint
+
+    def compile(self) -> "PrateCompiledTheme":
+        '''get the compiled theme of this configure, must be called in the gui thread'''
+
+        from prate_qt import PrateThemeCache
+        return PrateThemeCache.get(self)
+
+    def build_qss(self) -> str:
+        '''build the style sheet of the window'''
+
+        background = ""
+        if self.background_image is not None:
+            background = f"""
     background-image: url({self.background_image});
     background-repeat: no-repeat;
-    background-position: center;
+    background-position: center;"""
+
+        return f'''
+#{PrateName.Content}{{
+    border-radius: {self.border_radius}px;{background}
 }}
 #{PrateName.Overlay}{{
     border-radius: {self.border_radius}px;
@@ -1223,57 +2287,822 @@ class PrateWindowAppearanceConfigure:
 }}
         '''
 
-        # print(qss)
+    def craft_window(self, debug = False):
+        '''craft the window'''
 
-        shadowColor = QColor(*self.shadow_color)
-        shadow = QGraphicsDropShadowEffect(blurRadius=self.shadow_blur_radius, xOffset=self.shadow_x_offset, yOffset=self.shadow_y_offset, color=shadowColor)
+        if debug:
+            print("using configure: ", self.name, "to craft window")
+
+        from prate_qt import PrateWindow, PrateOverlay
+
+        theme = self.compile()
         window = PrateWindow(
-            window_size=tuple(self.window_size),
-            padding=self.padding,
-            content_padding=self.content_padding,
-            content_gap=self.content_gap,
-            has_title=self.has_title,
-            title_font_name=self.title_font_name,
-            title_font_size=self.title_font_size,
-            info_font_name=self.info_font_name,
-            info_font_size=self.info_font_size
+            window_size=theme.window_size,
+            padding=theme.padding,
+            content_padding=theme.content_padding,
+            content_gap=theme.content_gap,
+            has_title=theme.has_title,
+            title_font=theme.title_font,
+            info_font=theme.info_font
         )
-        window.setStyleSheet(qss)
-        window.content.setGraphicsEffect(shadow)
-        window.move(ScreenPosition.get_pos(window.size(), self.screen_pos, self.screen_padding))
-        _anim = PrateAnimationParser.build_animation(window, self.animation)
+        window.setObjectName(theme.install())
+        window.content.setGraphicsEffect(theme.craft_shadow())
+        window.set_home_pos(theme.home_pos)
+        window.reset()
+        window.theme_key = theme.key
+        window.set_snapshot_mode(theme.snapshot)
+        window.hover_hold = theme.hover_hold
+        if theme.overlay:
+            window.set_overlay(PrateOverlay.of(self.screen_pos, self.screen_padding))
+        _anim = theme.plan.bind(window)
         if debug : _anim.debug()
         window.set_anim(_anim)
         return window
 
+class PrateThemeError(ValueError):
+    '''raised when a theme does not match the schema or is not registered'''
+
+    def __init__(self, source:str, key:str, reason:str):
+        '''init the error
+        @param source: the file, or the file and the name of a theme inside a bundle
+        @param key: the json field which is invalid, None if it is about the whole theme
+        @param reason: why it is invalid'''
+
+        self.source = source
+        self.key = key
+        self.reason = reason
+        location = f"{source}: " if source else ""
+        field = f"{key!r} " if key is not None else ""
+        super().__init__(f"{location}{field}{reason}")
+
+class PrateThemeSchema:
+    '''the schema of theme json, every field is optional and takes the default of PrateWindowAppearanceConfigure,
+    unknown fields and values of a wrong type are reported with the name of the field'''
+
+    ANCHORS = ("leftbottom", "lefttop", "rightbottom", "righttop", "center", "topcenter", "bottomcenter", "leftcenter", "rightcenter")
+
+    @staticmethod
+    def check_str(value) -> str:
+        if not isinstance(value, str):
+            return f"should be a string, not {value!r}"
+
+    @staticmethod
+    def check_optional_str(value) -> str:
+        if value is not None and not isinstance(value, str):
+            return f"should be a string or null, not {value!r}"
+
+    @staticmethod
+    def check_bool(value) -> str:
+        if not isinstance(value, bool):
+            return f"should be true or false, not {value!r}"
+
+    @staticmethod
+    def check_int(value) -> str:
+        if isinstance(value, bool) or not isinstance(value, int):
+            return f"should be an int, not {value!r}"
+
+    @staticmethod
+    def check_positive(value) -> str:
+        if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+            return f"should be an int above 0, not {value!r}"
+
+    @staticmethod
+    def check_size(value) -> str:
+        if not isinstance(value, (list, tuple)) or len(value) != 2 or PrateThemeSchema.check_positive(value[0]) or PrateThemeSchema.check_positive(value[1]):
+            return f"should be [width, height] of ints above 0, not {value!r}"
+
+    @staticmethod
+    def check_padding(value) -> str:
+        if PrateThemeSchema.check_int(value) is None:
+            return None
+        if not isinstance(value, (list, tuple)) or len(value) != 2 or PrateThemeSchema.check_int(value[0]) or PrateThemeSchema.check_int(value[1]):
+            return f"should be an int or [x, y] of ints, not {value!r}"
+
+    @staticmethod
+    def check_anchor(value) -> str:
+        if not isinstance(value, str) or value.lower() not in PrateThemeSchema.ANCHORS:
+            return f"should be one of {', '.join(PrateThemeSchema.ANCHORS)}, not {value!r}"
+
+    @staticmethod
+    def check_rgba(value) -> str:
+        if not isinstance(value, (list, tuple)) or len(value) not in (3, 4) or \
+            any(PrateThemeSchema.check_int(channel) or not 0 <= channel <= 255 for channel in value):
+            return f"should be [r, g, b] or [r, g, b, a] of ints in 0-255, not {value!r}"
+
+    @staticmethod
+    def check_list(value) -> str:
+        if not isinstance(value, list):
+            return f"should be a list, not {value!r}"
+
+    # json field -> (argument of PrateWindowAppearanceConfigure, check)
+    FIELDS = {
+        "name": ("name", check_str),
+        "window-size": ("window_size", check_size),
+        "screen-pos": ("screen_pos", check_anchor),
+        "screen-padding": ("screen_padding", check_padding),
+        "border-radius": ("border_radius", check_int),
+        "background-image": ("background_image", check_optional_str),
+        "overlay-color": ("overlay_color", check_str),
+        "title-color": ("title_color", check_str),
+        "info-color": ("info_color", check_str),
+        "padding": ("padding", check_int),
+        "content-padding": ("content_padding", check_int),
+        "content-gap": ("content_gap", check_int),
+        "has-title": ("has_title", check_bool),
+        "title-font-name": ("title_font_name", check_str),
+        "title-font-size": ("title_font_size", check_positive),
+        "title-font-bold": ("title_font_bold", check_bool),
+        "title-font-style": ("title_font_style", check_str),
+        "info-font-name": ("info_font_name", check_str),
+        "info-font-size": ("info_font_size", check_positive),
+        "info-font-bold": ("info_font_bold", check_bool),
+        "info-font-style": ("info_font_style", check_str),
+        "shadow-blur-radius": ("shadow_blur_radius", check_int),
+        "shadow-x-offset": ("shadow_x_offset", check_int),
+        "shadow-y-offset": ("shadow_y_offset", check_int),
+        "shadow-color": ("shadow_color", check_rgba),
+        "snapshot": ("snapshot", check_bool),
+        "overlay": ("overlay", check_bool),
+        "hover-hold": ("hover_hold", check_bool),
+        "animation": ("animation", check_list),
+    }
+
+    @staticmethod
+    def validate(data:dict, source:str = "") -> PrateWindowAppearanceConfigure:
+        '''validate the json object of a theme and create its configure
+        @param source: where the theme comes from, used in the errors
+        @return: the configure, raise PrateThemeError if the theme is invalid'''
+
+        if not isinstance(data, dict):
+            raise PrateThemeError(source, None, f"a theme should be a json object, not {type(data).__name__}")
+
+        arguments = {}
+        for key, value in data.items():
+            field = PrateThemeSchema.FIELDS.get(key)
+            if field is None:
+                raise PrateThemeError(source, key, f"is not a theme field, expect one of {', '.join(PrateThemeSchema.FIELDS)}")
+            argument, check = field
+            reason = check(value)
+            if reason is not None:
+                raise PrateThemeError(source, key, reason)
+            arguments[argument] = value
+
+        try:
+            return PrateWindowAppearanceConfigure(**arguments)
+        except PrateAnimationError as e:
+            location = "".join(f"[{i}]" for i in e.index)
+            raise PrateThemeError(source, "animation", f"{location} {e.token!r}: {e.reason}") from e
+
+class PrateThemeRegistry:
+    '''the themes by name, loaded once from theme files, bundles or directories and validated by PrateThemeSchema,
+    with a cache directory the validated themes of a file are pickled, so they are loaded again
+    without parsing the json until the file changes, thread safe to read after loading'''
+
+    # bump it when the schema or configure changes, caches of other versions are ignored
+    CACHE_VERSION = 2
+
+    __shared = None
+    __lock = threading.Lock()
+
+    @staticmethod
+    def shared() -> "PrateThemeRegistry":
+        '''get the registry of current process, Prate looks themes up in it by default'''
+
+        with PrateThemeRegistry.__lock:
+            if PrateThemeRegistry.__shared is None:
+                PrateThemeRegistry.__shared = PrateThemeRegistry()
+            return PrateThemeRegistry.__shared
+
+    def __init__(self, cache_dir:str = None):
+        '''init the registry
+        @param cache_dir: the directory of the pickled themes, None means no cache'''
+
+        self.cache_dir = cache_dir
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._themes = {}
+
+    def __contains__(self, name:str) -> bool:
+        return name in self._themes
+
+    def __len__(self):
+        return len(self._themes)
+
+    @property
+    def names(self) -> list:
+        '''get the names of all registered themes'''
+
+        return list(self._themes)
+
+    def register(self, name:str, configure:PrateWindowAppearanceConfigure):
+        '''register a theme by hand'''
+
+        self._themes[name] = configure
+
+    def get(self, name:str) -> PrateWindowAppearanceConfigure:
+        '''get a theme by name, raise PrateThemeError if it is not registered'''
+
+        configure = self._themes.get(name)
+        if configure is None:
+            raise PrateThemeError("", name, f"is not a registered theme, expect one of {', '.join(self._themes) or 'nothing'}")
+        return configure
+
+    def load(self, path:str) -> list:
+        '''load a theme file, a bundle, or all the json files of a directory,
+        a theme file is named after the file, like "dark" of dark.json,
+        a bundle is a json object like {"themes": {"dark": {...}, "white": {...}}}
+        @return: the names of loaded themes, raise PrateThemeError if any theme is invalid'''
+
+        if os.path.isdir(path):
+            names = []
+            for entry in sorted(os.listdir(path)):
+                if entry.endswith(".json"):
+                    names.extend(self.load(os.path.join(path, entry)))
+            return names
+
+        # taken before parsing, so a change during parsing is seen by the next load
+        signature = PrateThemeWatcher._signature(path)
+        themes = self._load_cache(path, signature)
+        if themes is None:
+            themes = PrateThemeRegistry.parse(path)
+            self._save_cache(path, signature, themes)
+        self._themes.update(themes)
+        return list(themes)
+
+    @staticmethod
+    def parse(path:str) -> dict:
+        '''parse and validate a theme file or a bundle
+        @return: the configures by name'''
+
+        with open(path, "r", encoding="utf-8") as file:
+            try:
+                data = json.load(file)
+            except json.JSONDecodeError as e:
+                raise PrateThemeError(path, None, f"invalid json at line {e.lineno} column {e.colno}, {e.msg}") from e
+
+        if isinstance(data, dict) and "themes" in data:
+            themes = data["themes"]
+            if not isinstance(themes, dict):
+                raise PrateThemeError(path, "themes", "should be an object of names to themes")
+            return {name: PrateThemeSchema.validate(theme, f"{path}#{name}") for name, theme in themes.items()}
+        return {os.path.splitext(os.path.basename(path))[0]: PrateThemeSchema.validate(data, path)}
+
+    def _cache_path(self, path:str) -> str:
+        '''get the pickle file of a theme file'''
+
+        digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.pickle")
+
+    def _load_cache(self, path:str, signature:tuple) -> dict:
+        '''load the themes of a file from the cache, None if the cache is missing or out of date'''
+
+        if self.cache_dir is None or signature is None:
+            return None
+        try:
+            with open(self._cache_path(path), "rb") as file:
+                cached = pickle.load(file)
+        except Exception:
+            self.cache_misses += 1
+            return None
+        if cached.get("version") != PrateThemeRegistry.CACHE_VERSION or cached.get("signature") != signature:
+            self.cache_misses += 1
+            return None
+        self.cache_hits += 1
+        return cached["themes"]
+
+    def _save_cache(self, path:str, signature:tuple, themes:dict):
+        '''pickle the themes of a file, a cache which can not be written is skipped'''
+
+        if self.cache_dir is None or signature is None:
+            return
+        cache_path = self._cache_path(path)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, "wb") as file:
+                pickle.dump({"version": PrateThemeRegistry.CACHE_VERSION, "signature": signature, "themes": themes}, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass
+
+class PrateThemeWatcher:
+    '''watch theme json files and reload the changed ones in a background thread, a file is validated
+    by reading it and compiling its animation list, a file which fails is reported and the previous theme is kept,
+    the callbacks are called in the watcher thread, so they should hand the configure over to the renderer themselves'''
+
+    def __init__(self, interval:float = 1.0):
+        '''init the watcher
+        @param interval: the seconds between two checks of the files'''
+
+        self.interval = interval
+        self.reloads = 0
+        self.errors = 0
+        self.last_error = None
+
+        # path -> [signature of the file, callbacks]
+        self._files = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _signature(path:str) -> tuple:
+        '''get the modified time and size of a file, None if it can not be read'''
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def watch(self, path:str, on_reload:object):
+        '''watch a theme file, changes after this call are reported
+        @param on_reload: called with the reloaded PrateWindowAppearanceConfigure'''
+
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._files.setdefault(path, [PrateThemeWatcher._signature(path), []])
+            entry[1].append(on_reload)
+
+    def unwatch(self, path:str):
+        '''stop watching a theme file'''
+
+        with self._lock:
+            self._files.pop(os.path.abspath(path), None)
+
+    def check(self) -> int:
+        '''check the files once and reload the changed ones
+        @return: the number of files which are reloaded'''
+
+        with self._lock:
+            changed = []
+            for path, entry in self._files.items():
+                signature = PrateThemeWatcher._signature(path)
+                if signature is not None and signature != entry[0]:
+                    entry[0] = signature
+                    changed.append((path, list(entry[1])))
+
+        reloaded = 0
+        for path, callbacks in changed:
+            error = "invalid theme"
+            try:
+                configure = PrateWindowAppearanceConfigure.read(path)
+            except Exception as e:
+                configure = None
+                error = str(e)
+            if configure is None:
+                # the file may be saved halfway, the previous theme is kept until the next change
+                self.errors += 1
+                self.last_error = f"{path}: {error}"
+                print(f"failed to reload theme {self.last_error}")
+                continue
+
+            self.last_error = None
+            self.reloads += 1
+            reloaded += 1
+            for on_reload in callbacks:
+                on_reload(configure)
+        return reloaded
+
+    def _run(self):
+        '''check the files until the watcher is stopped'''
+
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def start(self):
+        '''start the watcher thread'''
+
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="prate-theme-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''stop the watcher thread'''
+
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def stats(self) -> dict:
+        '''get the number of reloads and errors'''
+
+        return {"reloads": self.reloads, "errors": self.errors, "last_error": self.last_error}
+
+class PrateHandle:
+    '''the handle of a message, its futures are resolved by the renderer 
+    when the message is shown and when it is dismissed, they can be awaited in asyncio'''
+
+    __slots__ = ("message", "shown", "dismissed", "created", "shown_at", "dismissed_at")
+
+    def __init__(self, message:"PrateMessage"):
+        '''init the handle'''
+
+        self.message = message
+        self.shown = concurrent.futures.Future()
+        self.dismissed = concurrent.futures.Future()
+        self.created = time.perf_counter()
+        self.shown_at = None
+        self.dismissed_at = None
+
+    @staticmethod
+    def dropped(message:"PrateMessage") -> "PrateHandle":
+        '''create a handle of a message which is dropped, its futures are cancelled'''
+
+        handle = PrateHandle(message)
+        handle.cancel()
+        return handle
+
+    def cancel(self):
+        '''cancel the futures of a message which is dropped before it is shown'''
+
+        if not self.shown.done():
+            self.shown.cancel()
+            self.dismissed.cancel()
+
+    @property
+    def is_dropped(self) -> bool:
+        '''whether the message is dropped before it is shown'''
+
+        return self.shown.cancelled()
+
+    @property
+    def latency(self) -> float:
+        '''the seconds from ring to shown, None if it is not shown yet'''
+
+        if self.shown_at is None:
+            return None
+        return self.shown_at - self.created
+
+    def set_shown(self):
+        '''called by the renderer when the message is shown'''
+
+        if not self.shown.done():
+            self.shown_at = time.perf_counter()
+            self.shown.set_result(self)
+
+    def set_dismissed(self):
+        '''called by the renderer when the message is dismissed'''
+
+        self.set_shown()
+        if not self.dismissed.done():
+            self.dismissed_at = time.perf_counter()
+            self.dismissed.set_result(self)
+
+    async def wait_shown(self) -> "PrateHandle":
+        '''wait until the message is shown, raise CancelledError if it is dropped'''
+
+        import asyncio
+        return await asyncio.wrap_future(self.shown)
+
+    async def wait_dismissed(self) -> "PrateHandle":
+        '''wait until the message is dismissed, raise CancelledError if it is dropped'''
+
+        import asyncio
+        return await asyncio.wrap_future(self.dismissed)
+
+class PratePriority:
+    '''the priority levels of messages, any int works, higher is more urgent,
+    a message preempts the windows of lower priority, urgent ones are shown at once'''
+
+    LOW = -1
+    NORMAL = 0
+    HIGH = 1
+    URGENT = 2
+
+    # shared with the client, which can not import this module
+    NAMES = PrateProtocol.PRIORITIES
+
+    @staticmethod
+    def of(priority) -> int:
+        '''get the priority level of an int or a name like "urgent"'''
+
+        if isinstance(priority, str):
+            level = PratePriority.NAMES.get(priority.strip().lower())
+            if level is None:
+                raise ValueError(f"unknown priority {priority!r}, expect an int or one of {', '.join(PratePriority.NAMES)}")
+            return level
+        return int(priority)
+
+class PrateMessage:
+    '''a message to show, repeats of it can be merged into it'''
+
+    __slots__ = ("id", "title", "content", "count", "created", "refresh_pending", "handle", "priority", "expires", "theme", "dropped")
+    __ids = itertools.count(1)
+
+    def __init__(self, title:str = "", content:str = "", priority:int = 0, ttl:float = None, theme:PrateWindowAppearanceConfigure = None):
+        '''init the message
+        @param priority: messages with higher priority are kept when the queue overflows
+        @param ttl: the message is dropped if it is not shown in this many seconds, None means never
+        @param theme: the configure of its window, None means the configure of Prate'''
+
+        self.id = (os.getpid(), next(PrateMessage.__ids))
+        self.title = title
+        self.content = content
+        self.count = 1
+        self.created = time.monotonic()
+        self.refresh_pending = False
+        self.handle = None
+        self.priority = PratePriority.of(priority)
+        self.expires = None if ttl is None else self.created + ttl
+        self.theme = theme
+        self.dropped = False
+
+    def expired(self, now:float = None) -> bool:
+        '''whether the ttl of the message has passed
+        @param now: the time.monotonic() to compare with, default to now'''
+
+        if self.expires is None:
+            return False
+        return (time.monotonic() if now is None else now) >= self.expires
+
+    def drop(self):
+        '''give up the message, its handle is cancelled and repeats are not merged into it any more'''
+
+        self.dropped = True
+        if self.handle is not None:
+            self.handle.cancel()
+
+    @property
+    def key(self) -> tuple:
+        '''messages with the same key are repeats'''
+
+        return (self.title, self.content, id(self.theme))
+
+    @property
+    def display_title(self) -> str:
+        '''the title with the count of repeats'''
+
+        if self.count <= 1:
+            return self.title
+        return f"{self.title} (x{self.count})"
+
+class PrateAdmission:
+    '''admission control in front of window creation, 
+    repeats inside the dedup window are merged into one message with a count, 
+    and new messages are limited by a token bucket, it is thread safe'''
+
+    ACCEPTED = "accepted"
+    MERGED = "merged"
+    DROPPED = "dropped"
+
+    def __init__(self, rate:float = None, burst:int = None, dedup_window:float = 0):
+        '''init the admission
+        @param rate: the max number of new messages per second, None means no limit
+        @param burst: the max number of new messages at once, default to rate
+        @param dedup_window: repeats inside this window are merged, in second, 0 means no merge'''
+
+        self.rate = rate
+        self.burst = max(1, burst if burst is not None else math.ceil(rate or 1))
+        self.dedup_window = dedup_window
+
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        # recent messages by key, the oldest one is at the front
+        self._recent = OrderedDict()
+        self._accepted = 0
+        self._merged = 0
+        self._dropped = 0
+
+    def admit(self, message:PrateMessage) -> tuple:
+        '''decide what to do with the message
+        @return: (decision, message), when merged, the message is the earlier one which takes the repeat'''
+
+        now = time.monotonic()
+        with self._lock:
+            if self.dedup_window > 0:
+                deadline = now - self.dedup_window
+                while len(self._recent) > 0:
+                    oldest = next(iter(self._recent.values()))
+                    if oldest.created > deadline:
+                        break
+                    self._recent.popitem(last=False)
+
+                earlier = self._recent.get(message.key)
+                if earlier is not None and earlier.dropped:
+                    # the queue dropped it for overflow or ttl, the repeat is a new message
+                    del self._recent[message.key]
+                    earlier = None
+                if earlier is not None:
+                    earlier.count += 1
+                    self._merged += 1
+                    return PrateAdmission.MERGED, earlier
+
+            if self.rate is not None:
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens < 1:
+                    self._dropped += 1
+                    return PrateAdmission.DROPPED, message
+                self._tokens -= 1
+
+            if self.dedup_window > 0:
+                self._recent[message.key] = message
+            self._accepted += 1
+            return PrateAdmission.ACCEPTED, message
+
+    def stats(self) -> dict:
+        '''get the number of accepted, merged and dropped messages'''
+
+        with self._lock:
+            return {
+                "accepted": self._accepted,
+                "merged": self._merged,
+                "dropped": self._dropped,
+            }
+
+class PrateIngestQueue:
+    '''the bounded queue of messages waiting for the renderer, it is thread safe,
+    the most urgent message is taken out first, first come first served inside a priority,
+    when it is full, the overflow policy decides which message is dropped,
+    messages whose ttl has passed are dropped when they are taken out'''
+
+    BLOCK = "block"
+    DROP_NEWEST = "drop_newest"
+    DROP_OLDEST = "drop_oldest"
+    DROP_LOWEST_PRIORITY = "drop_lowest_priority"
+
+    POLICIES = (BLOCK, DROP_NEWEST, DROP_OLDEST, DROP_LOWEST_PRIORITY)
+
+    def __init__(self, max_size:int = None, policy:str = BLOCK, block_timeout:float = None):
+        '''init the queue
+        @param max_size: the max number of pending messages, None means no limit
+        @param policy: what to do when the queue is full, one of PrateIngestQueue.POLICIES
+        @param block_timeout: with the block policy, the new message is dropped after waiting this many seconds,
+        None means wait until there is space'''
+
+        if policy not in PrateIngestQueue.POLICIES:
+            raise ValueError(f"unknown overflow policy {policy!r}, expect one of {', '.join(PrateIngestQueue.POLICIES)}")
+        self.max_size = max_size
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        # a heap of (-priority, sequence, message)
+        self._messages = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._peak = 0
+        self._enqueued = 0
+        self._overflow = 0
+        self._expired = 0
+
+    def __len__(self):
+        '''get the number of pending messages'''
+
+        return len(self._messages)
+
+    @property
+    def full(self) -> bool:
+        '''whether a new message would overflow'''
+
+        return self.max_size is not None and len(self._messages) >= self.max_size
+
+    def put(self, message:PrateMessage, wait:bool = True) -> bool:
+        '''put a message into the queue, with the block policy it waits for space
+        @param wait: if False, the block policy drops the new message instead of waiting, 
+        it must be False in the thread which drains the queue, or it waits forever
+        @return: False if the message itself is dropped, its handle is cancelled'''
+
+        evicted = None
+        with self._cond:
+            if self.full:
+                if self.policy == PrateIngestQueue.BLOCK:
+                    if not wait or not self._cond.wait_for(lambda: not self.full, self.block_timeout):
+                        evicted = message
+                elif self.policy == PrateIngestQueue.DROP_NEWEST:
+                    evicted = message
+                elif self.policy == PrateIngestQueue.DROP_OLDEST:
+                    evicted = self._evict(min(self._messages, key=lambda entry: entry[1]))
+                else:
+                    # the oldest one of the lowest priority, or the new one if nothing is lower
+                    lowest = max(self._messages, key=lambda entry: (entry[0], -entry[1]))
+                    if lowest[2].priority >= message.priority:
+                        evicted = message
+                    else:
+                        evicted = self._evict(lowest)
+
+            if evicted is not None:
+                self._overflow += 1
+            if evicted is not message:
+                heapq.heappush(self._messages, (-message.priority, next(self._sequence), message))
+                self._enqueued += 1
+                self._peak = max(self._peak, len(self._messages))
+
+        if evicted is not None:
+            evicted.drop()
+        return evicted is not message
+
+    def _evict(self, entry:tuple) -> PrateMessage:
+        '''remove an entry from the heap, must be called with the lock'''
+
+        self._messages.remove(entry)
+        heapq.heapify(self._messages)
+        return entry[2]
+
+    def get(self) -> PrateMessage:
+        '''take the most urgent message out, expired messages are dropped on the way
+        @return: the message, None if the queue is empty'''
+
+        expired = []
+        message = None
+        with self._cond:
+            now = time.monotonic()
+            while len(self._messages) > 0:
+                message = heapq.heappop(self._messages)[2]
+                if not message.expired(now):
+                    break
+                expired.append(message)
+                message = None
+            self._expired += len(expired)
+            self._cond.notify_all()
+
+        for item in expired:
+            item.drop()
+        return message
+
+    def stats(self) -> dict:
+        '''get the depth of the queue and the number of dropped messages'''
+
+        with self._cond:
+            return {
+                "depth": len(self._messages),
+                "peak": self._peak,
+                "enqueued": self._enqueued,
+                "overflow": self._overflow,
+                "expired": self._expired,
+            }
+
 class Prate:
     '''provide some simple api to show message box'''
 
     @staticmethod
-    def create_prate(configure:str|PrateWindowAppearanceConfigure = None, as_sub_module:bool = True, debug:bool = False):
+    def create_prate(configure:str|PrateWindowAppearanceConfigure = None, as_sub_module:bool = True, debug:bool = False, daemon:bool = False):
         '''create a prate instance with the given configure, if configure is invalid, then return None
         @param configure: the configure of the prate window
         @param as_sub_module: if True, then run the prate as a sub module
-        @param debug: debug mode, if True, then output the animation info of current window'''
+        @param debug: debug mode, if True, then output the animation info of current window
+        @param daemon: if True, then render all messages with a long-lived renderer'''
 
         if isinstance(configure, str):
             '''if configure is a string, then read the configure from file'''
 
             conf = PrateWindowAppearanceConfigure.read(configure)
             if conf is None: return None
-            return Prate(conf, as_sub_module=as_sub_module, debug=debug)
+            return Prate(conf, as_sub_module=as_sub_module, debug=debug, daemon=daemon)
         
         elif isinstance(configure, PrateWindowAppearanceConfigure):
             '''if configure is a PrateWindowAppearanceConfigure, then use it directly'''
 
-            return Prate(configure, as_sub_module=as_sub_module, debug=debug)
+            return Prate(configure, as_sub_module=as_sub_module, debug=debug, daemon=daemon)
         
         return None
 
-    def __init__(self, configure:str|PrateWindowAppearanceConfigure = None, as_sub_module:bool = True, debug:bool = False):
+    def __init__(self, 
+        configure:str|PrateWindowAppearanceConfigure = None, 
+        as_sub_module:bool = True, 
+        debug:bool = False, 
+        daemon:bool = False,
+        pool_min_size:int = 0,
+        pool_max_size:int = 8,
+        pool_idle_timeout:int = 30000,
+        max_visible:int = 5,
+        rate_limit:float = None,
+        burst:int = None,
+        dedup_window:float = 0,
+        server = None,
+        queue_size:int = None,
+        overflow:str = "block",
+        queue_timeout:float = None,
+        watch:bool = False,
+        watch_interval:float = 1.0,
+        themes:PrateThemeRegistry = None):
         '''init the prate
         @param configure: the configure of the prate window
-        @param debug: debug mode, if True, then output the animation info of current window'''
+        @param debug: debug mode, if True, then output the animation info of current window
+        @param daemon: if True, then all messages are queued onto a long-lived renderer 
+        instead of creating a new QApplication for each message, and windows are reused
+        @param pool_min_size: the number of idle windows always kept by the renderer
+        @param pool_max_size: the max number of idle windows kept by the renderer
+        @param pool_idle_timeout: idle windows above pool_min_size are evicted after this, in millisecond
+        @param max_visible: the max number of windows stacked at the screen anchor at once by the renderer
+        @param rate_limit: the max number of new messages per second, the others are dropped, None means no limit
+        @param burst: the max number of new messages at once, default to rate_limit
+        @param dedup_window: repeats of a message inside this window are merged into it with a count, in second,
+        it needs daemon=True or a server, since the window of a single message can not show the count later
+        @param server: the address of a PrateServer, if given, messages are sent to it
+        and this process never imports PyQt5
+        @param queue_size: the max number of messages waiting for the renderer thread, None means no limit
+        @param overflow: the policy when the queue is full, "block", "drop_newest", "drop_oldest" or "drop_lowest_priority"
+        @param queue_timeout: with the "block" policy, the new message is dropped after waiting this many seconds
+        @param watch: if True and configure is a path, the theme is reloaded when the file changes,
+        windows on screen keep their theme and new windows use the new one
+        @param watch_interval: the seconds between two checks of the theme file
+        @param themes: the registry which ring(..., theme=name) looks the theme up in, default to PrateThemeRegistry.shared()'''
 
         if isinstance(configure, str):
             self.configure = PrateWindowAppearanceConfigure.read(configure)
@@ -1288,24 +3117,422 @@ class Prate:
 
         self._as_sub_module = as_sub_module
         self._debug = debug
-
-    def _craft_window(self, title:str = "", content:str = ""):
-        '''ring the message box'''
-
-        window = self.configure.craft_window(self._debug)
+        self._daemon = daemon
+        self._pool_args = (pool_min_size, pool_max_size, pool_idle_timeout)
+        self._max_visible = max_visible
+        self._admission = None
+        if dedup_window > 0 and not daemon and server is None:
+            # each window lives in an application of its own, so a merged repeat would never show up
+            raise ValueError("dedup_window needs daemon=True or a server, the count of repeats can not be shown otherwise")
+        if rate_limit is not None or dedup_window > 0:
+            self._admission = PrateAdmission(rate_limit, burst, dedup_window)
+        self._client = PrateClient.shared(server) if server is not None else None
+
+        # the renderer thread pulls messages from the queue at its own pace
+        self._queue = None
+        self._drain_lock = threading.Lock()
+        self._drain_scheduled = False
+        if daemon and as_sub_module and server is None:
+            self._queue = PrateIngestQueue(queue_size, overflow, queue_timeout)
+
+        self.themes = themes if themes is not None else PrateThemeRegistry.shared()
+        self._watcher = None
+        if watch and isinstance(configure, str) and server is None:
+            self._watcher = PrateThemeWatcher(watch_interval)
+            self._watcher.watch(configure, self._reload_theme)
+            self._watcher.start()
+
+    def __getstate__(self) -> dict:
+        '''the state sent to a renderer process with its craft calls, 
+        the queue, admission, watcher and client stay in this process, they hold locks and threads'''
+
+        state = self.__dict__.copy()
+        for name in ("_drain_lock", "_drain_scheduled", "_queue", "_admission", "_client", "_watcher", "themes"):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state:dict):
+        '''restore a prate in a renderer process, it only crafts windows'''
+
+        self.__dict__.update(state)
+        self._drain_lock = threading.Lock()
+        self._drain_scheduled = False
+        self._queue = None
+        self._admission = None
+        self._client = None
+        self._watcher = None
+        self.themes = PrateThemeRegistry.shared()
+
+    def _reload_theme(self, configure:PrateWindowAppearanceConfigure):
+        '''take a reloaded configure, it is called in the watcher thread'''
+
+        if self._daemon and self._as_sub_module:
+            # the swap happens between two crafts of the renderer
+            PrateRenderer.instance(True).post(self._swap_theme, configure)
+            return
+        # every message crafts its windows from the configure of that moment
+        self.configure = configure
+
+    def _swap_theme(self, configure:PrateWindowAppearanceConfigure):
+        '''swap in a reloaded configure in the renderer thread, only the changed pieces of its theme are compiled'''
+
+        from prate_qt import PrateThemeCache, PrateWindowPool
+
+        previous = self.configure
+        PrateThemeCache.recompile(previous, configure)
+        PrateWindowPool.rebind(previous, configure)
+        self.configure = configure
+
+    def _craft_window(self, title:str = "", content:str = "", handle:PrateHandle = None, priority:int = PratePriority.NORMAL, theme:PrateWindowAppearanceConfigure = None):
+        '''ring the message box
+        @param priority: with the renderer, windows of lower priority leave early to make room for this one
+        @param theme: the configure of the window, None means the configure of Prate'''
+
+        from prate_qt import PrateWindowPool, PrateStackLayout
+
+        configure = theme if theme is not None else self.configure
+        if self._daemon:
+            # the renderer lives as long as the process, so windows can be reused
+            pool = PrateWindowPool.of(configure, *self._pool_args)
+            pool.debug = self._debug
+            window = pool.acquire()
+            window.set_infos(title, content)
+            window.priority = priority
+
+            def _show_up():
+                window.show_up()
+                if handle is not None:
+                    handle.set_shown()
+                    window.on_dismissed(handle.set_dismissed)
+
+            # stack the window with the others at the same anchor
+            layout = PrateStackLayout.of(configure.screen_pos, configure.screen_padding, self._max_visible)
+            layout.place(window, _show_up)
+            return window
+
+        window = configure.craft_window(self._debug)
         window.set_infos(title, content)
         window.show_up()
+        return window
+
+    def _craft_message(self, message:PrateMessage):
+        '''ring the message box of a message, it is dropped if its ttl has passed'''
+
+        message.refresh_pending = False
+        if message.expired():
+            message.drop()
+            return None
+        window = self._craft_window(message.display_title, message.content, message.handle, message.priority, message.theme)
+        window.bind_message(message.id)
+        return window
+
+    def _schedule_drain(self):
+        '''wake up the renderer thread to drain the queue, at most one wakeup is pending'''
+
+        with self._drain_lock:
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        PrateRenderer.instance(self._as_sub_module).post(self._drain)
+
+    def _drain(self, budget:float = 0.008):
+        '''craft the queued messages in the renderer thread, it yields to the event loop
+        after the budget so that animations keep running while the queue is long
+        @param budget: the max seconds spent in one drain'''
+
+        with self._drain_lock:
+            self._drain_scheduled = False
+
+        deadline = time.perf_counter() + budget
+        while time.perf_counter() < deadline:
+            message = self._queue.get()
+            if message is None:
+                return
+            try:
+                self._craft_message(message)
+            except Exception:
+                # the rest of the queue is still shown
+                print("failed to show a message:")
+                traceback.print_exc()
+                message.drop()
+
+        if len(self._queue) > 0:
+            self._schedule_drain()
+
+    def _refresh_message(self, message:PrateMessage):
+        '''update the count of a message which is already on the screen'''
+
+        from prate_qt import PrateWindow
+
+        message.refresh_pending = False
+        window = PrateWindow.find_message(message.id)
+        if window is not None:
+            window.set_infos(message.display_title, message.content)
     
-    def ring(self, title:str = "", content:str = ""):
-        '''ring the message box'''
+    def ring(self, title:str = "", content:str = "", priority:int = 0, ttl:float = None, theme:str = None) -> PrateHandle:
+        '''ring the message box
+        @param priority: an int or a name of PratePriority, messages with higher priority are shown first,
+        kept when the queue overflows, and make the windows of lower priority skip their wait
+        @param ttl: the message is dropped if it is not shown in this many seconds, None means never
+        @param theme: the name of a theme in the registry, or a configure, None means the configure of Prate
+        @return: the handle of the message when the renderer runs in a thread, otherwise None, 
+        a repeat which is merged gets the handle of the earlier message'''
+
+        configure = theme
+        if self._client is not None:
+            # the server looks the name up in its own registry
+            if theme is not None and not isinstance(theme, str):
+                raise TypeError("a producer can only ring with the name of a theme registered in the server")
+            configure = None
+        elif isinstance(theme, str):
+            configure = self.themes.get(theme)
+
+        message = PrateMessage(title, content, priority, ttl, configure)
+        # futures can not be shared with a renderer process
+        with_handle = self._daemon and self._as_sub_module
+        if self._admission is not None:
+            decision, message = self._admission.admit(message)
+            if decision == PrateAdmission.DROPPED:
+                return PrateHandle.dropped(message) if with_handle else None
+            if decision == PrateAdmission.MERGED and self._client is None:
+                # a process renderer works on a copy of the message, so it can not clear the flag
+                if self._daemon and (not message.refresh_pending or not self._as_sub_module):
+                    message.refresh_pending = True
+                    PrateRenderer.instance(self._as_sub_module).post(self._refresh_message, message)
+                return message.handle
+
+        if self._client is not None:
+            self._client.ring(message.title, message.content, message.priority, ttl, theme)
+            return None
+
+        if with_handle:
+            message.handle = PrateHandle(message)
 
+        if self._queue is not None:
+            # the gui thread drains the queue, so it never waits for space, like in a dismissed callback
+            if self._queue.put(message, not PrateRenderer.instance(True).in_gui_thread):
+                self._schedule_drain()
+            return message.handle
+
+        if self._daemon:
+            PrateRenderer.instance(self._as_sub_module).post(self._craft_message, message)
+            return message.handle
+
+        from prate_qt import _invoke_msg_window_as_thread, _invoke_msg_window_as_process
+
+        # the ttl is checked when the new application is ready to craft the window
         if self._as_sub_module:
-            _invoke_msg_window_as_thread(self._craft_window, title, content)
+            _invoke_msg_window_as_thread(self._craft_message, message)
+            return None
+        _invoke_msg_window_as_process(self._craft_message, message)
+        return None
+
+    async def ring_async(self, title:str = "", content:str = "", priority:int = 0, ttl:float = None, theme:str = None) -> PrateHandle:
+        '''ring the message box from asyncio, it never blocks the event loop, 
+        await handle.wait_shown() or handle.wait_dismissed() to follow the message
+        @return: the handle of the message, None when the message is sent to a server'''
+
+        if self._client is None and (not self._daemon or not self._as_sub_module):
+            raise RuntimeError("ring_async needs the renderer thread, create Prate with daemon=True and as_sub_module=True")
+
+        if self._queue is not None and self._queue.policy == PrateIngestQueue.BLOCK and self._queue.max_size is not None:
+            # waiting for space happens in a worker thread instead of the event loop
+            import asyncio
+            return await asyncio.get_running_loop().run_in_executor(None, self.ring, title, content, priority, ttl, theme)
+        return self.ring(title, content, priority, ttl, theme)
+
+    def stats(self) -> dict:
+        '''get the number of accepted, merged and dropped messages,
+        and the depth, peak and dropped messages of the queue'''
+
+        stats = {}
+        if self._admission is not None:
+            stats.update(self._admission.stats())
+        if self._queue is not None:
+            stats.update(self._queue.stats())
+        return stats
+
+
+class PrateServer:
+    '''listen on a unix domain socket or a localhost tcp port, 
+    and show all the received messages with one prate, 
+    so that many producer processes share one renderer'''
+
+    def __init__(self, prate:"Prate", address = "/tmp/prate.sock"):
+        '''init the server
+        @param prate: the prate which shows the messages, usually with daemon=True
+        @param address: a unix socket path, or a (host, port) tuple or "host:port" string for tcp'''
+
+        self.prate = prate
+        self.address = PrateProtocol.parse_address(address)
+        self._selector = None
+        self._listener = None
+        self._thread = None
+        self._running = False
+        self._received = 0
+
+    @property
+    def received(self) -> int:
+        '''the number of received messages'''
+
+        return self._received
+
+    def _listen(self):
+        '''create the listening socket'''
+
+        if isinstance(self.address, tuple):
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        else:
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.address)
+        listener.listen(128)
+        listener.setblocking(False)
+        return listener
+
+    def start(self):
+        '''start to serve in a background thread'''
+
+        if self._thread is not None:
+            return
+        self._selector = selectors.DefaultSelector()
+        self._listener = self._listen()
+        self._selector.register(self._listener, selectors.EVENT_READ, None)
+        self._running = True
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def serve_forever(self):
+        '''accept connections and read frames until stopped'''
+
+        if self._selector is None:
+            self._selector = selectors.DefaultSelector()
+            self._listener = self._listen()
+            self._selector.register(self._listener, selectors.EVENT_READ, None)
+            self._running = True
+
+        while self._running:
+            for key, _ in self._selector.select(timeout=0.2):
+                if key.data is None:
+                    self._accept()
+                else:
+                    self._read(key.fileobj, key.data)
+
+    def _accept(self):
+        '''accept a new connection'''
+
+        try:
+            connection, _ = self._listener.accept()
+        except BlockingIOError:
+            return
+        connection.setblocking(False)
+        self._selector.register(connection, selectors.EVENT_READ, bytearray())
+
+    def _read(self, connection:socket.socket, buffer:bytearray):
+        '''read the data of a connection and dispatch complete frames'''
+
+        try:
+            data = connection.recv(65536)
+        except (BlockingIOError, InterruptedError):
             return
-        _invoke_msg_window_as_process(self._craft_window, title, content)
+        except OSError:
+            data = b""
 
+        if not data:
+            self._selector.unregister(connection)
+            connection.close()
+            return
+
+        buffer.extend(data)
+        try:
+            payloads = PrateProtocol.decode(buffer)
+        except ValueError as e:
+            print("drop connection of invalid frame:", e)
+            self._selector.unregister(connection)
+            connection.close()
+            return
+
+        for payload in payloads:
+            for item in payload if isinstance(payload, list) else (payload,):
+                if isinstance(item, dict):
+                    self._received += 1
+                    try:
+                        self._dispatch(item)
+                    except Exception:
+                        # the server is shared by all producers, a message must not stop it
+                        print("failed to show a received message:")
+                        traceback.print_exc()
+
+    def _dispatch(self, item:dict):
+        '''show a received message, an invalid one is dropped'''
+
+        try:
+            priority = PratePriority.of(item.get("priority", 0))
+            ttl = PrateProtocol.check_ttl(item.get("ttl"))
+            theme = item.get("theme")
+            if theme is not None and not isinstance(theme, str):
+                raise ValueError(f"theme should be the name of a theme, not {theme!r}")
+        except (TypeError, ValueError, OverflowError) as e:
+            print("drop invalid message:", e)
+            return
+
+        if theme is not None and theme not in self.prate.themes:
+            print(f"unknown theme {theme!r}, use the default one")
+            theme = None
+        self.prate.ring(str(item.get("title", "")), str(item.get("content", "")), priority, ttl, theme)
+
+    def stop(self):
+        '''stop serving and close all connections'''
+
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._selector is not None:
+            for key in list(self._selector.get_map().values()):
+                key.fileobj.close()
+            self._selector.close()
+            self._selector = None
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+def _serve(argv:list):
+    '''run prate as a notification server'''
+
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="prate serve", description="show the messages sent by PrateClient")
+    parser.add_argument("--address", default="/tmp/prate.sock", help="unix socket path or host:port, default /tmp/prate.sock")
+    parser.add_argument("--config", default=None, help="the configure json of windows")
+    parser.add_argument("--rate-limit", type=float, default=None, help="max new messages per second")
+    parser.add_argument("--dedup-window", type=float, default=0, help="merge repeats inside this window, in second")
+    parser.add_argument("--themes", action="append", default=[], help="a theme file, bundle or directory which clients choose from by name")
+    parser.add_argument("--theme-cache", default=None, help="the directory of pre-parsed themes")
+    args = parser.parse_args(argv)
+
+    themes = PrateThemeRegistry(args.theme_cache)
+    for path in args.themes:
+        themes.load(path)
+    prate = Prate(args.config, daemon=True, rate_limit=args.rate_limit, dedup_window=args.dedup_window, themes=themes)
+    server = PrateServer(prate, args.address)
+    print("prate is serving on", server.address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
 
 if __name__ == '__main__':
 
+    # prate_qt imports this module by name, let it find this one instead of a second copy
+    sys.modules.setdefault("prate", sys.modules[__name__])
+
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        _serve(sys.argv[2:])
+        sys.exit(0)
+
     prate = Prate("./dark.json")
     prate.ring("Prate标题栏", "Prate内容信息")
\ No newline at end of file
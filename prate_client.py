@@ -0,0 +1,264 @@
+# !user/bin/python3
+# Desc: the client of prate server, it only uses the standard library so that
+#       producer processes never import PyQt5
+
+import os
+import json
+import math
+import time
+import socket
+import struct
+import threading
+
+class PrateProtocol:
+    '''the wire format between PrateClient and PrateServer, 
+    each frame is a 4 bytes big endian length and an utf-8 json payload, 
+    the payload is a message object or a list of them'''
+
+    HEADER = struct.Struct(">I")
+    MAX_FRAME = 1 << 20
+
+    # the names of priority levels, PratePriority uses the same ones
+    PRIORITIES = {"low": -1, "normal": 0, "high": 1, "urgent": 2}
+
+    @staticmethod
+    def encode(payload) -> bytes:
+        '''encode a payload into a frame'''
+
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return PrateProtocol.HEADER.pack(len(data)) + data
+
+    @staticmethod
+    def decode(buffer:bytearray) -> list:
+        '''take all the complete frames from the buffer and decode them
+        @return: the decoded payloads, the rest of the buffer is kept'''
+
+        payloads = []
+        offset = 0
+        size = PrateProtocol.HEADER.size
+        while len(buffer) - offset >= size:
+            length, = PrateProtocol.HEADER.unpack_from(buffer, offset)
+            if length > PrateProtocol.MAX_FRAME:
+                raise ValueError(f"frame of {length} bytes is too large")
+            if len(buffer) - offset - size < length:
+                break
+            data = bytes(buffer[offset + size:offset + size + length])
+            offset += size + length
+            payloads.append(json.loads(data.decode("utf-8")))
+        del buffer[:offset]
+        return payloads
+
+    @staticmethod
+    def check_priority(priority) -> int:
+        '''get the priority level of an int or a name like "urgent", raise ValueError if it is neither'''
+
+        if isinstance(priority, str):
+            level = PrateProtocol.PRIORITIES.get(priority.strip().lower())
+            if level is None:
+                raise ValueError(f"unknown priority {priority!r}, expect an int or one of {', '.join(PrateProtocol.PRIORITIES)}")
+            return level
+        if isinstance(priority, bool) or not isinstance(priority, int):
+            raise ValueError(f"priority should be an int or a name, not {priority!r}")
+        return priority
+
+    @staticmethod
+    def check_ttl(ttl) -> float:
+        '''get the ttl in second, raise ValueError if it is not a finite number above or equal to 0, None means never'''
+
+        if ttl is None:
+            return None
+        if isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or not math.isfinite(ttl) or ttl < 0:
+            raise ValueError(f"ttl should be a finite number of seconds, not {ttl!r}")
+        return float(ttl)
+
+    @staticmethod
+    def parse_address(address:str):
+        '''parse "host:port" into a tcp address, anything else is a unix socket path'''
+
+        if isinstance(address, tuple):
+            return address
+        host, sep, port = address.rpartition(":")
+        if sep and port.isdigit() and "/" not in address:
+            return (host or "127.0.0.1", int(port))
+        return address
+
+class PrateClient:
+    '''a light client of PrateServer which only uses the standard library, 
+    it keeps a persistent connection, batches messages into one frame 
+    and sends them from a background thread without waiting for replies'''
+
+    __clients = {}
+    __lock = threading.Lock()
+
+    @staticmethod
+    def shared(address = "/tmp/prate.sock") -> "PrateClient":
+        '''get the client of the address shared in current process'''
+
+        address = PrateProtocol.parse_address(address)
+        with PrateClient.__lock:
+            client = PrateClient.__clients.get(address)
+            if client is None:
+                client = PrateClient(address)
+                PrateClient.__clients[address] = client
+            return client
+
+    def __init__(self, address = "/tmp/prate.sock", batch_size:int = 64, flush_interval:float = 0.005, max_pending:int = 10000):
+        '''init the client
+        @param address: a unix socket path, or a (host, port) tuple or "host:port" string for tcp
+        @param batch_size: send at once when this many messages are pending
+        @param flush_interval: the max seconds a message waits to be batched
+        @param max_pending: messages beyond this are dropped while the server is unreachable'''
+
+        self.address = PrateProtocol.parse_address(address)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pid = None
+        self._reset()
+
+    def _reset(self):
+        '''reset the state, it is also called in a forked child'''
+
+        self._pid = os.getpid()
+        self._socket = None
+        self._pending = []
+        self._dropped = 0
+        self._sent = 0
+        self._inflight = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._flusher = None
+
+    def _check_fork(self):
+        '''a forked child does not own the connection and thread of its parent'''
+
+        if self._pid != os.getpid():
+            self._reset()
+
+    def ring(self, title:str = "", content:str = "", priority:int = 0, ttl:float = None, theme:str = None):
+        '''queue a message, it returns at once
+        @param priority: messages with higher priority are kept when the queue of server overflows
+        @param ttl: the message is dropped if it is not shown in this many seconds after the server receives it
+        @param theme: the name of a theme registered in the server
+        raise ValueError if the priority, ttl or theme is invalid, the server would drop the message'''
+
+        priority = PrateProtocol.check_priority(priority)
+        ttl = PrateProtocol.check_ttl(ttl)
+        if theme is not None and not isinstance(theme, str):
+            raise ValueError(f"theme should be the name of a theme, not {theme!r}")
+
+        item = {"title": title, "content": content}
+        if priority != 0:
+            item["priority"] = priority
+        if ttl is not None:
+            item["ttl"] = ttl
+        if theme is not None:
+            item["theme"] = theme
+        self.send(item)
+
+    def send(self, item:dict):
+        '''queue a message object'''
+
+        self._check_fork()
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                self._dropped += 1
+                return
+            self._pending.append(item)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def _connect(self) -> socket.socket:
+        '''connect to the server'''
+
+        family = socket.AF_INET if isinstance(self.address, tuple) else socket.AF_UNIX
+        connection = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            connection.connect(self.address)
+        except OSError:
+            connection.close()
+            raise
+        if family == socket.AF_INET:
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return connection
+
+    def _flush_loop(self):
+        '''send pending messages in batches'''
+
+        backoff = 0.05
+        while True:
+            with self._cond:
+                if len(self._pending) < self.batch_size and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                if len(self._pending) == 0:
+                    if self._closed:
+                        return
+                    continue
+                batch = self._pending
+                self._pending = []
+                self._inflight = len(batch)
+
+            frames = b"".join(
+                PrateProtocol.encode(batch[i:i + self.batch_size]) for i in range(0, len(batch), self.batch_size)
+            )
+            try:
+                if self._socket is None:
+                    self._socket = self._connect()
+                self._socket.sendall(frames)
+                with self._cond:
+                    self._sent += len(batch)
+                    self._inflight = 0
+                backoff = 0.05
+            except OSError:
+                if self._socket is not None:
+                    self._socket.close()
+                    self._socket = None
+                with self._cond:
+                    # keep the messages and try again later
+                    self._pending[:0] = batch
+                    self._inflight = 0
+                    overflow = len(self._pending) - self.max_pending
+                    if overflow > 0:
+                        del self._pending[:overflow]
+                        self._dropped += overflow
+                    if self._closed:
+                        return
+                time.sleep(backoff)
+                backoff = min(1, backoff * 2)
+
+    def flush(self, timeout:float = 1) -> bool:
+        '''wait until all pending messages are sent
+        @return: True if nothing is pending'''
+
+        self._check_fork()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify()
+        while time.monotonic() < deadline:
+            with self._cond:
+                if len(self._pending) == 0 and self._inflight == 0:
+                    return True
+            time.sleep(0.001)
+        return False
+
+    def stats(self) -> dict:
+        '''get the number of sent, pending and dropped messages'''
+
+        with self._cond:
+            return {"sent": self._sent, "pending": len(self._pending), "dropped": self._dropped}
+
+    def close(self):
+        '''send the pending messages and close the connection'''
+
+        self._check_fork()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._flusher is not None:
+            self._flusher.join(1)
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
@@ -0,0 +1,1701 @@
+# !user/bin/python3
+# Desc: the gui parts of prate based on pyqt5, prate imports this module only when
+#       a window or a renderer is needed
+
+import gc
+import os
+import re
+import sys
+import hashlib
+import math
+import time
+import weakref
+import traceback
+import threading
+import multiprocessing
+
+from typing import NamedTuple
+from collections import OrderedDict, deque
+
+from PyQt5 import sip
+from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import QSize, QPoint, QRect, QEvent
+
+from PyQt5.QtWidgets import QApplication, QWidget, QLabel
+from PyQt5.QtWidgets import QGraphicsDropShadowEffect
+
+from PyQt5.QtGui import QMouseEvent, QCloseEvent
+from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtGui import QPainter, QPixmap, QImage, QPaintEvent
+
+from prate import EaseType, TweenProbe, TweenTimer, TweenAnimation, TweenAlpha, TweenMove, TweenEngine
+from prate import PrateName, PrateAnimationPlan, PrateWindowAppearanceConfigure, PratePriority
+
+def _thread_func(_raise_window : object, *args, **kwargs):
+    '''wrapper invoke function'''
+
+    if not callable(_raise_window):
+        return
+
+    _app = QApplication(sys.argv)
+    _raise_window(*args, **kwargs)
+    _app.exec_()
+
+def _invoke_msg_window_as_thread(_craft_window : object, *args, **kwargs):
+    '''start to show tip window
+    @param _craft_window: the window handle function'''
+
+    _thread = threading.Thread(target=_thread_func, args=(_craft_window, *args, *kwargs))
+    _thread.start()
+
+def _invoke_msg_window_as_process(_craft_window : object, *args, **kwargs):
+    '''start to show tip window
+    @param _craft_window: the window handle function'''
+
+    _process = multiprocessing.Process(target=_thread_func, args=(_craft_window, *args, *kwargs))
+    _process.start()
+
+class _PrateDispatcher(QObject):
+    '''lives in the renderer gui thread, run every posted craft call there'''
+
+    arrived = pyqtSignal(object)
+
+    def __init__(self, app:QApplication):
+        '''init the dispatcher
+        @param app: the application which owns the gui thread'''
+
+        super().__init__(None)
+        self._app = app
+        self._live = set()
+        self._known = weakref.WeakSet()
+        self.arrived.connect(self._on_arrived)
+
+    def _on_arrived(self, item):
+        '''run a posted item, None means stop the renderer'''
+
+        if item is None:
+            self._app.quit()
+            return
+
+        _craft_window, args = item
+        try:
+            window = _craft_window(*args)
+        except Exception:
+            # an exception escaping a slot aborts the renderer, and all the messages after it are lost
+            print("failed to run a call posted to the renderer:")
+            traceback.print_exc()
+            return
+        if isinstance(window, PrateWindow):
+            # keep the window alive until it is closed
+            if window not in self._known:
+                self._known.add(window)
+                window.closed.connect(self._live.discard)
+            self._live.add(window)
+
+    def shutdown(self):
+        '''close all live windows, must be called in the gui thread'''
+
+        # no reflow while everything is going away
+        for window in self._live:
+            window.set_layout(None)
+        for window in list(self._live):
+            window.set_pool(None)
+            window.dismiss()
+        self._live.clear()
+        PrateWindowPool.clear_all()
+        PrateStackLayout.clear_all()
+        PrateOverlay.clear_all()
+        TweenFrameClock.release()
+        # let the qt objects die in the thread which owns them
+        gc.collect()
+
+def _renderer_func(pending):
+    '''the main function of renderer, own the QApplication and its event loop
+    @param pending: the queue which contains the posted craft calls'''
+
+    if QApplication.instance() is not None:
+        # widgets must be created in the thread of the application, which is not this one
+        raise RuntimeError("a QApplication exists already, the renderer can not own the gui thread")
+    _app = QApplication(sys.argv)
+    _app.setQuitOnLastWindowClosed(False)
+    _dispatcher = _PrateDispatcher(_app)
+
+    def _feed():
+        '''block on the queue and wake up the gui thread for each item'''
+
+        while True:
+            item = pending.get()
+            _dispatcher.arrived.emit(item)
+            if item is None:
+                return
+
+    threading.Thread(target=_feed, daemon=True).start()
+    _app.exec_()
+    _dispatcher.shutdown()
+    sip.delete(_dispatcher)
+    # destroy the application in the thread which created it
+    sip.delete(_app)
+
+
+class TweenFrameClock(QObject):
+    '''the shared frame clock of a gui thread, all the live tween animations are 
+    registered to it and updated in one pass per tick, it stops when nothing is animating'''
+
+    __local = threading.local()
+
+    @staticmethod
+    def instance() -> "TweenFrameClock":
+        '''get the frame clock of current thread, create it if necessary'''
+
+        clock = getattr(TweenFrameClock.__local, "clock", None)
+        if clock is None:
+            clock = TweenFrameClock()
+            TweenFrameClock.__local.clock = clock
+        return clock
+
+    @staticmethod
+    def release():
+        '''stop and drop the frame clock of current thread'''
+
+        clock = getattr(TweenFrameClock.__local, "clock", None)
+        if clock is not None:
+            clock.timer.stop()
+            clock._drivers.clear()
+            clock._dirty.clear()
+            clock._last_tick = None
+            TweenFrameClock.__local.clock = None
+
+    def __init__(self, fps:int = 200) -> None:
+        '''init the frame clock
+        @param fps: the max frames per second'''
+
+        super().__init__(None)
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+        self.set_fps(fps)
+
+        # registered drivers, a dict keeps the order and removes in O(1)
+        self._drivers = {}
+        # targets whose buffered properties are flushed at the end of current tick
+        self._dirty = {}
+        self._engine = None
+        self._now = None
+        self._last_tick = None
+        self._dropped = 0
+        self._ticks = 0
+        self._tick_cost = 0
+        self._last_tick_cost = 0
+        self._max_tick_cost = 0
+
+    @property
+    def fps(self) -> float:
+        '''the max frames per second'''
+
+        return 1000 / self.timer.interval()
+
+    @property
+    def interval(self) -> int:
+        '''the interval between two ticks, in millisecond'''
+
+        return self.timer.interval()
+
+    @property
+    def now(self) -> float:
+        '''the monotonic time of current tick in second, 
+        all drivers see the same time in one tick'''
+
+        if self._now is None:
+            return time.perf_counter()
+        return self._now
+
+    @property
+    def engine(self) -> TweenEngine:
+        '''the tween engine of this clock, it keeps many simple tweens in arrays instead of objects'''
+
+        if self._engine is None:
+            self._engine = TweenEngine(self)
+        return self._engine
+
+    def set_fps(self, fps:float):
+        '''set the max frames per second'''
+
+        self.timer.setInterval(max(1, round(1000 / max(1, fps))))
+
+    def defer(self, target:object) -> bool:
+        '''flush the target once at the end of current tick, it is called after each write to its buffer
+        @param target: an object with a flush() method, like PrateWindow
+        @return: False if it is not in a tick, then the target should flush at once'''
+
+        if self._now is None:
+            return False
+        self._dirty[target] = None
+        return True
+
+    def register(self, driver:"TweenTimer"):
+        '''register a driver, its _update would be called on each tick'''
+
+        self._drivers[driver] = None
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def unregister(self, driver:"TweenTimer"):
+        '''unregister a driver, the clock stops when there is no driver'''
+
+        self._drivers.pop(driver, None)
+        if len(self._drivers) == 0:
+            self.timer.stop()
+            self._last_tick = None
+
+    def _tick(self):
+        '''update all the registered drivers'''
+
+        begin = time.perf_counter()
+        self._now = begin
+        for driver in tuple(self._drivers):
+            driver._update()
+        self._now = None
+        if len(self._dirty) > 0:
+            dirty = self._dirty
+            self._dirty = {}
+            for target in dirty:
+                target.flush()
+
+        cost = time.perf_counter() - begin
+        self._ticks += 1
+        self._tick_cost += cost
+        self._last_tick_cost = cost
+        self._max_tick_cost = max(self._max_tick_cost, cost)
+
+        # frames which should have come between the last tick and this one
+        interval = self.timer.interval() / 1000
+        late = 0 if self._last_tick is None else max(0, begin - self._last_tick - interval)
+        dropped = int(late / interval)
+        self._dropped += dropped
+        self._last_tick = begin
+
+        probe = TweenProbe.active
+        if probe is not None:
+            probe.on_frame(begin, cost, late, dropped, len(self._drivers))
+
+    def stats(self) -> dict:
+        '''get the statistics of the clock, costs are in millisecond'''
+
+        return {
+            "fps": self.fps,
+            "active": len(self._drivers),
+            "running": self.timer.isActive(),
+            "ticks": self._ticks,
+            "last_tick_cost": self._last_tick_cost * 1000,
+            "avg_tick_cost": self._tick_cost * 1000 / max(1, self._ticks),
+            "max_tick_cost": self._max_tick_cost * 1000,
+            "dropped_frames": self._dropped,
+        }
+
+    def reset_stats(self):
+        '''reset the statistics of the clock'''
+
+        self._ticks = 0
+        self._tick_cost = 0
+        self._last_tick_cost = 0
+        self._max_tick_cost = 0
+        self._dropped = 0
+
+
+class QtTweenHelper:
+    '''provide some fast api to control the animation of qt element'''
+
+    @staticmethod
+    def fade_out(window:QWidget, duration:int = 1000, ease_type:int = EaseType.LINEAR):
+        '''create a new tween animation to fade out the target element'''
+
+        if window is None:
+            return None
+        return TweenAlpha.fade_out(window.setWindowOpacity, duration, ease_type)
+
+    @staticmethod
+    def fade_in(window:QWidget, duration:int = 1000, ease_type:int = EaseType.LINEAR):
+        '''create a new tween animation to fade in the target element'''
+
+        if window is None:
+            return None
+        return TweenAlpha.fade_in(window.setWindowOpacity, duration, ease_type)
+
+    @staticmethod
+    def move_up_here(window:QWidget, distance:int = 100, duration:int = 1000, ease_type:int = EaseType.LINEAR):
+        '''create a new tween animation to move up the target element'''
+
+        if window is None:
+            return None
+        
+        currentPos = window.pos()
+        x = currentPos.x()
+        y = currentPos.y()
+        return TweenMove.to_pos(window.move, (x, y + distance), (x, y), duration, ease_type)
+    
+    @staticmethod
+    def move_up(window:QWidget, distance:int = 100, duration:int = 1000, ease_type:int = EaseType.LINEAR):
+        '''create a new tween animation to move up the target element'''
+
+        if window is None:
+            return None
+        
+        currentPos = window.pos()
+        x = currentPos.x()
+        y = currentPos.y()
+        return TweenMove.to_pos(window.move, (x, y), (x, y - distance), duration, ease_type)
+
+    @staticmethod
+    def move_down_here(window:QWidget, distance:int = 100, duration:int = 1000, ease_type:int = EaseType.LINEAR):
+        '''create a new tween animation to move down the target element'''
+
+        if window is None:
+            return None
+        currentPos = window.pos()
+        x = currentPos.x()
+        y = currentPos.y()
+        return TweenMove.to_pos(window.move, (x, y - distance), (x, y), duration, ease_type)
+    
+    @staticmethod
+    def move_down(window:QWidget, distance:int = 100, duration:int = 1000, ease_type:int = EaseType.LINEAR):
+        '''create a new tween animation to move down the target element'''
+
+        if window is None:
+            return None
+        currentPos = window.pos()
+        x = currentPos.x()
+        y = currentPos.y()
+        return TweenMove.to_pos(window.move, (x, y), (x, y + distance), duration, ease_type)
+
+
+class PrateTextLayoutCache:
+    '''lru cache of elided texts, keyed by font, width and text, 
+    repeated or templated messages skip text shaping'''
+
+    max_size = 1024
+    __texts = OrderedDict()
+    __lock = threading.Lock()
+    __hits = 0
+    __misses = 0
+
+    @staticmethod
+    def elide(label:QLabel, font_key:str, text:str, width:int) -> str:
+        '''get the text elided to fit the width with the font of label
+        @param font_key: the key of the font of label, see QFont.key()
+        @param width: the total width the text may take, in pixel'''
+
+        key = (font_key, width, text)
+        with PrateTextLayoutCache.__lock:
+            elided = PrateTextLayoutCache.__texts.get(key)
+            if elided is not None:
+                PrateTextLayoutCache.__texts.move_to_end(key)
+                PrateTextLayoutCache.__hits += 1
+                return elided
+            PrateTextLayoutCache.__misses += 1
+
+        elided = label.fontMetrics().elidedText(text, Qt.TextElideMode.ElideRight, width)
+        with PrateTextLayoutCache.__lock:
+            PrateTextLayoutCache.__texts[key] = elided
+            while len(PrateTextLayoutCache.__texts) > PrateTextLayoutCache.max_size:
+                PrateTextLayoutCache.__texts.popitem(last=False)
+        return elided
+
+    @staticmethod
+    def stats() -> dict:
+        '''get the size, hits and misses of the cache'''
+
+        with PrateTextLayoutCache.__lock:
+            return {
+                "size": len(PrateTextLayoutCache.__texts),
+                "hits": PrateTextLayoutCache.__hits,
+                "misses": PrateTextLayoutCache.__misses,
+            }
+
+    @staticmethod
+    def clear():
+        '''drop all the cached texts and reset the counters'''
+
+        with PrateTextLayoutCache.__lock:
+            PrateTextLayoutCache.__texts.clear()
+            PrateTextLayoutCache.__hits = 0
+            PrateTextLayoutCache.__misses = 0
+
+class PrateContentBase(QLabel):
+    '''add overlay to prate content'''
+
+    def __init__(self, parent: QWidget, size: QSize):
+        '''init the prate content'''
+
+        super().__init__(parent)
+        self.setObjectName(PrateName.Content)
+        self.resize(size)
+        
+        self._overlay = QLabel(self)
+        self._overlay.setObjectName(PrateName.Overlay)
+        self._overlay.move(-1, -1)
+        self._overlay.resize(size + QSize(2, 2))
+
+    @property
+    def overlay(self):
+        return self._overlay
+
+class PrateContent(PrateContentBase):
+    '''the main content of prate message box'''
+
+    def __init__(self, 
+        parent: QWidget, 
+        size: QSize,
+        has_title = True, 
+        padding = 12, 
+        gap:int = 8, 
+        title_font: QFont = None, 
+        info_font: QFont = None):
+        '''initialize prate main content'''
+
+        super().__init__(parent, size)
+        self._padding_size = QSize(padding * 2, padding * 2)
+        self._padding_offset = QPoint(padding, padding)
+        self._gap = gap
+        self._has_title = has_title
+
+        # the fonts and elide widths of title and info, they only change with the fonts
+        self._layout_key = None
+        self._layout = None
+
+        # about message title
+        if self._has_title:
+            self.title = QLabel(self.overlay)
+            self.title.setObjectName(PrateName.Title)
+            if title_font != None: 
+                self.title.setFont(title_font)
+            self.title.move(self.title_pos)
+            self.title.resize(self.title_size)
+
+        # about message description
+        self.info = QLabel(self.overlay)
+        self.info.setObjectName(PrateName.Info)
+        self.info.setWordWrap(True)
+        self.info.setAlignment(Qt.AlignmentFlag.AlignTop)
+
+        if info_font != None:
+            self.info.setFont(info_font)
+        self.info.move(self.info_pos)
+        self.info.resize(self.info_size)
+
+    @property
+    def title_pos(self):
+        '''get the position of title'''
+
+        return self._padding_offset
+    
+    @property
+    def title_size(self):
+        '''get the size of title'''
+
+        fontMetrics = self.title.fontMetrics()
+        return QSize(self.width() - self._padding_size.width(), fontMetrics.height())
+    
+    @property
+    def info_pos(self):
+        '''get the position of info'''
+
+        if self._has_title:
+            return self.title.pos() + QPoint(0, self.title.height() + self._gap)
+        return self._padding_offset
+    
+    @property
+    def info_size(self):
+        '''get the size of info'''
+
+        if self._has_title:
+            return QSize(self.title.width(), self.height() - self.title.height() - self._padding_size.height() - self._gap)
+        return self.size() - self._padding_size
+        
+    def text_layout(self) -> tuple:
+        '''get the font keys and elide widths of title and info, 
+        they are computed again only when the fonts change, like after a style sheet is polished
+        @return: (title font key, title width, info font key, info total width)'''
+
+        title_key = self.title.font().key() if self._has_title else None
+        info_key = self.info.font().key()
+        key = (title_key, info_key, self.width(), self.height())
+        if key == self._layout_key:
+            return self._layout
+
+        title_width = self.title_size.width() if self._has_title else 0
+        fontMetrics = self.info.fontMetrics()
+        lineHeight = fontMetrics.lineSpacing() + fontMetrics.lineWidth()
+        lineCapacity = math.floor(self.info_size.height() / lineHeight)
+        totalWidth = lineCapacity * self.info.width()
+
+        self._layout_key = key
+        self._layout = (title_key, title_width, info_key, totalWidth)
+        return self._layout
+
+    def set_content(self, title, info):
+        '''set title and info'''
+
+        title_key, title_width, info_key, totalWidth = self.text_layout()
+        if self._has_title:
+            self.title.setText(PrateTextLayoutCache.elide(self.title, title_key, title, title_width))
+        self.info.setText(PrateTextLayoutCache.elide(self.info, info_key, info, totalWidth))
+
+class PrateWindow(QWidget):
+    '''provide base window of prate'''
+
+    closed = pyqtSignal(object)
+
+    # the windows by the id of the message they show
+    __messages = weakref.WeakValueDictionary()
+
+    # if True, the position and opacity written in a tick are applied once when the tick ends,
+    # otherwise each write goes to the window system at once
+    batching = True
+
+    def __init__(self,
+        window_size = (280, 400),
+        padding = 10,
+        content_padding = 12,
+        content_gap = 8,
+        has_title = True,
+        title_font_name = "Microsoft YaHei",
+        title_font_size = 16,
+        info_font_name = "Microsoft YaHei",
+        info_font_size = 12,
+        title_font: QFont = None,
+        info_font: QFont = None,
+    ):
+        '''init the window, title_font and info_font take the place of font names and sizes if given'''
+
+        super().__init__(None)
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.resize(*window_size)
+        self._padding_offset = QPoint(padding, padding)
+        self._padding_size = QSize(padding * 2, padding * 2)
+
+        # about content
+        self.content = PrateContent(
+            self, 
+            self.size() - self._padding_size,
+            has_title, 
+            content_padding, 
+            content_gap, 
+            title_font if title_font != None else QFont(title_font_name, title_font_size), 
+            info_font if info_font != None else QFont(info_font_name, info_font_size)
+        )
+        self.content.move(self._padding_offset)
+        self.content.resize(self.size() - self._padding_size)
+        self.anim = None
+        self._pool = None
+        self._home_pos = None
+        self.theme_key = None
+
+        # the window is placed at the position of its animation plus the offset of its stack slot
+        self._anim_pos = (0, 0)
+        self._stack_offset = (0, 0)
+        self._layout = None
+        self._reflow = None
+        self.message_id = None
+        self.priority = PratePriority.NORMAL
+        self._dismiss_callbacks = []
+
+        # in snapshot mode the content is rasterized once and only the pixmap is painted
+        self._snapshot_mode = False
+        self._snapshot = None
+
+        # with an overlay the window is never shown, the overlay paints its snapshot
+        self._overlay = None
+        self._alpha = 1.0
+
+        # the position and opacity last applied to the window system, writes in a tick are flushed once at its end
+        self._applied_pos = None
+        self._applied_alpha = 1.0
+
+        # pause the animation while the cursor is on the window
+        self.hover_hold = False
+
+    def show_up(self):
+        '''play the animation of the window'''
+
+        if self.anim != None:
+            if self._overlay is not None:
+                self._overlay.attach(self)
+            elif self.isHidden():
+                self.show()
+            self.anim.play(self.dismiss)
+
+    def expedite(self, linger:int = 0) -> bool:
+        '''skip the wait of the window and play its exit animation
+        @param linger: the max time the running wait is kept, in millisecond
+        @return: False if it is not playing or already leaving'''
+
+        if self.anim is None:
+            return False
+        return self.anim.expedite(linger)
+
+    def retract(self) -> bool:
+        '''play the entry animation backward from where the window is, then dismiss it,
+        a window which is waiting or leaving jumps back to the end of its entry first
+        @return: False if it is not playing'''
+
+        if self.anim is None or not self.anim.playing:
+            return False
+        if self.anim.position > self.anim.entry_duration:
+            self.anim.seek(self.anim.entry_duration)
+        if not self.anim.reversed:
+            self.anim.reverse()
+        self.anim.resume()
+        return True
+
+    def dismiss(self):
+        '''stop the animation and take the window off the screen, 
+        a pooled window is given back to its pool instead of being closed'''
+
+        if self.anim != None:
+            self.anim.stop()
+        self._leave_layout()
+        self._leave_overlay()
+        if self._pool is None:
+            self.close()
+            return
+        self.hide()
+        self._notify_closed()
+        self._pool.release(self)
+
+    def on_dismissed(self, callback:object):
+        '''call the callback once when the window is taken off the screen'''
+
+        self._dismiss_callbacks.append(callback)
+
+    def _notify_closed(self):
+        '''tell others that the window is taken off the screen'''
+
+        callbacks = self._dismiss_callbacks
+        self._dismiss_callbacks = []
+        for callback in callbacks:
+            callback()
+        self.closed.emit(self)
+
+    def reset(self):
+        '''reset the window to the state before its animation'''
+
+        if self.anim != None:
+            self.anim.stop()
+        self._stop_reflow()
+        self.anim_alpha(1)
+        self.priority = PratePriority.NORMAL
+        self._stack_offset = (0, 0)
+        if self._home_pos is not None:
+            self.anim_move(self._home_pos.x(), self._home_pos.y())
+
+    def anim_move(self, x:int, y:int):
+        '''move the window by its animation, the offset of its stack slot is added'''
+
+        self._anim_pos = (x, y)
+        self._place()
+
+    def anim_pos(self) -> tuple:
+        '''get the position of the window without the offset of its stack slot'''
+
+        return self._anim_pos
+
+    def set_stack_offset(self, x:int, y:int):
+        '''set the offset of the stack slot'''
+
+        self._stack_offset = (x, y)
+        self._place()
+
+    def _place(self):
+        '''put the window at the position of its animation plus the offset of its stack slot'''
+
+        if not PrateWindow.batching or not TweenFrameClock.instance().defer(self):
+            self.flush()
+
+    def anim_alpha(self, alpha:float):
+        '''set the opacity of the window by its animation'''
+
+        self._alpha = alpha
+        if not PrateWindow.batching or not TweenFrameClock.instance().defer(self):
+            self.flush()
+
+    def flush(self):
+        '''apply the buffered position and opacity, a value equal to the last applied one is skipped,
+        the frame clock calls it once per tick for the windows written in that tick'''
+
+        pos = (self._anim_pos[0] + self._stack_offset[0], self._anim_pos[1] + self._stack_offset[1])
+        if pos != self._applied_pos:
+            self._applied_pos = pos
+            if self._overlay is not None:
+                self._overlay.move_toast(self, *pos)
+            else:
+                self.move(*pos)
+
+        if self._alpha != self._applied_alpha:
+            self._applied_alpha = self._alpha
+            if self._overlay is not None:
+                self._overlay.fade_toast(self, self._alpha)
+            else:
+                self.setWindowOpacity(self._alpha)
+
+    @property
+    def screen_rect(self) -> QRect:
+        '''get the rect of the window on the screen, it is valid with an overlay as well'''
+
+        return QRect(
+            self._anim_pos[0] + self._stack_offset[0],
+            self._anim_pos[1] + self._stack_offset[1],
+            self.width(),
+            self.height()
+        )
+
+    @property
+    def alpha(self) -> float:
+        '''get the opacity set by the animation'''
+
+        return self._alpha
+
+    @property
+    def on_screen(self) -> bool:
+        '''whether the window is shown, by itself or by its overlay'''
+
+        if self._overlay is not None:
+            return self._overlay.has(self)
+        return not self.isHidden()
+
+    def set_overlay(self, overlay:"PrateOverlay"):
+        '''let the overlay paint the window instead of showing it as a window of its own,
+        the snapshot mode is turned on since the overlay only paints the snapshot
+        @param overlay: the overlay of the screen anchor, None to show the window by itself'''
+
+        self._leave_overlay()
+        self._overlay = overlay
+        # the values applied to the former target are unknown to the new one
+        self._applied_pos = None
+        self._applied_alpha = None
+        if overlay is not None:
+            self.set_snapshot_mode(True)
+
+    def _leave_overlay(self):
+        '''take the window off its overlay'''
+
+        if self._overlay is not None:
+            self._overlay.detach(self)
+
+    @property
+    def stack_offset(self) -> tuple:
+        '''get the offset of the stack slot'''
+
+        return self._stack_offset
+
+    def reflow_to(self, offset:tuple, duration:int = 200):
+        '''animate the offset of the stack slot to the target
+        @param offset: the target offset
+        @param duration: the duration of the animation, in millisecond'''
+
+        self._stop_reflow()
+        if duration <= 0 or not self.on_screen:
+            self.set_stack_offset(*offset)
+            return
+        # the windows of a stack reflow together, the engine advances all of them in one pass
+        self._reflow = TweenFrameClock.instance().engine.add(self.set_stack_offset, self._stack_offset, offset, duration, EaseType.OUT_CUBIC)
+
+    def _stop_reflow(self):
+        '''stop the reflow where it is'''
+
+        if self._reflow is not None:
+            TweenFrameClock.instance().engine.cancel(self._reflow)
+            self._reflow = None
+
+    def set_layout(self, layout:"PrateStackLayout"):
+        '''set the stack layout which the window is placed in'''
+
+        self._layout = layout
+
+    def _leave_layout(self):
+        '''give back the stack slot of the window'''
+
+        self._stop_reflow()
+        if self._layout is not None:
+            layout = self._layout
+            self._layout = None
+            layout.release(self)
+
+    def bind_message(self, message_id:tuple):
+        '''bind the window to the message it shows'''
+
+        if PrateWindow.__messages.get(self.message_id) is self:
+            del PrateWindow.__messages[self.message_id]
+        self.message_id = message_id
+        PrateWindow.__messages[message_id] = self
+
+    @staticmethod
+    def find_message(message_id:tuple) -> "PrateWindow":
+        '''find the window which shows the message, return None if it is gone'''
+
+        window = PrateWindow.__messages.get(message_id)
+        if window is None or window.message_id != message_id:
+            return None
+        return window
+
+    def set_pool(self, pool:"PrateWindowPool"):
+        '''set the pool which owns this window'''
+
+        self._pool = pool
+
+    def set_home_pos(self, pos:QPoint):
+        '''set the position of the window before its animation'''
+
+        self._home_pos = QPoint(pos)
+        self._anim_pos = (pos.x(), pos.y())
+    
+    def mouseDoubleClickEvent(self, a0: QMouseEvent) -> None:
+        self.dismiss()
+
+    def enterEvent(self, a0: QEvent) -> None:
+        if self.hover_hold and self.anim != None:
+            self.anim.pause()
+        return super().enterEvent(a0)
+
+    def leaveEvent(self, a0: QEvent) -> None:
+        if self.hover_hold and self.anim != None:
+            self.anim.resume()
+        return super().leaveEvent(a0)
+
+    def closeEvent(self, a0: QCloseEvent) -> None:
+        self._leave_layout()
+        self._leave_overlay()
+        self._notify_closed()
+        return super().closeEvent(a0)
+
+    def paintEvent(self, a0: QPaintEvent) -> None:
+        if self._snapshot is not None:
+            painter = QPainter(self)
+            painter.drawPixmap(0, 0, self._snapshot)
+            painter.end()
+            return
+        return super().paintEvent(a0)
+
+    def set_infos(self, title: str, content:str):
+        '''set the title and content of the window'''
+
+        self.content.set_content(title, content)
+        if self._snapshot_mode:
+            self.rasterize()
+
+    @property
+    def snapshot_mode(self) -> bool:
+        '''whether the window paints a snapshot of its content instead of the widgets'''
+
+        return self._snapshot_mode
+
+    def set_snapshot_mode(self, enabled:bool):
+        '''turn the snapshot mode on or off, in snapshot mode the background, overlay, text and shadow
+        are rasterized into a pixmap once per message, and animation frames only paint that pixmap'''
+
+        self._snapshot_mode = enabled
+        if enabled:
+            self.rasterize()
+            return
+        self._snapshot = None
+        self.content.show()
+        self.update()
+
+    def rasterize(self):
+        '''rasterize the content into the snapshot, call it after changing the content by hand'''
+
+        self._snapshot = None
+        self.content.show()
+        self.ensurePolished()
+        self._snapshot = self.grab()
+        # the widgets and their shadow effect are not painted any more
+        self.content.hide()
+        self.update()
+        if self._overlay is not None:
+            self._overlay.refresh_toast(self)
+
+    @property
+    def snapshot(self) -> QPixmap:
+        '''get the rasterized content, None if the window is not in snapshot mode'''
+
+        return self._snapshot
+
+    def set_anim(self, anim:TweenAnimation):
+        '''set the animation of the window'''
+
+        if isinstance(anim, TweenAnimation):
+            self.anim = anim
+
+    @property
+    def visible_size(self):
+        '''get the real size of the window'''
+
+        return self.size() - self._padding_size
+
+
+class ScreenPositionUtils:
+    '''provide some utils to get the position of screen'''
+
+    @staticmethod
+    def get_left_bottom(size: QSize, padding: QSize = QSize(12, 12)):
+        
+        screen_size = QApplication.primaryScreen().size()
+        return QPoint(padding.width(), screen_size.height() - size.height() - padding.height())
+    
+    @staticmethod
+    def get_left_top(size: QSize, padding: QSize = QSize(12, 12)):
+        
+        return QPoint(padding.width(), padding.height())
+    
+    @staticmethod
+    def get_right_bottom(size: QSize, padding: QSize = QSize(12, 12)):
+            
+        screen_size = QApplication.primaryScreen().size()
+        return QPoint(screen_size.width() - size.width() - padding.width(), screen_size.height() - size.height() - padding.height())
+    
+    @staticmethod
+    def get_right_top(size: QSize, padding: QSize = QSize(12, 12)):
+        
+        screen_size = QApplication.primaryScreen().size()
+
+        return QPoint(screen_size.width() - size.width() - padding.width(), padding.height())
+    
+    @staticmethod
+    def get_center(size: QSize):
+        
+        screen_size = QApplication.primaryScreen().size()
+        return QPoint((screen_size.width() - size.width()) // 2, (screen_size.height() - size.height()) // 2)
+    
+    @staticmethod
+    def get_top_center(size: QSize, padding: QSize = QSize(12, 12)):
+            
+        screen_size = QApplication.primaryScreen().size()
+        return QPoint((screen_size.width() - size.width()) // 2, padding.height())
+    
+    @staticmethod
+    def get_bottom_center(size: QSize, padding: QSize = QSize(12, 12)):
+            
+        screen_size = QApplication.primaryScreen().size()
+        return QPoint((screen_size.width() - size.width()) // 2, screen_size.height() - size.height() - padding.height())
+    
+    @staticmethod
+    def get_left_center(size: QSize, padding: QSize = QSize(12, 12)):
+                
+        screen_size = QApplication.primaryScreen().size()
+        return QPoint(padding.width(), (screen_size.height() - size.height()) // 2)
+    
+    @staticmethod
+    def get_right_center(size: QSize, padding: QSize = QSize(12, 12)):
+                    
+        screen_size = QApplication.primaryScreen().size()
+        return QPoint(screen_size.width() - size.width() - padding.width(), (screen_size.height() - size.height()) // 2)
+
+class ScreenPosition:
+
+    LeftBottom = "leftbottom"
+    LeftTop = "lefttop"
+    RightBottom = "rightbottom"
+    RightTop = "righttop"
+    Center = "center"
+    CenterTop = "topcenter"
+    CenterBottom = "bottomcenter"
+    CenterLeft = "leftcenter"
+    CenterRight = "rightcenter"
+
+    functions = {
+        LeftBottom: ScreenPositionUtils.get_left_bottom,
+        LeftTop: ScreenPositionUtils.get_left_top,
+        RightBottom: ScreenPositionUtils.get_right_bottom,
+        RightTop: ScreenPositionUtils.get_right_top,
+        Center: ScreenPositionUtils.get_center,
+        CenterTop: ScreenPositionUtils.get_top_center,
+        CenterBottom: ScreenPositionUtils.get_bottom_center,
+        CenterLeft: ScreenPositionUtils.get_left_center,
+        CenterRight: ScreenPositionUtils.get_right_center
+    }
+
+    def get_pos(size, flag:str, padding:list = (12, 12)):
+
+        if isinstance(size, list) or isinstance(size, tuple):
+            size = QSize(*size)
+
+        _lower = flag.lower()
+        if _lower in ScreenPosition.functions:
+            return ScreenPosition.functions[_lower](size, QSize(*padding))
+        return QPoint()
+
+
+class PrateStackLayout:
+    '''stack the live windows of a screen anchor so that they do not cover each other,
+    when a window leaves, the windows behind it slide into the freed space,
+    windows beyond max_visible wait until a slot is free, the most urgent one first,
+    a window makes the windows of lower priority skip their wait, an urgent one is placed at once,
+    must be used in the gui thread'''
+
+    # anchors which stack upward, others stack downward
+    UPWARD = (ScreenPosition.LeftBottom, ScreenPosition.RightBottom, ScreenPosition.CenterBottom)
+
+    __layouts = {}
+
+    @staticmethod
+    def of(screen_pos:str, screen_padding:list = (12, 12), max_visible:int = 5) -> "PrateStackLayout":
+        '''get the layout of a screen anchor, create it if necessary
+        @param screen_pos: the screen anchor, like "RightBottom"
+        @param screen_padding: the padding to the screen edge
+        @param max_visible: the max number of windows shown at once, the layout of an anchor is shared, 
+        so the latest one applies to it'''
+
+        key = (screen_pos.lower(), tuple(screen_padding))
+        layout = PrateStackLayout.__layouts.get(key)
+        if layout is None:
+            layout = PrateStackLayout(screen_pos, max_visible)
+            PrateStackLayout.__layouts[key] = layout
+        else:
+            layout.set_max_visible(max_visible)
+        return layout
+
+    @staticmethod
+    def clear_all():
+        '''forget all the layouts'''
+
+        PrateStackLayout.__layouts.clear()
+
+    def __init__(self, screen_pos:str, max_visible:int = 5, spacing:int = 0, reflow_duration:int = 200):
+        '''init the layout
+        @param screen_pos: the screen anchor, like "RightBottom"
+        @param max_visible: the max number of windows shown at once
+        @param spacing: the space between two windows
+        @param reflow_duration: the duration of sliding into the freed space, in millisecond'''
+
+        self.direction = -1 if screen_pos.lower() in PrateStackLayout.UPWARD else 1
+        self.max_visible = max(1, max_visible)
+        self.spacing = spacing
+        self.reflow_duration = reflow_duration
+
+        # the windows in slots, the first one is at the anchor, and the offsets of their slots
+        self._slots = []
+        self._offsets = []
+        self._waiting = deque()
+
+    def __len__(self):
+        '''get the number of windows in slots'''
+
+        return len(self._slots)
+
+    @property
+    def waiting(self) -> int:
+        '''get the number of windows waiting for a slot'''
+
+        return len(self._waiting)
+
+    def set_max_visible(self, max_visible:int):
+        '''change the max number of windows shown at once, waiting windows take the new slots at once, 
+        windows beyond a lower limit stay until they leave'''
+
+        self.max_visible = max(1, max_visible)
+        self._place_waiting()
+
+    def _place_waiting(self):
+        '''place the waiting windows into the free slots, the most urgent one first'''
+
+        while len(self._waiting) > 0 and len(self._slots) < self.max_visible:
+            waiting, on_placed = self._waiting.popleft()
+            self.place(waiting, on_placed)
+
+    def _next_offset(self) -> int:
+        '''get the offset of the slot after the last one'''
+
+        if len(self._slots) == 0:
+            return 0
+        last = self._slots[-1]
+        return self._offsets[-1] + self.direction * (last.height() + self.spacing)
+
+    def place(self, window:PrateWindow, on_placed:object = None) -> bool:
+        '''place the window into a free slot, or let it wait for one
+        @param window: the window to place
+        @param on_placed: called when the window gets its slot, usually to show it up
+        @return: True if the window is placed at once'''
+
+        if len(self._slots) >= self.max_visible:
+            self.preempt(window.priority)
+            if window.priority < PratePriority.URGENT:
+                # behind the waiting windows of the same or higher priority
+                index = len(self._waiting)
+                for i, (waiting, _) in enumerate(self._waiting):
+                    if waiting.priority < window.priority:
+                        index = i
+                        break
+                self._waiting.insert(index, (window, on_placed))
+                window.set_layout(self)
+                return False
+
+        offset = self._next_offset()
+        self._slots.append(window)
+        self._offsets.append(offset)
+        window.set_layout(self)
+        window.set_stack_offset(0, offset)
+        if on_placed != None and callable(on_placed):
+            on_placed()
+        return True
+
+    def preempt(self, priority:int) -> bool:
+        '''make the window of the lowest priority below the given one skip its wait,
+        it leaves through its exit animation, the oldest one goes first
+        @return: False if no window is lower or all of them are leaving already'''
+
+        for window in sorted(self._slots, key=lambda window: window.priority):
+            if window.priority >= priority:
+                return False
+            if window.expedite():
+                return True
+        return False
+
+    def release(self, window:PrateWindow):
+        '''free the slot of the window and reflow the windows behind it'''
+
+        try:
+            index = self._slots.index(window)
+        except ValueError:
+            self._waiting = deque(item for item in self._waiting if item[0] is not window)
+            return
+
+        height = self.direction * (window.height() + self.spacing)
+        del self._slots[index]
+        del self._offsets[index]
+        for i in range(index, len(self._slots)):
+            self._offsets[i] -= height
+            self._slots[i].reflow_to((0, self._offsets[i]), self.reflow_duration)
+        self._place_waiting()
+
+
+class PrateOverlay(QWidget):
+    '''one transparent, click-through window of a screen anchor which paints the snapshots of all its toasts, 
+    the toasts are never shown as windows of their own, so moving or fading them repaints the dirty regions 
+    of the overlay instead of a round trip to the window system for each toast, must be used in the gui thread'''
+
+    __overlays = {}
+
+    @staticmethod
+    def of(screen_pos:str, screen_padding:list = (12, 12)) -> "PrateOverlay":
+        '''get the overlay of a screen anchor, create it if necessary
+        @param screen_pos: the screen anchor, like "RightBottom"
+        @param screen_padding: the padding to the screen edge'''
+
+        key = (screen_pos.lower(), tuple(screen_padding))
+        overlay = PrateOverlay.__overlays.get(key)
+        if overlay is None or sip.isdeleted(overlay):
+            overlay = PrateOverlay()
+            PrateOverlay.__overlays[key] = overlay
+        return overlay
+
+    @staticmethod
+    def clear_all():
+        '''close and forget all the overlays'''
+
+        for overlay in PrateOverlay.__overlays.values():
+            if not sip.isdeleted(overlay):
+                overlay.close()
+        PrateOverlay.__overlays.clear()
+
+    def __init__(self):
+        '''init the overlay, it covers the primary screen'''
+
+        super().__init__(None)
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool | Qt.WindowTransparentForInput)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setGeometry(QApplication.primaryScreen().geometry())
+
+        # the toasts in paint order and their rects in the overlay
+        self._toasts = OrderedDict()
+        self.paints = 0
+
+    def __len__(self):
+        '''get the number of toasts on the overlay'''
+
+        return len(self._toasts)
+
+    def has(self, window:PrateWindow) -> bool:
+        '''whether the window is painted by the overlay'''
+
+        return window in self._toasts
+
+    def _local(self, rect:QRect) -> QRect:
+        '''map a rect on the screen into the overlay'''
+
+        return rect.translated(-self.x(), -self.y())
+
+    def attach(self, window:PrateWindow):
+        '''start painting the window, the overlay shows up with its first toast'''
+
+        rect = self._local(window.screen_rect)
+        self._toasts[window] = rect
+        self.update(rect)
+        if self.isHidden():
+            self.show()
+
+    def detach(self, window:PrateWindow):
+        '''stop painting the window, the overlay hides with its last toast'''
+
+        rect = self._toasts.pop(window, None)
+        if rect is None:
+            return
+        self.update(rect)
+        if len(self._toasts) == 0:
+            self.hide()
+
+    def move_toast(self, window:PrateWindow, x:int, y:int):
+        '''move a toast, only the old and new rects are repainted'''
+
+        old = self._toasts.get(window)
+        if old is None:
+            return
+        rect = QRect(x - self.x(), y - self.y(), old.width(), old.height())
+        if rect == old:
+            return
+        self._toasts[window] = rect
+        self.update(old)
+        self.update(rect)
+
+    def fade_toast(self, window:PrateWindow, alpha:float):
+        '''repaint a toast whose opacity is changed'''
+
+        rect = self._toasts.get(window)
+        if rect is not None:
+            self.update(rect)
+
+    def refresh_toast(self, window:PrateWindow):
+        '''repaint a toast whose snapshot is changed'''
+
+        self.fade_toast(window, window.alpha)
+
+    def paintEvent(self, a0: QPaintEvent) -> None:
+        self.paints += 1
+        region = a0.region()
+        painter = QPainter(self)
+        for window, rect in self._toasts.items():
+            snapshot = window.snapshot
+            if snapshot is None or window.alpha <= 0 or not region.intersects(rect):
+                continue
+            painter.setOpacity(window.alpha)
+            painter.drawPixmap(rect.topLeft(), snapshot)
+        painter.end()
+
+
+class PrateImageRenderer:
+    '''render notifications or the frames of their animation to images without showing any window,
+    for visual regression tests of themes and previews, it uses the configure and animation plan of the screen,
+    one window is crafted and reused for all renders, must be used in the gui thread'''
+
+    __app = None
+
+    @staticmethod
+    def application() -> QApplication:
+        '''get the application, create one on the offscreen platform if there is none'''
+
+        app = QApplication.instance()
+        if app is None:
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+            app = QApplication(sys.argv[:1])
+            PrateImageRenderer.__app = app
+        return app
+
+    def __init__(self, configure:PrateWindowAppearanceConfigure, fps:int = 60):
+        '''init the renderer
+        @param configure: the configure of the rendered windows
+        @param fps: the frame rate of rendered animations'''
+
+        PrateImageRenderer.application()
+        self.configure = configure
+        self.fps = max(1, fps)
+        self._window = None
+
+    @property
+    def window(self) -> PrateWindow:
+        '''get the window which is rendered, it is never shown'''
+
+        if self._window is None or sip.isdeleted(self._window):
+            self._window = self.configure.craft_window()
+            # a rendered window is grabbed once per message, frames only paint the snapshot
+            self._window.set_overlay(None)
+            self._window.set_snapshot_mode(True)
+        return self._window
+
+    def render(self, title:str = "", content:str = "") -> QImage:
+        '''render the window of a message as it looks when it is not animated
+        @return: the image, its size is the size of the window'''
+
+        window = self.window
+        window.reset()
+        window.set_infos(title, content)
+        return window.snapshot.toImage()
+
+    def render_frames(self, title:str = "", content:str = "", fps:int = None) -> list:
+        '''render the animation of a message frame by frame, the position and opacity come from the animation plan
+        @param fps: the frame rate, default to the fps of renderer
+        @return: the list of images, all of them cover every position the window passes by'''
+
+        window = self.window
+        window.reset()
+        window.set_infos(title, content)
+        snapshot = window.snapshot
+
+        step = 1000 / (fps or self.fps)
+        anim = window.anim
+        times = [i * step for i in range(int(anim.duration / step) + 1)] if anim is not None else [0]
+        states = []
+        if anim is None:
+            states.append((window.screen_rect, window.alpha))
+        else:
+            anim.drive(times, lambda at: states.append((window.screen_rect, window.alpha)))
+        window.reset()
+
+        canvas = QRect(states[0][0])
+        for rect, _ in states:
+            canvas = canvas.united(rect)
+        frames = []
+        for rect, alpha in states:
+            image = QImage(canvas.size(), QImage.Format_ARGB32_Premultiplied)
+            image.fill(Qt.transparent)
+            painter = QPainter(image)
+            painter.setOpacity(alpha)
+            painter.drawPixmap(rect.topLeft() - canvas.topLeft(), snapshot)
+            painter.end()
+            frames.append(image)
+        return frames
+
+    def save(self, path:str, title:str = "", content:str = "") -> str:
+        '''render the window of a message to a file, the format comes from the suffix like .png
+        @return: the path'''
+
+        if not self.render(title, content).save(path):
+            raise OSError(f"failed to save the image to {path}")
+        return path
+
+    def save_frames(self, directory:str, title:str = "", content:str = "", fps:int = None, prefix:str = "frame") -> list:
+        '''render the animation of a message to png files like frame_0000.png in the directory
+        @return: the paths of frames'''
+
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for i, image in enumerate(self.render_frames(title, content, fps)):
+            path = os.path.join(directory, f"{prefix}_{i:04d}.png")
+            if not image.save(path):
+                raise OSError(f"failed to save the image to {path}")
+            paths.append(path)
+        return paths
+
+    def close(self):
+        '''close the window of the renderer'''
+
+        if self._window is not None and not sip.isdeleted(self._window):
+            self._window.close()
+        self._window = None
+
+
+class PrateCompiledTheme(NamedTuple):
+    '''the immutable result of compiling a configure, 
+    all windows of the same configure share it and only bind their text'''
+
+    # the json fields which the expensive pieces are compiled from
+    PIECES = {
+        "qss": (
+            "name", "border-radius", "background-image", "overlay-color", "title-color", "info-color", 
+            "title-font-bold", "title-font-style", "info-font-bold", "info-font-style"
+        ),
+        "title_font": ("title-font-name", "title-font-size"),
+        "info_font": ("info-font-name", "info-font-size"),
+        "shadow_color": ("shadow-color",),
+        "home_pos": ("window-size", "screen-pos", "screen-padding"),
+    }
+
+    key: str
+    qss: str
+    style_name: str
+    window_size: tuple
+    padding: int
+    content_padding: int
+    content_gap: int
+    has_title: bool
+    title_font: QFont
+    info_font: QFont
+    snapshot: bool
+    overlay: bool
+    hover_hold: bool
+    shadow_blur_radius: int
+    shadow_offset: tuple
+    shadow_color: QColor
+    home_pos: QPoint
+    plan: PrateAnimationPlan
+
+    @staticmethod
+    def compile(configure:"PrateWindowAppearanceConfigure", base:"PrateCompiledTheme" = None, changed:set = None) -> "PrateCompiledTheme":
+        '''compile the configure, must be called in the gui thread
+        @param base: the theme of a previous version of the configure, its pieces are reused if their fields are not changed
+        @param changed: the json fields changed since the base'''
+
+        def _piece(name:str, build:object):
+            if base is not None and changed.isdisjoint(PrateCompiledTheme.PIECES[name]):
+                return getattr(base, name)
+            return build()
+
+        window_size = tuple(configure.window_size)
+        qss = _piece("qss", configure.build_qss)
+        return PrateCompiledTheme(
+            key=configure.fingerprint,
+            qss=qss,
+            # themes with the same style sheet share its rules in the application
+            style_name="PrateStyle_" + hashlib.sha1(qss.encode("utf-8")).hexdigest()[:12],
+            window_size=window_size,
+            padding=configure.padding,
+            content_padding=configure.content_padding,
+            content_gap=configure.content_gap,
+            has_title=configure.has_title,
+            title_font=_piece("title_font", lambda: QFont(configure.title_font_name, configure.title_font_size)),
+            info_font=_piece("info_font", lambda: QFont(configure.info_font_name, configure.info_font_size)),
+            snapshot=bool(configure.snapshot),
+            overlay=bool(configure.overlay),
+            hover_hold=bool(configure.hover_hold),
+            shadow_blur_radius=configure.shadow_blur_radius,
+            shadow_offset=(configure.shadow_x_offset, configure.shadow_y_offset),
+            shadow_color=_piece("shadow_color", lambda: QColor(*configure.shadow_color)),
+            home_pos=_piece("home_pos", lambda: ScreenPosition.get_pos(window_size, configure.screen_pos, configure.screen_padding)),
+            plan=configure.animation_plan
+        )
+
+    def install(self) -> str:
+        '''add the style sheet to the application once, scoped by the object name of windows,
+        so qt parses it once instead of once for each window, it is added again if the application is new
+        @return: the object name of the windows of this theme'''
+
+        app = QApplication.instance()
+        sheet = app.styleSheet()
+        if f"#{self.style_name} " not in sheet:
+            # each rule starts a line with the object name of a child of the window
+            app.setStyleSheet(sheet + re.sub(r"(?m)^#", f"#{self.style_name} #", self.qss))
+        return self.style_name
+
+    def craft_shadow(self) -> QGraphicsDropShadowEffect:
+        '''craft the shadow effect, an effect can not be shared by widgets'''
+
+        return QGraphicsDropShadowEffect(
+            blurRadius=self.shadow_blur_radius, 
+            xOffset=self.shadow_offset[0], 
+            yOffset=self.shadow_offset[1], 
+            color=self.shadow_color
+        )
+
+class PrateThemeCache:
+    '''cache of compiled themes, keyed by the fingerprint of configure'''
+
+    max_size = 32
+    __themes = OrderedDict()
+    __lock = threading.Lock()
+
+    @staticmethod
+    def get(configure:"PrateWindowAppearanceConfigure") -> PrateCompiledTheme:
+        '''get the compiled theme of configure, compile it if necessary'''
+
+        key = configure.fingerprint
+        with PrateThemeCache.__lock:
+            theme = PrateThemeCache.__themes.get(key)
+            if theme is not None:
+                PrateThemeCache.__themes.move_to_end(key)
+                return theme
+
+        theme = PrateCompiledTheme.compile(configure)
+        PrateThemeCache._put(theme)
+        return theme
+
+    @staticmethod
+    def _put(theme:PrateCompiledTheme):
+        '''cache a compiled theme'''
+
+        with PrateThemeCache.__lock:
+            PrateThemeCache.__themes[theme.key] = theme
+            while len(PrateThemeCache.__themes) > PrateThemeCache.max_size:
+                PrateThemeCache.__themes.popitem(last=False)
+
+    @staticmethod
+    def recompile(previous:"PrateWindowAppearanceConfigure", configure:"PrateWindowAppearanceConfigure") -> PrateCompiledTheme:
+        '''compile a new version of a configure, the pieces whose fields are not changed 
+        are taken from the compiled theme of the previous version, must be called in the gui thread
+        @return: the compiled theme, it is cached so that new windows of the configure use it'''
+
+        with PrateThemeCache.__lock:
+            theme = PrateThemeCache.__themes.get(configure.fingerprint)
+            base = PrateThemeCache.__themes.get(previous.fingerprint)
+        if theme is not None:
+            return theme
+        if base is None:
+            return PrateThemeCache.get(configure)
+
+        before, after = previous.to_dict(), configure.to_dict()
+        changed = {key for key in after if after[key] != before.get(key)}
+        theme = PrateCompiledTheme.compile(configure, base, changed)
+        PrateThemeCache._put(theme)
+        return theme
+
+    @staticmethod
+    def clear():
+        '''drop all compiled themes'''
+
+        with PrateThemeCache.__lock:
+            PrateThemeCache.__themes.clear()
+
+
+class PrateWindowPool:
+    '''a bounded pool of pre-built windows of a configure, windows are reset and 
+    reused instead of being crafted for every message, must be used in the gui thread,
+    pools are shared by the fingerprint of configure, so equal configures which are unpickled
+    for each message share one pool, a pool is forgotten when it has no idle or lent window'''
+
+    __pools = {}
+
+    @staticmethod
+    def of(configure:PrateWindowAppearanceConfigure, min_size:int = 0, max_size:int = 8, idle_timeout:int = 30000) -> "PrateWindowPool":
+        '''get the pool of the configure, create it if necessary
+        @param configure: the configure which crafts the windows
+        @param min_size: the number of idle windows always kept
+        @param max_size: the max number of idle windows kept
+        @param idle_timeout: idle windows above min_size are evicted after this, in millisecond'''
+
+        key = configure.fingerprint
+        pool = PrateWindowPool.__pools.get(key)
+        if pool is None:
+            pool = PrateWindowPool(configure, min_size, max_size, idle_timeout)
+            pool._key = key
+            PrateWindowPool.__pools[key] = pool
+        return pool
+
+    @staticmethod
+    def rebind(previous:PrateWindowAppearanceConfigure, configure:PrateWindowAppearanceConfigure):
+        '''let the pool of a configure serve its new version, idle windows of the old theme are dropped 
+        on the next acquire and windows on screen are closed when they are given back'''
+
+        pool = PrateWindowPool.__pools.pop(previous.fingerprint, None)
+        if pool is None:
+            return
+        pool.configure = configure
+        if configure.fingerprint in PrateWindowPool.__pools:
+            # the new theme has a pool already, this one only takes back its lent windows
+            pool.clear()
+            return
+        pool._key = configure.fingerprint
+        PrateWindowPool.__pools[pool._key] = pool
+
+    @staticmethod
+    def clear_all():
+        '''clear all the pools'''
+
+        for pool in PrateWindowPool.__pools.values():
+            pool.clear()
+        PrateWindowPool.__pools.clear()
+
+    def __init__(self, configure:PrateWindowAppearanceConfigure, min_size:int = 0, max_size:int = 8, idle_timeout:int = 30000):
+        '''init the pool
+        @param configure: the configure which crafts the windows
+        @param min_size: the number of idle windows always kept
+        @param max_size: the max number of idle windows kept
+        @param idle_timeout: idle windows above min_size are evicted after this, in millisecond'''
+
+        self.configure = configure
+        self.min_size = max(0, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.idle_timeout = max(1, idle_timeout)
+        self.debug = False
+        self._key = None
+
+        # pairs of (window, released time)
+        self._idle = []
+        # the windows crafted by this pool which are not closed, idle or on the screen
+        self._owned = weakref.WeakSet()
+        self._evict_timer = QTimer()
+        self._evict_timer.setSingleShot(True)
+        self._evict_timer.timeout.connect(self.evict_idle)
+        if self.min_size > 0:
+            QTimer.singleShot(0, self.prefill)
+
+    def __len__(self):
+        '''get the number of idle windows'''
+
+        return len(self._idle)
+
+    def _craft(self) -> PrateWindow:
+        '''craft a new window owned by this pool'''
+
+        window = self.configure.craft_window(self.debug)
+        window.set_pool(self)
+        self._owned.add(window)
+        return window
+
+    def _close(self, window:PrateWindow):
+        '''close a window of this pool'''
+
+        window.set_pool(None)
+        self._owned.discard(window)
+        window.close()
+
+    def _forget_if_unowned(self):
+        '''forget the pool when it has no idle or lent window, so pools of old configures do not pile up'''
+
+        if len(self._idle) == 0 and len(self._owned) == 0 and PrateWindowPool.__pools.get(self._key) is self:
+            del PrateWindowPool.__pools[self._key]
+
+    def prefill(self):
+        '''craft idle windows until there are min_size of them'''
+
+        now = time.monotonic()
+        while len(self._idle) < self.min_size:
+            self._idle.append((self._craft(), now))
+
+    def acquire(self) -> PrateWindow:
+        '''get an idle window or craft a new one'''
+
+        if len(self._idle) > 0 and self._idle[-1][0].theme_key != self.configure.fingerprint:
+            # the configure is changed, idle windows are out of date
+            self.clear()
+
+        if len(self._idle) == 0:
+            return self._craft()
+        window, _ = self._idle.pop()
+        window.reset()
+        return window
+
+    def release(self, window:PrateWindow):
+        '''give back a window which is done with its message'''
+
+        if len(self._idle) >= self.max_size or window.theme_key != self.configure.fingerprint:
+            self._close(window)
+            self._forget_if_unowned()
+            return
+        self._idle.append((window, time.monotonic()))
+        if len(self._idle) > self.min_size and not self._evict_timer.isActive():
+            self._evict_timer.start(self.idle_timeout)
+
+    def evict_idle(self):
+        '''close the windows which are idle for too long, but keep min_size of them'''
+
+        deadline = time.monotonic() - self.idle_timeout / 1000
+        # the oldest windows are at the front
+        while len(self._idle) > self.min_size and self._idle[0][1] <= deadline:
+            window, _ = self._idle.pop(0)
+            self._close(window)
+        self._forget_if_unowned()
+
+        if len(self._idle) > self.min_size:
+            wait = (self._idle[0][1] - deadline) * 1000
+            self._evict_timer.start(max(1, int(wait)))
+
+    def clear(self):
+        '''close all the idle windows'''
+
+        self._evict_timer.stop()
+        for window, _ in self._idle:
+            self._close(window)
+        self._idle.clear()
@@ -0,0 +1,34 @@
+# Desc: shared fixtures of the tests, the gui tests run on the offscreen platform of qt
+
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope="session")
+def qapp():
+    '''the application of the main thread, the tests drive its event loop by hand'''
+
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv[:1])
+    app.setQuitOnLastWindowClosed(False)
+    return app
+
+@pytest.fixture
+def run_loop(qapp):
+    '''run the event loop until quit is called or the timeout passes, in millisecond'''
+
+    from PyQt5.QtCore import QEventLoop, QTimer
+
+    def _run(start:object, timeout:int = 5000):
+        loop = QEventLoop()
+        QTimer.singleShot(timeout, loop.quit)
+        start(loop.quit)
+        loop.exec_()
+
+    return _run
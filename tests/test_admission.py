@@ -0,0 +1,79 @@
+# Desc: the admission control in front of window creation, repeats are merged and new messages are rate limited
+
+import time
+
+import pytest
+
+from prate import Prate, PrateAdmission, PrateHandle, PrateMessage
+
+def test_repeats_inside_the_window_are_merged():
+    admission = PrateAdmission(dedup_window=10)
+    first = PrateMessage("title", "content")
+
+    assert admission.admit(first) == (PrateAdmission.ACCEPTED, first)
+    assert admission.admit(PrateMessage("title", "content")) == (PrateAdmission.MERGED, first)
+    assert admission.admit(PrateMessage("title", "content")) == (PrateAdmission.MERGED, first)
+    assert first.count == 3
+    assert first.display_title == "title (x3)"
+
+    other = PrateMessage("title", "other")
+    assert admission.admit(other) == (PrateAdmission.ACCEPTED, other)
+    assert admission.stats() == {"accepted": 2, "merged": 2, "dropped": 0}
+
+def test_repeats_after_the_window_are_new_messages():
+    admission = PrateAdmission(dedup_window=0.05)
+    first = PrateMessage("title", "content")
+    admission.admit(first)
+    time.sleep(0.1)
+
+    repeat = PrateMessage("title", "content")
+    assert admission.admit(repeat) == (PrateAdmission.ACCEPTED, repeat)
+    assert first.count == 1
+
+def test_no_merge_without_a_window():
+    admission = PrateAdmission()
+    first = PrateMessage("title", "content")
+    repeat = PrateMessage("title", "content")
+
+    assert admission.admit(first) == (PrateAdmission.ACCEPTED, first)
+    assert admission.admit(repeat) == (PrateAdmission.ACCEPTED, repeat)
+
+def test_repeat_of_a_dropped_message_is_not_merged():
+    admission = PrateAdmission(dedup_window=10)
+    first = PrateMessage("title", "content")
+    first.handle = PrateHandle(first)
+    admission.admit(first)
+    first.drop()
+
+    repeat = PrateMessage("title", "content")
+    assert admission.admit(repeat) == (PrateAdmission.ACCEPTED, repeat)
+    assert first.count == 1
+    assert first.handle.is_dropped
+    # later repeats go to the new message
+    assert admission.admit(PrateMessage("title", "content")) == (PrateAdmission.MERGED, repeat)
+
+def test_token_bucket_limits_new_messages():
+    admission = PrateAdmission(rate=20, burst=2)
+
+    decisions = [admission.admit(PrateMessage("title", str(i)))[0] for i in range(4)]
+    assert decisions == [PrateAdmission.ACCEPTED, PrateAdmission.ACCEPTED, PrateAdmission.DROPPED, PrateAdmission.DROPPED]
+
+    # a token comes back every 1 / rate seconds
+    time.sleep(0.1)
+    assert admission.admit(PrateMessage("title", "later"))[0] == PrateAdmission.ACCEPTED
+    assert admission.stats()["dropped"] == 2
+
+def test_merged_repeats_do_not_take_tokens():
+    admission = PrateAdmission(rate=1, burst=1, dedup_window=10)
+    first = PrateMessage("title", "content")
+
+    assert admission.admit(first)[0] == PrateAdmission.ACCEPTED
+    assert admission.admit(PrateMessage("title", "content"))[0] == PrateAdmission.MERGED
+    assert admission.admit(PrateMessage("title", "other"))[0] == PrateAdmission.DROPPED
+
+def test_dedup_needs_a_renderer_which_shows_the_count():
+    with pytest.raises(ValueError):
+        Prate(dedup_window=5)
+
+    # rate limit alone works per call
+    assert Prate(rate_limit=10)._admission is not None
@@ -0,0 +1,62 @@
+# Desc: the animation list of a configure is compiled once, invalid entries are reported with their index
+
+import pytest
+
+from prate import EaseType, PrateAnimationError, PrateAnimationParser, PrateAnimationPlan
+
+def test_compile_typed_specs():
+    plan = PrateAnimationPlan.compile([
+        "offset_from;0.5s;outexpo;(-400, 0)",
+        "wait;2s",
+        ["alpha;0.25s;linear;(1, 0)", "move;0.25s;cubic-bezier(0.25, 0.1, 0.25, 1);(0, 0);(10, 20)"],
+    ])
+
+    assert len(plan.steps) == 3
+    offset, = plan.steps[0]
+    assert (offset.kind, offset.duration, offset.ease, offset.values) == ("offset_from", 500, EaseType.OUT_EXPO, (-400, 0))
+    assert plan.steps[1][0].kind == "wait"
+    alpha, move = plan.steps[2]
+    assert alpha.values == (1.0, 0.0)
+    assert move.ease == "cubic-bezier(0.25, 0.1, 0.25, 1)"
+    assert move.values == ((0, 0), (10, 20))
+
+@pytest.mark.parametrize("info, token", [
+    ("spin;0.5s;linear;(0, 1)", "spin"),
+    ("alpha;0.5s;linear", "alpha;0.5s;linear"),
+    ("wait;2s;linear", "wait;2s;linear"),
+    ("alpha;soon;linear;(0, 1)", "soon"),
+    ("alpha;-1s;linear;(0, 1)", "-1s"),
+    ("alpha;0.5s;bouncy;(0, 1)", "bouncy"),
+    ("alpha;0.5s;linear;(0, 1, 2)", "(0, 1, 2)"),
+    ("move;0.5s;linear;(0, 0);(1.5, 2)", "(1.5, 2)"),
+    ("offset;0.5s;linear;(x, 0)", "(x, 0)"),
+    (42, 42),
+])
+def test_compile_tween_reports_the_invalid_token(info, token):
+    with pytest.raises(PrateAnimationError) as error:
+        PrateAnimationParser.compile_tween(info, (3,))
+
+    assert error.value.index == (3,)
+    assert error.value.token == token
+    assert str(error.value).startswith(f"animation[3] {token!r}: ")
+
+def test_compile_reports_the_index_inside_a_group():
+    with pytest.raises(PrateAnimationError) as error:
+        PrateAnimationPlan.compile(["wait;1s", ["wait;1s", "alpha;1s;linear;(0)"]])
+
+    assert error.value.index == (1, 1)
+    assert error.value.token == "(0)"
+
+@pytest.mark.parametrize("animation_list, index", [
+    ("wait;1s", ()),
+    (["wait;1s", []], (1,)),
+])
+def test_compile_rejects_a_malformed_list(animation_list, index):
+    with pytest.raises(PrateAnimationError) as error:
+        PrateAnimationPlan.compile(animation_list)
+
+    assert error.value.index == index
+
+def test_animation_error_is_a_value_error():
+    assert issubclass(PrateAnimationError, ValueError)
+    assert PrateAnimationParser.build_single_animaion(None, "spin;1s") is None
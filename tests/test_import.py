@@ -0,0 +1,47 @@
+# Desc: producers import prate and prate_client without the gui toolkit or numpy
+
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import os, sys, json
+{statement}
+rss = 0
+try:
+    with open("/proc/self/statm") as f:
+        rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+except (OSError, ValueError, AttributeError):
+    pass
+print(json.dumps({{"modules": sorted(sys.modules), "rss_kb": rss}}))
+"""
+
+def _import(statement:str) -> dict:
+    '''run the import statement in a fresh interpreter, return its modules and resident memory'''
+
+    output = subprocess.check_output(
+        [sys.executable, "-c", PROBE.format(statement=statement)], 
+        cwd=ROOT, env=dict(os.environ, PYTHONPATH=ROOT)
+    )
+    return json.loads(output)
+
+def _heavy(modules:list) -> list:
+    return [name for name in modules if name.split(".")[0] in ("PyQt5", "numpy")]
+
+@pytest.mark.parametrize("statement", ["import prate_client", "import prate", "from prate import Prate, PrateClient, PrateMessage"])
+def test_producer_import_loads_no_qt_or_numpy(statement):
+    assert _heavy(_import(statement)["modules"]) == []
+
+def test_producer_import_is_lighter_than_gui_import():
+    producer = _import("import prate")
+    gui = _import("import prate, prate_qt")
+
+    assert "PyQt5.QtWidgets" in gui["modules"]
+    assert len(producer["modules"]) < len(gui["modules"])
+    if producer["rss_kb"] and gui["rss_kb"]:
+        assert producer["rss_kb"] < gui["rss_kb"]
@@ -0,0 +1,134 @@
+# Desc: the ingest queue in front of the renderer thread, its overflow policies and ttl
+
+import os
+import sys
+import time
+import subprocess
+import threading
+
+import pytest
+
+from prate import PrateHandle, PrateIngestQueue, PrateMessage, PratePriority
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GUI_THREAD_RING = """
+import threading
+from prate import Prate, PrateRenderer
+
+prate = Prate(daemon=True, queue_size=1, overflow="block")
+done = threading.Event()
+handles = []
+
+def _ring_in_gui_thread():
+    # the queue is drained by this thread, so the second ring would wait forever
+    handles.append(prate.ring("first", "content"))
+    handles.append(prate.ring("second", "content"))
+    done.set()
+
+PrateRenderer.instance().post(_ring_in_gui_thread)
+assert done.wait(10), "ring blocked the gui thread"
+assert not handles[0].shown.cancelled()
+assert handles[1].shown.cancelled()
+print(prate.stats()["overflow"])
+"""
+
+def test_block_policy_drops_instead_of_waiting_in_gui_thread():
+    env = dict(os.environ, PYTHONPATH=ROOT, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run([sys.executable, "-c", GUI_THREAD_RING], env=env, capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["1"]
+
+def _message(title:str, priority:int = PratePriority.NORMAL, ttl:float = None) -> PrateMessage:
+    message = PrateMessage(title, "content", priority, ttl)
+    message.handle = PrateHandle(message)
+    return message
+
+def _drain(queue:PrateIngestQueue) -> list:
+    titles = []
+    message = queue.get()
+    while message is not None:
+        titles.append(message.title)
+        message = queue.get()
+    return titles
+
+def test_unknown_policy_is_refused():
+    with pytest.raises(ValueError):
+        PrateIngestQueue(4, "drop_random")
+
+def test_most_urgent_first_then_first_come():
+    queue = PrateIngestQueue()
+    for title, priority in (("a", PratePriority.NORMAL), ("b", PratePriority.LOW), ("c", PratePriority.URGENT), ("d", PratePriority.NORMAL)):
+        queue.put(_message(title, priority))
+
+    assert _drain(queue) == ["c", "a", "d", "b"]
+
+def test_drop_newest_keeps_the_queue():
+    queue = PrateIngestQueue(2, PrateIngestQueue.DROP_NEWEST)
+    messages = [_message(title) for title in "abc"]
+
+    assert [queue.put(message) for message in messages] == [True, True, False]
+    assert messages[2].dropped and messages[2].handle.is_dropped
+    assert _drain(queue) == ["a", "b"]
+    assert queue.stats()["overflow"] == 1
+
+def test_drop_oldest_makes_room():
+    queue = PrateIngestQueue(2, PrateIngestQueue.DROP_OLDEST)
+    messages = [_message("a", PratePriority.HIGH), _message("b"), _message("c")]
+
+    assert [queue.put(message) for message in messages] == [True, True, True]
+    assert messages[0].handle.is_dropped
+    assert _drain(queue) == ["b", "c"]
+
+def test_drop_lowest_priority_keeps_the_urgent():
+    queue = PrateIngestQueue(2, PrateIngestQueue.DROP_LOWEST_PRIORITY)
+    low = _message("low", PratePriority.LOW)
+    normal = _message("normal")
+    queue.put(low)
+    queue.put(normal)
+
+    # nothing is lower than the new one, so the new one is dropped
+    late_low = _message("late_low", PratePriority.LOW)
+    assert not queue.put(late_low)
+    assert late_low.handle.is_dropped
+
+    assert queue.put(_message("high", PratePriority.HIGH))
+    assert low.handle.is_dropped
+    assert not normal.dropped
+    assert _drain(queue) == ["high", "normal"]
+    assert queue.stats()["overflow"] == 2
+
+def test_block_waits_for_space():
+    queue = PrateIngestQueue(1, PrateIngestQueue.BLOCK)
+    queue.put(_message("a"))
+    threading.Timer(0.05, queue.get).start()
+
+    begin = time.monotonic()
+    assert queue.put(_message("b"))
+    assert time.monotonic() - begin >= 0.04
+    assert _drain(queue) == ["b"]
+
+def test_block_timeout_drops_the_new_message():
+    queue = PrateIngestQueue(1, PrateIngestQueue.BLOCK, block_timeout=0.05)
+    queue.put(_message("a"))
+    late = _message("b")
+
+    assert not queue.put(late)
+    assert late.handle.is_dropped
+    assert not queue.put(_message("c"), wait=False)
+    assert queue.stats()["overflow"] == 2
+    assert _drain(queue) == ["a"]
+
+def test_expired_messages_are_dropped_when_taken_out():
+    queue = PrateIngestQueue()
+    stale = _message("stale", PratePriority.HIGH, ttl=0.02)
+    fresh = _message("fresh", ttl=10)
+    queue.put(stale)
+    queue.put(fresh)
+    queue.put(_message("forever"))
+    time.sleep(0.05)
+
+    assert _drain(queue) == ["fresh", "forever"]
+    assert stale.dropped and stale.handle.is_dropped
+    assert queue.stats()["expired"] == 1
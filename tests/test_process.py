@@ -0,0 +1,51 @@
+# Desc: the process renderer modes pickle their craft calls, which must work under the spawn start method
+
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import os, sys, time, multiprocessing
+from prate import Prate
+
+class MarkedPrate(Prate):
+    '''write the title of each crafted window into the mark file'''
+
+    def _craft_window(self, title = "", content = "", *args):
+        window = super()._craft_window(title, content, *args)
+        with open(os.environ["PRATE_MARK"], "a") as f:
+            f.write(title + "\\n")
+        return window
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method("spawn")
+    MarkedPrate(daemon=True, as_sub_module=False, dedup_window=5, queue_size=4).ring("daemon", "content")
+    MarkedPrate(as_sub_module=False).ring("per-call", "content")
+    MarkedPrate(as_sub_module=False).ring("expired", "content", ttl=0)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if os.path.exists(os.environ["PRATE_MARK"]):
+            with open(os.environ["PRATE_MARK"]) as f:
+                if len(f.read().split()) >= 2:
+                    break
+        time.sleep(0.1)
+    # give the expired message time to be crafted if its ttl were not checked
+    time.sleep(1)
+    for child in multiprocessing.active_children():
+        child.terminate()
+"""
+
+def test_ring_in_process_modes_under_spawn(tmp_path):
+    script = tmp_path / "ring_spawn.py"
+    script.write_text(SCRIPT)
+    mark = tmp_path / "mark.txt"
+    env = dict(os.environ, PYTHONPATH=ROOT, PRATE_MARK=str(mark), QT_QPA_PLATFORM="offscreen")
+
+    result = subprocess.run([sys.executable, str(script)], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=90)
+
+    assert result.returncode == 0, result.stderr
+    assert "Traceback" not in result.stderr, result.stderr
+    assert sorted(mark.read_text().split()) == ["daemon", "per-call"]
@@ -0,0 +1,40 @@
+# Desc: the long-lived renderer keeps running when a posted call or a message fails
+
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FAILING_CALLS = """
+import threading
+from prate import Prate, PrateRenderer
+
+def _fail():
+    raise ValueError("bad call")
+
+done = threading.Event()
+renderer = PrateRenderer.instance()
+renderer.post(_fail)
+renderer.post(done.set)
+assert done.wait(10), "the renderer stopped after a failed call"
+
+prate = Prate(daemon=True)
+broken = prate.ring("broken", "content")
+broken.message.theme = "not a configure"
+prate._schedule_drain()
+shown = prate.ring("shown", "content")
+shown.shown.result(10)
+assert broken.is_dropped
+print("alive")
+"""
+
+def test_failed_calls_do_not_stop_the_renderer():
+    env = dict(os.environ, PYTHONPATH=ROOT, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run([sys.executable, "-c", FAILING_CALLS], env=env, capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines()[-1] == "alive"
+    assert "failed to run a call posted to the renderer:" in result.stdout
+    assert "failed to show a message:" in result.stdout
+    assert "ValueError: bad call" in result.stderr
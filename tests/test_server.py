@@ -0,0 +1,82 @@
+# Desc: the socket server shared by producer processes, a bad message is dropped without stopping it
+
+import os
+import socket
+import time
+
+import pytest
+
+from prate import PrateClient, PrateProtocol, PrateServer
+
+class RecordingPrate:
+    '''the part of Prate the server uses, it records the rings instead of showing them'''
+
+    def __init__(self):
+        self.themes = {"dark": object()}
+        self.rings = []
+
+    def ring(self, title:str = "", content:str = "", priority:int = 0, ttl:float = None, theme:str = None):
+        self.rings.append((title, content, priority, ttl, theme))
+
+@pytest.fixture
+def server(tmp_path):
+    server = PrateServer(RecordingPrate(), str(tmp_path / "prate.sock"))
+    server.start()
+    yield server
+    server.stop()
+
+def _send(server:PrateServer, payload):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(server.address)
+        connection.sendall(PrateProtocol.encode(payload))
+
+def _wait_received(server:PrateServer, count:int, timeout:float = 5):
+    deadline = time.monotonic() + timeout
+    while server.received < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_bad_items_are_dropped_and_the_server_goes_on(server):
+    _send(server, [
+        {"title": "bad priority", "priority": "soon"},
+        {"title": "list priority", "priority": [1]},
+        {"title": "bad ttl", "ttl": "later"},
+        {"title": "nan ttl", "ttl": float("nan")},
+        {"title": "list theme", "theme": ["dark"]},
+        {"title": "named", "priority": "urgent", "ttl": 2, "theme": "dark"},
+        {"title": "unknown theme", "theme": "light"},
+    ])
+    _wait_received(server, 7)
+    _send(server, {"title": "later"})
+    _wait_received(server, 8)
+
+    assert server._thread.is_alive()
+    assert server.prate.rings == [
+        ("named", "", 2, 2.0, "dark"),
+        ("unknown theme", "", 0, None, None),
+        ("later", "", 0, None, None),
+    ]
+
+def test_client_sends_priority_names(server):
+    client = PrateClient(server.address)
+    client.ring("title", "content", priority="high", ttl=1)
+    assert client.flush()
+    _wait_received(server, 1)
+    client.close()
+
+    assert server.prate.rings == [("title", "content", 1, 1.0, None)]
+
+@pytest.mark.parametrize("arguments", [
+    {"priority": "soon"},
+    {"priority": 1.5},
+    {"priority": True},
+    {"ttl": "later"},
+    {"ttl": float("inf")},
+    {"ttl": -1},
+    {"theme": ["dark"]},
+])
+def test_client_refuses_bad_values_in_the_caller(arguments):
+    client = PrateClient(os.devnull)
+
+    with pytest.raises(ValueError):
+        client.ring("title", "content", **arguments)
+    assert client.stats()["pending"] == 0
@@ -0,0 +1,118 @@
+# Desc: the stack layout of a screen anchor, windows of higher priority preempt the lower ones
+
+from prate import PratePriority
+from prate_qt import PrateStackLayout, ScreenPosition
+
+class FakeWindow:
+    '''the part of PrateWindow the layout uses, it records what the layout asks of it'''
+
+    def __init__(self, name:str, priority:int = PratePriority.NORMAL, height:int = 100):
+        self.name = name
+        self.priority = priority
+        self._height = height
+        self.offset = None
+        self.expedited = False
+
+    def height(self) -> int:
+        return self._height
+
+    def expedite(self) -> bool:
+        if self.expedited:
+            return False
+        self.expedited = True
+        return True
+
+    def set_layout(self, layout:PrateStackLayout):
+        self.layout = layout
+
+    def set_stack_offset(self, x:int, y:int):
+        self.offset = (x, y)
+
+    def reflow_to(self, offset:tuple, duration:int = 200):
+        self.offset = offset
+
+def _fill(layout:PrateStackLayout, *windows) -> list:
+    placed = []
+    for window in windows:
+        layout.place(window, lambda window=window: placed.append(window.name))
+    return placed
+
+def test_windows_stack_away_from_the_anchor():
+    layout = PrateStackLayout(ScreenPosition.RightBottom, max_visible=3, spacing=10)
+    windows = [FakeWindow(str(i)) for i in range(3)]
+    _fill(layout, *windows)
+
+    assert [window.offset for window in windows] == [(0, 0), (0, -110), (0, -220)]
+
+    layout.release(windows[0])
+    assert [window.offset for window in windows[1:]] == [(0, 0), (0, -110)]
+
+def test_higher_priority_preempts_the_lowest_one_first():
+    layout = PrateStackLayout(ScreenPosition.RightTop, max_visible=2)
+    normal = FakeWindow("normal")
+    low = FakeWindow("low", PratePriority.LOW)
+    placed = _fill(layout, normal, low)
+
+    high = FakeWindow("high", PratePriority.HIGH)
+    assert not layout.place(high, lambda: placed.append("high"))
+    assert low.expedited and not normal.expedited
+    assert layout.waiting == 1
+
+    # the next one goes for the lowest window which is not leaving yet
+    assert layout.preempt(PratePriority.HIGH)
+    assert normal.expedited
+
+    layout.release(low)
+    assert placed == ["normal", "low", "high"]
+    assert high.offset == (0, 100)
+
+def test_equal_priority_waits_without_preempting():
+    layout = PrateStackLayout(ScreenPosition.RightTop, max_visible=1)
+    first = FakeWindow("first")
+    _fill(layout, first)
+
+    assert not layout.place(FakeWindow("second"))
+    assert not first.expedited
+    assert not layout.preempt(PratePriority.NORMAL)
+
+def test_waiting_windows_are_placed_by_priority():
+    layout = PrateStackLayout(ScreenPosition.RightTop, max_visible=1)
+    first = FakeWindow("first", PratePriority.HIGH)
+    placed = _fill(layout, first, FakeWindow("low", PratePriority.LOW), FakeWindow("normal"), FakeWindow("normal2"))
+
+    assert layout.waiting == 3
+    for _ in range(3):
+        layout.release(layout._slots[0])
+    assert placed == ["first", "normal", "normal2", "low"]
+
+def test_urgent_is_placed_at_once():
+    layout = PrateStackLayout(ScreenPosition.RightTop, max_visible=1)
+    normal = FakeWindow("normal")
+    _fill(layout, normal)
+
+    urgent = FakeWindow("urgent", PratePriority.URGENT)
+    assert layout.place(urgent)
+    assert normal.expedited
+    assert len(layout) == 2 and layout.waiting == 0
+
+def test_shared_layout_takes_the_latest_max_visible():
+    PrateStackLayout.clear_all()
+    try:
+        layout = PrateStackLayout.of(ScreenPosition.RightTop, (12, 12), max_visible=1)
+        placed = _fill(layout, FakeWindow("first"), FakeWindow("second"), FakeWindow("third"))
+        assert placed == ["first"] and layout.waiting == 2
+
+        # another prate with a higher limit rings at the same anchor
+        assert PrateStackLayout.of(ScreenPosition.RightTop, (12, 12), max_visible=2) is layout
+        assert layout.max_visible == 2
+        assert placed == ["first", "second"] and layout.waiting == 1
+
+        # a lower limit keeps the shown windows until they leave
+        PrateStackLayout.of(ScreenPosition.RightTop, (12, 12), max_visible=1)
+        assert len(layout) == 2
+        layout.release(layout._slots[0])
+        assert placed == ["first", "second"] and layout.waiting == 1
+        layout.release(layout._slots[0])
+        assert placed == ["first", "second", "third"]
+    finally:
+        PrateStackLayout.clear_all()
@@ -0,0 +1,86 @@
+# Desc: theme json is checked against the schema, errors name the source and the field
+
+import json
+
+import pytest
+
+from prate import PrateThemeError, PrateThemeRegistry, PrateThemeSchema, PrateWindowAppearanceConfigure
+
+def test_valid_theme_takes_the_defaults():
+    configure = PrateThemeSchema.validate({"window-size": [300, 80], "screen-pos": "LeftTop", "shadow-color": [0, 0, 0, 120]})
+
+    assert isinstance(configure, PrateWindowAppearanceConfigure)
+    assert configure.window_size == [300, 80]
+    assert configure.screen_pos == "LeftTop"
+    assert configure.padding == PrateWindowAppearanceConfigure().padding
+
+@pytest.mark.parametrize("key, value", [
+    ("window-size", [300]),
+    ("window-size", [300, 0]),
+    ("screen-pos", "middle"),
+    ("screen-padding", [1.5, 2]),
+    ("border-radius", "8px"),
+    ("has-title", 1),
+    ("title-font-size", True),
+    ("info-font-size", -3),
+    ("shadow-color", [0, 0, 256]),
+    ("background-image", 42),
+    ("animation", "wait;1s"),
+])
+def test_wrong_value_names_the_field(key, value):
+    with pytest.raises(PrateThemeError) as error:
+        PrateThemeSchema.validate({key: value}, "dark.json")
+
+    assert error.value.source == "dark.json"
+    assert error.value.key == key
+    assert str(error.value).startswith(f"dark.json: {key!r} should be")
+
+def test_unknown_field_is_refused():
+    with pytest.raises(PrateThemeError) as error:
+        PrateThemeSchema.validate({"window_size": [300, 80]})
+
+    assert error.value.key == "window_size"
+    assert "is not a theme field" in error.value.reason
+
+def test_theme_must_be_an_object():
+    with pytest.raises(PrateThemeError) as error:
+        PrateThemeSchema.validate([1, 2], "list.json")
+
+    assert error.value.key is None
+    assert str(error.value) == "list.json: a theme should be a json object, not list"
+
+def test_invalid_animation_is_reported_with_its_index():
+    with pytest.raises(PrateThemeError) as error:
+        PrateThemeSchema.validate({"animation": ["wait;1s", "alpha;1s;wobbly;(0, 1)"]})
+
+    assert error.value.key == "animation"
+    assert error.value.reason == "[1] 'wobbly': " + error.value.__cause__.reason
+
+def test_errors_of_a_bundle_name_the_theme(tmp_path):
+    path = tmp_path / "bundle.json"
+    path.write_text(json.dumps({"themes": {"ok": {}, "broken": {"padding": "wide"}}}))
+
+    with pytest.raises(PrateThemeError) as error:
+        PrateThemeRegistry().load(str(path))
+
+    assert error.value.source == f"{path}#broken"
+    assert error.value.key == "padding"
+
+def test_invalid_json_reports_its_position(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('{"padding": 4,\n}')
+
+    with pytest.raises(PrateThemeError) as error:
+        PrateThemeRegistry().load(str(path))
+
+    assert error.value.reason.startswith("invalid json at line 2 column 1")
+
+def test_unknown_theme_name_is_refused():
+    registry = PrateThemeRegistry()
+    registry.register("dark", PrateWindowAppearanceConfigure.dark())
+
+    with pytest.raises(PrateThemeError) as error:
+        registry.get("light")
+
+    assert error.value.key == "light"
+    assert "dark" in error.value.reason
@@ -0,0 +1,109 @@
+# Desc: the timeline of TweenAnimation, seeking puts the window into its state at once and reverse plays backward
+
+import time
+
+import pytest
+
+from prate import TweenAnimation, TweenAlpha, TweenMove
+
+class Target:
+    '''records the values the tweens set'''
+
+    def __init__(self):
+        self.alpha = []
+        self.pos = []
+
+    def set_alpha(self, alpha:float):
+        self.alpha.append(alpha)
+
+    def move(self, x:int, y:int):
+        self.pos.append((x, y))
+
+def _animation(target:Target) -> TweenAnimation:
+    '''fade in, slide, then fade half out, 100 ms each'''
+
+    anim = TweenAnimation()
+    anim.append(TweenAlpha(target.set_alpha, 0, 1, 100))
+    anim.append(TweenMove(target.move, (0, 0), (100, 0), 100))
+    anim.append(TweenAlpha(target.set_alpha, 1, 0.5, 100))
+    return anim
+
+def test_seek_settles_the_state_without_replaying(qapp):
+    target = Target()
+    anim = _animation(target)
+
+    anim.seek(250)
+    assert anim.paused and anim.playing
+    # the timer runs for a moment before the pause
+    assert anim.position == pytest.approx(250, abs=1)
+    assert target.alpha[-1] == 0.75
+    # the tweens before are readied and ended, none of their frames are replayed
+    assert set(target.alpha[:-1]) == {0, 1}
+    assert set(target.pos) == {(100, 0)}
+
+    # back into the first tween, the slide keeps the last value it set
+    anim.seek(50)
+    assert target.alpha[-1] == pytest.approx(0.5)
+    assert target.pos[-1] == (100, 0)
+    anim.stop()
+
+def test_seek_is_clamped_into_the_timeline(qapp):
+    target = Target()
+    anim = _animation(target)
+
+    anim.seek(1000)
+    assert anim.position == anim.duration == 300
+    assert target.alpha[-1] == 0.5
+    anim.seek(-50)
+    assert anim.position == pytest.approx(0, abs=1)
+    assert target.alpha[-1] == 0
+    anim.stop()
+
+def test_seek_while_playing_goes_on_from_there(run_loop):
+    target = Target()
+    anim = _animation(target)
+    finished = []
+
+    def _start(quit):
+        def _done():
+            finished.append(time.perf_counter())
+            quit()
+        anim.play(_done)
+        anim.seek(200)
+
+    begin = time.perf_counter()
+    run_loop(_start)
+
+    assert not anim.paused
+    assert len(finished) == 1
+    assert finished[0] - begin < 0.2
+    assert target.alpha[-1] == 0.5
+
+def test_reverse_plays_back_to_the_start(run_loop):
+    target = Target()
+    anim = _animation(target)
+    finished = []
+
+    def _start(quit):
+        def _done():
+            finished.append(time.perf_counter())
+            quit()
+        anim.play(_done)
+        anim.seek(150)
+        assert anim.reverse()
+        assert anim.reversed
+
+    begin = time.perf_counter()
+    run_loop(_start)
+
+    assert len(finished) == 1
+    assert abs(finished[0] - begin - 0.15) < 0.08
+    assert target.pos[-1] == (0, 0)
+    assert target.alpha[-1] == 0
+    assert not anim.playing and anim.position == 0
+
+def test_reverse_needs_a_playing_animation(qapp):
+    anim = _animation(Target())
+
+    assert not anim.reverse()
+    assert not anim.reversed
@@ -0,0 +1,76 @@
+# Desc: time-based tweens keep their duration and end value when the event loop stalls
+
+import time
+
+from PyQt5.QtCore import QTimer
+
+from prate import TweenTimer, TweenAnimation, TweenAlpha
+
+def _stall(after:int, block:int):
+    '''block the event loop for a while after some time, in millisecond'''
+
+    QTimer.singleShot(after, lambda: time.sleep(block / 1000))
+
+def test_timer_finishes_on_time_through_a_stall(run_loop):
+    timer = TweenTimer(time_based=True)
+    elapsed = []
+    finished = []
+
+    def _start(quit):
+        def _done():
+            finished.append(time.perf_counter())
+            quit()
+        timer.start(elapsed.append, _done, 300)
+        _stall(50, 150)
+
+    begin = time.perf_counter()
+    run_loop(_start)
+
+    assert len(finished) == 1
+    assert abs(finished[0] - begin - 0.3) < 0.08
+    assert elapsed[-1] == 300
+    assert elapsed == sorted(elapsed)
+    # the frames which fell into the stall are skipped instead of replayed
+    assert max(b - a for a, b in zip(elapsed, elapsed[1:])) >= 100
+
+def test_timer_ends_at_once_after_a_stall_past_its_end(run_loop):
+    timer = TweenTimer(time_based=True)
+    elapsed = []
+    finished = []
+
+    def _start(quit):
+        def _done():
+            finished.append(time.perf_counter())
+            quit()
+        timer.start(elapsed.append, _done, 200)
+        _stall(20, 400)
+
+    begin = time.perf_counter()
+    run_loop(_start)
+
+    assert len(finished) == 1
+    assert finished[0] - begin < 0.5
+    assert elapsed[-1] == 200
+
+def test_animation_keeps_total_duration_and_end_value(run_loop):
+    alpha = []
+    anim = TweenAnimation()
+    anim.append(TweenAlpha(alpha.append, 0, 1, 200))
+    anim.append_wait(100)
+    anim.append(TweenAlpha(alpha.append, 1, 0.5, 200))
+    finished = []
+
+    def _start(quit):
+        def _done():
+            finished.append(time.perf_counter())
+            quit()
+        anim.play(_done)
+        _stall(50, 120)
+        _stall(300, 120)
+
+    begin = time.perf_counter()
+    run_loop(_start)
+
+    assert len(finished) == 1
+    assert abs(finished[0] - begin - 0.5) < 0.08
+    assert alpha[-1] == 0.5